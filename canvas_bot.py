@@ -4,11 +4,14 @@ import os
 import click, sys, logging
 import re
 from config.yaml_io import read_re, write_re, reset_re
+from core.columnar_export import columnar_available
 from core.course_root import CanvasCourseRoot
+from core.scan_profiles import get_scan_profile_names, DEFAULT_SCAN_PROFILE
 from network.cred import set_canvas_api_key_to_environment_variable, save_canvas_api_key, load_config_data_from_appdata, delete_canvas_api_key, delete_config_file_from_appdata, \
     save_canvas_studio_client_keys, get_canvas_studio_tokens, \
-    set_canvas_studio_api_key_to_environment_variable, delete_canvas_studio_client_keys, delete_canvas_studio_tokens
+    set_canvas_studio_api_key_to_environment_variable, delete_canvas_studio_client_keys, delete_canvas_studio_tokens, get_youtube_api_key
 from network.set_config import save_config_data
+from network.scan_budget import set_request_timeout
 from network.studio_api import authorize_studio_token, refresh_studio_token
 from tools.canvas_studio_caption_upload import add_caption_to_canvas_studio_video
 
@@ -540,10 +543,11 @@ class CanvasBot(CanvasCourseRoot):
     """
     Wraps Canvas Course Root Class
     """
-    def __init__(self, course_id=None):
+    def __init__(self, course_id=None, headless=False, scan_profile=None, course_time_limit=None):
         if course_id:
             self.detect_and_set_config()
-            super().__init__(str(course_id))
+            super().__init__(str(course_id), headless=headless, scan_profile=scan_profile,
+                             course_time_limit=course_time_limit)
 
     def detect_and_set_config(self):
         """Load existing configuration or run initial setup."""
@@ -577,8 +581,18 @@ class CanvasBot(CanvasCourseRoot):
         set_canvas_studio_config(force_config=True)
 
 
-    def start(self):
+    def start(self, from_snapshot=False):
         print(f"Starting Canvas Bot - {version} ")
+        if from_snapshot:
+            try:
+                self.load_snapshot()
+                return
+            except FileNotFoundError:
+                print(f"No snapshot found for course {self.course_id}. Run a normal scan first to create one.")
+            except ValueError as exc:
+                print(f"Could not load snapshot for course {self.course_id}: {exc}")
+            log.warning(f"Snapshot load failed for course {self.course_id}")
+            sys.exit(1)
         self.initialize_course()
 
     def print_content_tree(self):
@@ -604,6 +618,21 @@ if __name__=='__main__':
                   help='Canvas course ID to process. Find it in the course URL: canvas.edu/courses/[COURSE_ID]')
     @click.option('--course_id_list', type=click.STRING,
                   help='Path to text file with multiple course IDs (one per line) for batch processing.')
+    @click.option('--from-snapshot', 'from_snapshot', is_flag=True,
+                  help='Reload the course from the snapshot saved by the last scan instead of querying the Canvas API. '
+                       'Useful for re-printing trees or re-exporting without rescanning.')
+    @click.option('--scan-profile', 'scan_profile', type=click.Choice(get_scan_profile_names()),
+                  default=DEFAULT_SCAN_PROFILE, show_default=True,
+                  help='Skip course sections and expansions not needed for the job. documents-only skips Studio, '
+                       'media objects and announcements; media-audit skips Canvas Files and Box pages; '
+                       'inventory-count skips those plus all link expansion. Profiles are defined in config.yaml.')
+    @click.option('--course-time-limit', 'course_time_limit', type=click.INT, default=None,
+                  help='Maximum seconds to spend scanning each course. When reached, the scan stops, unfinished '
+                       'sections are reported and JSON/Excel are still written for what was collected. '
+                       'Defaults to scan_budget in config.yaml (0 = no limit).')
+    @click.option('--request-timeout', 'request_timeout', type=click.INT, default=None,
+                  help='Seconds to wait for any single Canvas, Studio or Box request before treating it as failed. '
+                       'Defaults to scan_budget in config.yaml.')
 
     # === Output Options ===
     @click.option('--download_folder', type=click.STRING,
@@ -615,6 +644,14 @@ if __name__=='__main__':
     @click.option('--output_as_excel', type=click.STRING,
                   help='Directory to save Excel workbook (.xlsm). Creates multi-sheet report for accessibility '
                        'auditing with separate tabs for Documents, Videos, Audio, Images, and tracking columns.')
+    @click.option('--output_as_sqlite', type=click.STRING,
+                  help='SQLite file to add the course inventory to (created if missing). Every course of a '
+                       '--course_id_list run goes into the same database, replacing earlier scans of that course.')
+    @click.option('--output_as_columnar', type=click.STRING,
+                  help='Directory to save {course_id}.parquet (or .arrow) with one typed row per content item, '
+                       'for pandas or DuckDB. All courses share one schema. Requires pyarrow.')
+    @click.option('--columnar-format', 'columnar_format', type=click.Choice(['parquet', 'arrow']), default='parquet',
+                  help='File format for --output_as_columnar: parquet (default) or arrow (Arrow IPC).')
 
     # === Content Inclusion Flags ===
     @click.option('--include_video_files', is_flag=True,
@@ -631,6 +668,25 @@ if __name__=='__main__':
     # === Download Behavior ===
     @click.option('--flatten', is_flag=True,
                   help='Download all files to a single flat directory instead of preserving module folder structure.')
+    @click.option('--download-workers', 'download_workers', type=click.IntRange(min=1), default=None,
+                  help='Number of files to download at once (default from config.yaml). Connections to each host '
+                       '(Canvas files, Studio CDN, external sites) are capped separately.')
+    @click.option('--max-rate', 'max_rate', type=click.FloatRange(min=0), default=None, metavar='MB_PER_SECOND',
+                  help='Cap the combined download rate of all workers in MB/s (default from config.yaml, 0 = unlimited). '
+                       'Per-host caps are set in config.yaml.')
+    @click.option('--dry-run', 'dry_run', is_flag=True,
+                  help='With --download_folder, print the download plan (new/changed files and bytes per category), '
+                       'the free-space check and an estimated duration, then stop without downloading.')
+    @click.option('--json-compact', 'json_compact', is_flag=True,
+                  help='Write the --output_as_json file without indentation (smaller and faster to write).')
+    @click.option('--json-lines', 'json_lines', is_flag=True,
+                  help='With --output_as_json, also write {course_id}.jsonl with one content item per line.')
+    @click.option('--excel-streaming', 'excel_streaming', is_flag=True,
+                  help='Write the --output_as_excel workbook row by row with write-only sheets. Used automatically '
+                       'for very large inventories (excel.streaming_rows in config.yaml).')
+    @click.option('--check-youtube-captions', 'check_youtube_captions', is_flag=True,
+                  help='Add the caption status of YouTube links to the exports (needs a saved YouTube API key). '
+                       'Results are cached between runs.')
     @click.option('--flush_after_download', is_flag=True,
                   help='Delete downloaded files after processing. Use for temporary extraction workflows.')
 
@@ -676,13 +732,27 @@ if __name__=='__main__':
     def main(ctx,
              course_id,
              course_id_list,
+             from_snapshot,
+             scan_profile,
+             course_time_limit,
+             request_timeout,
              download_folder,
              output_as_json,
              output_as_excel,
+             output_as_sqlite,
+             output_as_columnar,
+             columnar_format,
              include_video_files,
              include_audio_files,
              include_image_files,
              flatten,
+             download_workers,
+             max_rate,
+             dry_run,
+             json_compact,
+             json_lines,
+             excel_streaming,
+             check_youtube_captions,
              flush_after_download,
              download_hidden_files,
              include_inactive_content,
@@ -743,14 +813,27 @@ if __name__=='__main__':
             reset_patterns(skip_confirm)
             sys.exit(0)
 
+        if request_timeout is not None:
+            set_request_timeout(request_timeout)
+
         params = {
             "download_folder": download_folder,
             "output_as_json": output_as_json,
             "output_as_excel": output_as_excel,
+            "output_as_sqlite": output_as_sqlite,
+            "output_as_columnar": output_as_columnar,
+            "columnar_format": columnar_format,
             "include_video_files": include_video_files,
             "include_audio_files": include_audio_files,
             "include_image_files": include_image_files,
             "flatten": flatten,
+            "download_workers": download_workers,
+            "max_rate": max_rate,
+            "dry_run": dry_run,
+            "json_compact": json_compact,
+            "json_lines": json_lines,
+            "excel_streaming": excel_streaming,
+            "check_video_site_caption_status": check_youtube_captions,
             "flush_after_download": flush_after_download,
             "download_hidden_files": download_hidden_files,
             "only_active_files": not include_inactive_content,
@@ -767,7 +850,9 @@ if __name__=='__main__':
                     **params
                     ):
 
-            bot = CanvasBot(course_id)
+            # Batch runs that never print a tree skip building it during the scan
+            bot = CanvasBot(course_id, headless=not (print_content_tree or print_full_course),
+                            scan_profile=scan_profile, course_time_limit=course_time_limit)
 
             if ctx.params.get('caption_file_location') or ctx.params.get('canvas_studio_media_id'):
 
@@ -788,7 +873,7 @@ if __name__=='__main__':
 
 
             if course_id:
-                bot.start()
+                bot.start(from_snapshot=from_snapshot)
             else:
                 print("No course ID provided. Exiting")
                 sys.exit()
@@ -802,14 +887,30 @@ if __name__=='__main__':
             if ctx.params.get('download_folder'):
                 bot.download_files(download_folder, **params)
 
-            if ctx.params.get('output_as_json'):
-                bot.save_content_as_json(output_as_json, download_folder, **params)
-
+            # Excel first: it builds the shared content inventory, which the JSON export
+            # then streams instead of building its own
             if ctx.params.get('output_as_excel'):
                 bot.save_content_as_excel(output_as_excel, **params)
 
+            if ctx.params.get('output_as_sqlite'):
+                bot.save_content_to_index(output_as_sqlite, **params)
+
+            if ctx.params.get('output_as_columnar'):
+                bot.save_content_as_columnar(output_as_columnar, **params)
 
+            if ctx.params.get('output_as_json'):
+                # Same course folder as the Excel export, so both share one content inventory
+                bot.save_content_as_json(output_as_json, bot.course_folder(download_folder), **params)
+
+
+
+
+        if output_as_columnar and not columnar_available():
+            print("Error: --output_as_columnar needs pyarrow. Install it with: pip install pyarrow")
+            sys.exit(1)
 
+        if check_youtube_captions and not get_youtube_api_key():
+            print("Warning: no YouTube API key is saved; caption status will be left empty")
 
         if course_id_list:
             course_list = read_course_list(course_id_list)
@@ -105,21 +105,6 @@ def reset_re():
         return True
     return False
 
-def read_download_manifest(course_folder):
-    try:
-        with open(os.path.join(course_folder, ".manifest", "download_manifest.yaml"), "r+") as f:
-            return yaml.safe_load(f)
-    except FileNotFoundError as exc:
-        log.error(f"Failed to read download manifest file: {course_folder} | {exc}")
-        raise SystemExit(f"Download manifest file not found: {course_folder}")
-
-
-def write_to_download_manifest(course_folder: str, heading:str, content_list: list):
-    yaml_content = {"downloaded_files": content_list}
-
-    with open(os.path.join(course_folder, ".manifest", "download_manifest.yaml"),"w") as f:
-        yaml.dump(yaml_content, f, default_flow_style=False, allow_unicode=True)
-
 def create_download_manifest(course_folder: str) -> str:
 
     manifest_dir = os.path.join(course_folder, ".manifest")
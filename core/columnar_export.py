@@ -0,0 +1,170 @@
+"""
+Columnar Export
+===============
+
+Flat, typed content rows in Parquet or Arrow IPC files, for pandas, DuckDB
+and other analytics tools.
+
+Each course is written as ``{directory}/{course_id}.parquet`` (or ``.arrow``)
+with one row per content item (see ``core.content_index.content_rows``). All
+files share one schema, so a directory filled by a batch run, or by several
+runs, reads as a single table. Rescanning a course replaces its file::
+
+    SELECT host, COUNT(*) FROM read_parquet('exports/*.parquet') GROUP BY host;   -- DuckDB
+    pandas.read_parquet("exports/")                                               -- pandas
+
+Columns keep their types: ``is_hidden`` and the caption flags are booleans,
+``position`` is an integer, ``scan_date`` a timestamp and ``path`` a list of
+titles from the item up to the course, as in the JSON export. Item fields
+without a column are kept as JSON text in ``extra``.
+
+pyarrow is an optional dependency (``pip install pyarrow``). Without it only
+this export is unavailable; ``write_content_table`` raises ImportError.
+
+See Also
+--------
+- core.content_extractor.ContentExtractor.save_content_as_columnar : Exports a scanned course
+- core.content_index : The same rows in a multi-course SQLite database
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+
+from core.content_index import content_rows
+from core.file_writer import part_path
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+log = logging.getLogger(__name__)
+
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# (column, arrow type name); the course columns come first
+_COLUMNS = (
+    ("course_id", "string"), ("course_name", "string"), ("course_url", "string"),
+    ("resource_type", "string"), ("resource_url", "string"), ("resource_title", "string"),
+    ("category", "string"), ("type", "string"), ("title", "string"), ("url", "string"), ("host", "string"),
+    ("file_type", "string"), ("file_name", "string"), ("download_url", "string"), ("save_path", "string"),
+    ("is_hidden", "bool"), ("position", "int64"), ("scan_date", "timestamp"), ("path", "list"),
+    ("is_captioned", "bool"), ("machine_captioned", "bool"), ("caption_status", "string"),
+    ("extra", "string"),
+)
+
+
+def columnar_available() -> bool:
+    """True if pyarrow is installed."""
+    return pyarrow is not None
+
+
+def _arrow_type(name: str):
+    if name == "bool":
+        return pyarrow.bool_()
+    if name == "int64":
+        return pyarrow.int64()
+    if name == "timestamp":
+        return pyarrow.timestamp("us")
+    if name == "list":
+        return pyarrow.list_(pyarrow.string())
+    return pyarrow.string()
+
+
+def content_schema():
+    """The Arrow schema shared by every course file."""
+    return pyarrow.schema([(column, _arrow_type(type_name)) for column, type_name in _COLUMNS])
+
+
+def _convert(type_name: str, value):
+    if value is None:
+        return None
+    if type_name == "bool":
+        return bool(value)
+    if type_name == "int64":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    if type_name == "timestamp":
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if type_name == "list":
+        return [str(title) for title in value]
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str) if value else None
+    return str(value)
+
+
+def content_table(inventory: dict):
+    """Build the Arrow table of one course inventory (``ExportSession.content``)."""
+    columns = {column: [] for column, _ in _COLUMNS}
+    course_columns = {"course_name": inventory.get("course_name"), "course_url": inventory.get("course_url")}
+    for row in content_rows(inventory):
+        row.update(course_columns)
+        for column, type_name in _COLUMNS:
+            columns[column].append(_convert(type_name, row.get(column)))
+    schema = content_schema()
+    return pyarrow.Table.from_arrays([pyarrow.array(columns[field.name], type=field.type) for field in schema],
+                                     schema=schema)
+
+
+def write_content_table(inventory: dict, directory: str, columnar_format: str = "parquet") -> str:
+    """
+    Write one course's content rows to ``{directory}/{course_id}{ext}``.
+
+    Parameters
+    ----------
+    inventory : dict
+        The course inventory with its original value types (``ExportSession.content``).
+
+    directory : str
+        The dataset directory shared by all courses. Created if missing.
+
+    columnar_format : str, default "parquet"
+        ``parquet`` (zstd-compressed) or ``arrow`` (Arrow IPC file).
+
+    Returns
+    -------
+    str
+        The path of the written file.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed.
+    ValueError
+        If ``columnar_format`` is unknown.
+    """
+    if pyarrow is None:
+        raise ImportError("The columnar export needs pyarrow: pip install pyarrow")
+    if columnar_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format: {columnar_format}")
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{inventory['course_id']}{COLUMNAR_FORMATS[columnar_format]}")
+    temp_path = part_path(path)
+    table = content_table(inventory)
+    try:
+        if columnar_format == "parquet":
+            pyarrow.parquet.write_table(table, temp_path, compression="zstd")
+        else:
+            with pyarrow.OSFile(temp_path, "wb") as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    log.debug(f"Columnar export | rows={table.num_rows} | path={path}")
+    return path
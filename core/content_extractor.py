@@ -65,25 +65,38 @@ See Also
 --------
 - core.manifest.Manifest: Storage for discovered content nodes
 - core.content_scaffolds: Helper functions for building content dictionaries
+- core.row_model.RowModel: Per-node derived fields shared by the dictionaries
+- core.export_session.ExportSession: Content inventory shared by the exports of a run
+- core.content_index.ContentIndex: Multi-course SQLite content index
+- core.columnar_export: Parquet / Arrow IPC content rows
 - core.downloader.DownloaderMixin: File download capabilities
 - resource_nodes.content_nodes: Content node class definitions
 """
 
-import json
 import logging
 import os
 import shutil
 
 from config.yaml_io import create_download_manifest
+from core.columnar_export import write_content_table
+from core.content_index import ContentIndex
 from core.content_scaffolds import *
+from core.export_session import ExportSession
 from core.manifest import Manifest
+from core.row_model import RowModel
 from resource_nodes.content_nodes import *
 from core.downloader import DownloaderMixin
+from tools.captioning_check import prefetch_caption_info
 from tools.export_to_excel import save_as_excel
 
 log = logging.getLogger(__name__)
 
 
+def _collect(items, lazy: bool):
+    """A content list, or the generator that produces it when ``lazy`` (see get_all_content)."""
+    return items if lazy else list(items)
+
+
 class ContentExtractor(DownloaderMixin):
     """
     Extracts, categorizes, and exports content from a Canvas LMS course.
@@ -144,10 +157,14 @@ class ContentExtractor(DownloaderMixin):
         build_unsorted_dict() -> dict
 
     Export Methods:
+        course_folder(directory) -> str
+        export_session(file_download_directory, **params) -> ExportSession
         get_all_content(file_download_directory, **params) -> dict
         get_all_content_as_json(file_download_directory, **params) -> str
         save_content_as_json(json_save_directory, file_download_directory, **params) -> str
         save_content_as_excel(excel_directory, **params) -> None
+        save_content_to_index(index_path, **params) -> None
+        save_content_as_columnar(directory, **params) -> str
 
     Download Methods:
         download_files(directory, **params) -> None
@@ -208,6 +225,8 @@ class ContentExtractor(DownloaderMixin):
         self.course_url = course_url
         self.course_name = course_name
         self.exists = exists
+        self._export_sessions = {}
+        self._rows = None
 
     # =========================================================================
     # Content Getter Methods
@@ -423,7 +442,19 @@ class ContentExtractor(DownloaderMixin):
     # These methods transform content nodes into dictionaries suitable for
     # JSON/Excel export. They use helper functions from content_scaffolds.py.
 
-    def build_documents_dict(self, file_download_directory: str, flatten: bool) -> dict:
+    @property
+    def rows(self) -> RowModel:
+        """
+        Derived fields (path, hidden state, order, source page) of every content
+        node, computed once for all exports of the finished scan.
+
+        See core.row_model for details.
+        """
+        if self._rows is None:
+            self._rows = RowModel()
+        return self._rows
+
+    def build_documents_dict(self, file_download_directory: str, flatten: bool, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all document content.
 
@@ -442,6 +473,9 @@ class ContentExtractor(DownloaderMixin):
             all files in date-based folders by type. If False, preserve
             the hierarchical folder structure from Canvas.
 
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -454,12 +488,14 @@ class ContentExtractor(DownloaderMixin):
             and optionally save_path.
         """
         return {
-            "documents": [document_dict(document, file_download_directory, flatten) for document in self.get_document_objects()],
-            "document_sites": [document_site_dict(document_site) for document_site in self.get_document_site_objects()],
+            "documents": _collect((document_dict(document, file_download_directory, flatten, self.rows)
+                                  for document in self.get_document_objects()), lazy),
+            "document_sites": _collect((document_site_dict(document_site, self.rows)
+                                       for document_site in self.get_document_site_objects()), lazy),
         }
 
     def build_videos_dict(self, file_download_directory: str, flatten: bool,
-                          check_video_site_caption_status: bool) -> dict:
+                          check_video_site_caption_status: bool, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all video content.
 
@@ -480,6 +516,11 @@ class ContentExtractor(DownloaderMixin):
             If True, check YouTube videos for caption availability using
             the YouTube API. This adds a 'caption_status' field to video
             site dicts. Requires YouTube API credentials to be configured.
+            All video sites are checked up front, concurrently and through
+            the caption cache (see tools.captioning_check).
+
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
 
         Returns
         -------
@@ -493,15 +534,18 @@ class ContentExtractor(DownloaderMixin):
             download_url, path, class, and optionally canvas_media_id, save_path,
             canvas_studio_id, machine_captioned.
         """
+        if check_video_site_caption_status:
+            # One concurrent, cached pass over all video sites; video_site_dict then reads the cache
+            prefetch_caption_info(getattr(video_site, "url", None) for video_site in self.get_video_site_objects())
         return {
-            "video_sites": [video_site_dict(video_site, check_video_site_caption_status)
-                            for video_site in self.get_video_site_objects()],
-            "video_files": [video_file_dict(video_file, file_download_directory, flatten) for video_file in
-                            self.get_video_file_objects()],
-            "institution_video": [institution_video_dict(node) for node in self.get_institution_video_objects()],
+            "video_sites": _collect((video_site_dict(video_site, check_video_site_caption_status, self.rows)
+                                    for video_site in self.get_video_site_objects()), lazy),
+            "video_files": _collect((video_file_dict(video_file, file_download_directory, flatten, self.rows)
+                                    for video_file in self.get_video_file_objects()), lazy),
+            "institution_video": _collect((institution_video_dict(node, self.rows) for node in self.get_institution_video_objects()), lazy),
         }
 
-    def build_audio_dict(self, file_download_directory: str, flatten: bool) -> dict:
+    def build_audio_dict(self, file_download_directory: str, flatten: bool, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all audio content.
 
@@ -518,6 +562,9 @@ class ContentExtractor(DownloaderMixin):
             If True, ignore course folder structure in save paths.
             If False, preserve hierarchical structure.
 
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -526,12 +573,12 @@ class ContentExtractor(DownloaderMixin):
             - "audio_files": List of audio file dicts (downloadable audio)
         """
         return {
-            "audio_sites": [audio_site_dict(audio_site) for audio_site in self.get_audio_site_objects()],
-            "audio_files": [audio_file_dict(audio_file, file_download_directory, flatten) for audio_file in
-                            self.get_audio_file_objects()],
+            "audio_sites": _collect((audio_site_dict(audio_site, self.rows) for audio_site in self.get_audio_site_objects()), lazy),
+            "audio_files": _collect((audio_file_dict(audio_file, file_download_directory, flatten, self.rows)
+                                    for audio_file in self.get_audio_file_objects()), lazy),
         }
 
-    def build_images_dict(self, file_download_directory: str, flatten: bool) -> dict:
+    def build_images_dict(self, file_download_directory: str, flatten: bool, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all image content.
 
@@ -547,6 +594,9 @@ class ContentExtractor(DownloaderMixin):
             If True, ignore course folder structure in save paths.
             If False, preserve hierarchical structure.
 
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -554,11 +604,11 @@ class ContentExtractor(DownloaderMixin):
             - "image_files": List of image file dicts
         """
         return {
-            "image_files": [image_file_dict(image_file, file_download_directory, flatten) for image_file in
-                            self.get_image_file_objects()],
+            "image_files": _collect((image_file_dict(image_file, file_download_directory, flatten, self.rows)
+                                    for image_file in self.get_image_file_objects()), lazy),
         }
 
-    def build_unsorted_dict(self) -> dict:
+    def build_unsorted_dict(self, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all unclassified content.
 
@@ -566,6 +616,11 @@ class ContentExtractor(DownloaderMixin):
         Unsorted content represents links that didn't match any known
         content type pattern.
 
+        Parameters
+        ----------
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -573,13 +628,18 @@ class ContentExtractor(DownloaderMixin):
             - "unsorted": List of unsorted content dicts
         """
         return {
-            "unsorted": [unsorted_dict(unsorted) for unsorted in self.get_unsorted_objects()],
+            "unsorted": _collect((unsorted_dict(unsorted, self.rows) for unsorted in self.get_unsorted_objects()), lazy),
         }
 
-    def build_digital_textbooks_dict(self) -> dict:
+    def build_digital_textbooks_dict(self, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all digital textbook content.
 
+        Parameters
+        ----------
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -587,13 +647,18 @@ class ContentExtractor(DownloaderMixin):
             - "digital_textbooks": List of digital textbook dicts
         """
         return {
-            "digital_textbooks": [digital_textbook_dict(node) for node in self.get_digital_textbook_objects()],
+            "digital_textbooks": _collect((digital_textbook_dict(node, self.rows) for node in self.get_digital_textbook_objects()), lazy),
         }
 
-    def build_institution_video_dict(self) -> dict:
+    def build_institution_video_dict(self, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all institution video platform content.
 
+        Parameters
+        ----------
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -601,13 +666,18 @@ class ContentExtractor(DownloaderMixin):
             - "institution_video": List of institution video dicts
         """
         return {
-            "institution_video": [institution_video_dict(node) for node in self.get_institution_video_objects()],
+            "institution_video": _collect((institution_video_dict(node, self.rows) for node in self.get_institution_video_objects()), lazy),
         }
 
-    def build_file_storage_dict(self) -> dict:
+    def build_file_storage_dict(self, lazy: bool = False) -> dict:
         """
         Build a dictionary containing all file storage site content.
 
+        Parameters
+        ----------
+        lazy : bool, default False
+            If True, each list is returned as a generator that builds its dicts on demand.
+
         Returns
         -------
         dict
@@ -615,14 +685,14 @@ class ContentExtractor(DownloaderMixin):
             - "file_storage": List of file storage site dicts
         """
         return {
-            "file_storage": [file_storage_dict(node) for node in self.get_file_storage_site_objects()],
+            "file_storage": _collect((file_storage_dict(node, self.rows) for node in self.get_file_storage_site_objects()), lazy),
         }
 
     # =========================================================================
     # Content Aggregation Methods
     # =========================================================================
 
-    def get_all_content(self, file_download_directory: str = None, **params) -> dict:
+    def get_all_content(self, file_download_directory: str = None, lazy: bool = False, **params) -> dict:
         """
         Build a complete dictionary of all course content.
 
@@ -636,6 +706,11 @@ class ContentExtractor(DownloaderMixin):
             Base directory where files will be downloaded. When provided,
             file content dicts include 'save_path' fields. Pass None to omit.
 
+        lazy : bool, default False
+            If True, every content list is a generator instead of a list, so
+            the items can be written out one at a time (see core.json_writer).
+            Each generator can be consumed once.
+
         **params : dict
             Additional parameters passed to build methods:
 
@@ -660,7 +735,8 @@ class ContentExtractor(DownloaderMixin):
                         "audio": {...},      # from build_audio_dict()
                         "images": {...},     # from build_images_dict()
                         "unsorted": {...}    # from build_unsorted_dict()
-                    }
+                    },
+                    "unfinished_sections": "pages, files"  # only if the scan hit its time budget
                 }
 
         Example
@@ -675,17 +751,21 @@ class ContentExtractor(DownloaderMixin):
             "course_url": self.course_url,
             "course_name": self.course_name,
             "content": {
-                "documents": self.build_documents_dict(file_download_directory, flatten),
-                "videos": self.build_videos_dict(file_download_directory, flatten, check_video_site_caption_status),
-                "audio": self.build_audio_dict(file_download_directory, flatten),
-                "images": self.build_images_dict(file_download_directory, flatten),
+                "documents": self.build_documents_dict(file_download_directory, flatten, lazy),
+                "videos": self.build_videos_dict(file_download_directory, flatten, check_video_site_caption_status,
+                                                 lazy),
+                "audio": self.build_audio_dict(file_download_directory, flatten, lazy),
+                "images": self.build_images_dict(file_download_directory, flatten, lazy),
                 "other": {
-                    **self.build_digital_textbooks_dict(),
-                    **self.build_file_storage_dict(),
+                    **self.build_digital_textbooks_dict(lazy),
+                    **self.build_file_storage_dict(lazy),
                 },
-                "unsorted": self.build_unsorted_dict()
+                "unsorted": self.build_unsorted_dict(lazy)
             }
         }
+        # A scan stopped by its time budget is marked so partial inventories aren't mistaken for complete ones
+        if getattr(self, "unfinished_sections", None):
+            content_dict["unfinished_sections"] = ", ".join(self.unfinished_sections)
         return content_dict
 
     def get_all_content_as_json(self, file_download_directory: str = None, **params) -> str:
@@ -714,12 +794,54 @@ class ContentExtractor(DownloaderMixin):
         get_all_content : Returns dict instead of JSON string
         save_content_as_json : Saves JSON to file
         """
-        return json.dumps(self.get_all_content(file_download_directory, **params), indent=4, sort_keys=True, default=str)
+        return self.export_session(file_download_directory, **params).to_json()
 
     # =========================================================================
     # Export Methods
     # =========================================================================
 
+    def course_folder(self, directory: str):
+        """
+        The "{course_name} - {course_id}" folder of this course inside ``directory``.
+
+        Downloads, the Excel export and the JSON save paths all live under it.
+        Returns None if ``directory`` is None.
+        """
+        if not directory:
+            return None
+        return os.path.join(os.path.normpath(directory),
+                            rf"{sanitize_windows_filename(self.course_name)} - {self.course_id}")
+
+    def export_session(self, file_download_directory: str = None, **params) -> ExportSession:
+        """
+        Get the export session for a download directory and export settings.
+
+        The content inventory is built once per session, so the JSON, Excel
+        and Content Viewer exports of a run share it instead of each walking
+        the manifest again. Call this after the scan has finished.
+
+        Parameters
+        ----------
+        file_download_directory : str, optional
+            Course download folder for the 'save_path' fields (see
+            course_folder()). Pass None to omit paths.
+
+        **params : dict
+            flatten and check_video_site_caption_status, as for get_all_content().
+
+        Returns
+        -------
+        ExportSession
+            The cached session for these settings.
+        """
+        key = (os.path.normpath(file_download_directory) if file_download_directory else None,
+               bool(params.get("flatten", False)),
+               bool(params.get("check_video_site_caption_status", False)))
+        session = self._export_sessions.get(key)
+        if session is None:
+            session = self._export_sessions[key] = ExportSession(self, file_download_directory, **params)
+        return session
+
     def save_content_as_json(self, json_save_directory: str, file_download_directory: str = None,
                              **params) -> str:
         """
@@ -738,10 +860,14 @@ class ContentExtractor(DownloaderMixin):
             Base directory for file save paths in the JSON. Pass None to omit.
 
         **params : dict
-            Parameters passed to get_all_content_as_json():
+            Parameters passed to export_session():
             - flatten: bool - Flatten save paths
             - check_video_site_caption_status: bool - Check YouTube captions
 
+            Output options:
+            - json_compact: bool - Write without indentation
+            - json_lines: bool - Also write {course_id}.jsonl with one item per line
+
         Returns
         -------
         str or None
@@ -749,6 +875,8 @@ class ContentExtractor(DownloaderMixin):
 
         Notes
         -----
+        - The file is streamed item by item (core.json_writer); see
+          ExportSession.write_json for when the inventory is kept in memory
         - Overwrites existing file if present
         - Only executes if self.exists is True
         - Creates parent directories as needed
@@ -767,16 +895,16 @@ class ContentExtractor(DownloaderMixin):
                 json_save_directory = os.path.normpath(json_save_directory)
                 full_path = os.path.join(json_save_directory, rf"{self.course_id}.json")
 
-            if os.path.exists(full_path):
-                os.remove(full_path)
-
             if not os.path.exists(os.path.dirname(full_path)):
                 os.makedirs(os.path.dirname(full_path))
 
-            with open(full_path, 'w') as f:
-                f.write(self.get_all_content_as_json(file_download_directory, **params))
+            jsonl_path = os.path.splitext(full_path)[0] + ".jsonl" if params.get("json_lines") else None
+            self.export_session(file_download_directory, **params).write_json(
+                full_path, compact=params.get("json_compact", False), jsonl_path=jsonl_path)
 
             log.info(f"AUDIT: JSON export | course_id={self.course_id} | path={full_path}")
+            if jsonl_path:
+                log.info(f"AUDIT: JSON Lines export | course_id={self.course_id} | path={jsonl_path}")
             return full_path
         return None
 
@@ -810,6 +938,10 @@ class ContentExtractor(DownloaderMixin):
             check_video_site_caption_status : bool, default False
                 If True, check YouTube caption availability.
 
+            excel_streaming : bool, default False
+                If True, write the workbook with write-only (streaming) sheets.
+                Large inventories are streamed regardless (``excel.streaming_rows``).
+
         Notes
         -----
         - Creates course folder: {excel_directory}/{course_name} - {course_id}/
@@ -825,24 +957,94 @@ class ContentExtractor(DownloaderMixin):
         download_hidden_files = params.get("download_hidden_files", False)
 
         if self.exists:
-            excel_directory = os.path.normpath(excel_directory)
-            root_download_directory = os.path.join(excel_directory, rf"{sanitize_windows_filename(self.course_name)} "
-                                                              rf"- {self.course_id}")
-
-            if file_download_directory:
-                file_download_directory = os.path.normpath(file_download_directory)
-                root_file_download_directory = os.path.join(file_download_directory, rf"{sanitize_windows_filename(self.course_name)} "
-                                                                                     rf"- {self.course_id}")
-            else:
-                root_file_download_directory = None
+            root_download_directory = self.course_folder(excel_directory)
+            root_file_download_directory = self.course_folder(file_download_directory)
 
             if not os.path.exists(root_download_directory):
                 os.makedirs(root_download_directory)
-            json_data = json.loads(self.get_all_content_as_json(root_file_download_directory, **params))
+            json_data = self.export_session(root_file_download_directory, **params).export_data
 
-            save_as_excel(json_data, root_download_directory, download_hidden_files)
+            save_as_excel(json_data, root_download_directory, download_hidden_files,
+                          streaming=params.get("excel_streaming", False))
             log.info(f"AUDIT: Excel export | course_id={self.course_id} | path={root_download_directory}")
 
+    def save_content_to_index(self, index_path: str, **params) -> None:
+        """
+        Add the course's content inventory to a multi-course SQLite index.
+
+        The course's previous rows, if any, are replaced. Run after the
+        download so the course's download ledger is copied as well.
+
+        Parameters
+        ----------
+        index_path : str
+            The SQLite database file. Created if it doesn't exist.
+
+        **params : dict
+            download_folder : str, optional
+                If provided, save paths point to this location and the
+                course's download ledger is copied into the index.
+
+            flatten, check_video_site_caption_status :
+                As for export_session().
+
+        See Also
+        --------
+        core.content_index.ContentIndex : Schema and queries
+        """
+        if self.exists:
+            root_file_download_directory = self.course_folder(params.get("download_folder", None))
+            inventory = self.export_session(root_file_download_directory, **params).export_data
+            with ContentIndex(index_path) as index:
+                count = index.add_course(inventory, download_folder=root_file_download_directory)
+            log.info(f"AUDIT: Content index | course_id={self.course_id} | items={count} | path={index_path}")
+
+    def save_content_as_columnar(self, directory: str, **params) -> str:
+        """
+        Save the course's content rows as a Parquet or Arrow IPC file.
+
+        Writes ``{directory}/{course_id}.parquet`` (or ``.arrow``), one typed
+        row per content item. Every course of a batch goes into the same
+        directory, which analytics tools read as one table. Requires pyarrow.
+
+        Parameters
+        ----------
+        directory : str
+            The dataset directory. Created if it doesn't exist.
+
+        **params : dict
+            columnar_format : str, default "parquet"
+                ``parquet`` or ``arrow``.
+
+            download_folder : str, optional
+                If provided, save paths point to this location.
+
+            flatten, check_video_site_caption_status :
+                As for export_session().
+
+        Returns
+        -------
+        str or None
+            Path of the written file, or None if the course doesn't exist.
+
+        Raises
+        ------
+        ImportError
+            If pyarrow is not installed.
+
+        See Also
+        --------
+        core.columnar_export : Columns and types
+        """
+        if self.exists:
+            root_file_download_directory = self.course_folder(params.get("download_folder", None))
+            inventory = self.export_session(root_file_download_directory, **params).content
+            path = write_content_table(inventory, os.path.normpath(directory),
+                                       params.get("columnar_format") or "parquet")
+            log.info(f"AUDIT: Columnar export | course_id={self.course_id} | path={path}")
+            return path
+        return None
+
     # =========================================================================
     # Download Methods
     # =========================================================================
@@ -880,15 +1082,25 @@ class ContentExtractor(DownloaderMixin):
             download_hidden_files : bool, default False
                 If True, include hidden/unpublished content.
 
+            download_workers : int, optional
+                Number of concurrent downloads (default from config.yaml).
+
+            max_rate : float, optional
+                Combined download rate cap in MB/s (default from config.yaml).
+
+            dry_run : bool, default False
+                If True, print the download plan, disk check and estimated
+                duration without downloading anything.
+
             flush_after_download : bool, default False
                 If True, delete all downloaded files after processing.
                 Use with caution - this is destructive.
 
         Notes
         -----
-        - Creates download_manifest.yaml in the course folder to track progress
-        - Skips files already in the manifest
-        - Creates Windows shortcuts (.lnk) for files that fail to download
+        - Creates the .manifest folder and tracks progress in its download ledger
+        - Skips files already recorded in the ledger
+        - Creates shortcuts (.url, .lnk or .desktop) for files that fail to download
         - Only executes if self.exists is True
 
         Example
@@ -903,12 +1115,11 @@ class ContentExtractor(DownloaderMixin):
 
         if self.exists:
             directory = os.path.normpath(directory)
-            root_download_directory = os.path.join(directory, rf"{sanitize_windows_filename(self.course_name)} "
-                                                              rf"- {self.course_id}")
+            root_download_directory = self.course_folder(directory)
             create_download_manifest(root_download_directory)
             self.download(self, root_download_directory, **params)
 
-            if flush_after_download:
+            if flush_after_download and not params.get("dry_run"):
                 self.clear_folder_contents(directory)
 
     def clear_folder_contents(self, directory: str) -> None:
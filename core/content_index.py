@@ -0,0 +1,362 @@
+"""
+Content Index
+=============
+
+One SQLite database holding the content inventory of every course it has been
+given, so cross-course questions are SQL queries instead of reparsing one
+JSON or Excel file per course.
+
+Batch runs (``--course_id_list``, the GUI's multi-course loop,
+``tools.stats.count_course_content``) add each course as it finishes. Adding
+a course again replaces its rows, so the index always holds the latest scan
+of each course.
+
+Schema
+------
+``courses``: one row per course::
+
+    course_id            TEXT PRIMARY KEY
+    course_name          TEXT
+    course_url           TEXT
+    indexed_at           TEXT     -- ISO timestamp of the last add_course()
+    unfinished_sections  TEXT     -- set when the scan hit its time budget
+    item_count           INTEGER
+
+``resources``: the Canvas pages, modules, assignments... content was found on::
+
+    id          INTEGER PRIMARY KEY
+    course_id   TEXT
+    type        TEXT     -- source_page_type (Page, Module, Assignment, ...)
+    url         TEXT     -- source_page_url; unique per course
+    title       TEXT
+
+``content_items``: one row per item of every content list::
+
+    id           INTEGER PRIMARY KEY
+    course_id    TEXT
+    resource_id  INTEGER  -- resources.id
+    category     TEXT     -- the list it came from: documents, video_sites, ...
+    type         TEXT     -- node class for videos, otherwise the category
+    title, url, host, file_type, file_name, download_url, save_path TEXT
+    is_hidden    INTEGER  -- 0 / 1
+    position     INTEGER  -- "order" in the JSON export
+    scan_date    TEXT
+    path         TEXT     -- JSON list of titles, item first
+    extra        TEXT     -- JSON object of any other keys
+
+``captions``: caption status of video items::
+
+    item_id            INTEGER PRIMARY KEY  -- content_items.id
+    course_id          TEXT
+    is_captioned       INTEGER
+    machine_captioned  INTEGER
+    caption_status     TEXT     -- YouTube check result, when run
+
+``downloads``: copied from the course's download ledger, when the course was
+downloaded (same columns as core.download_ledger, plus ``course_id``).
+
+``content_items`` is indexed on type, category, host, file_type, is_hidden
+and course_id; ``downloads`` on url.
+
+Example
+-------
+    SELECT c.course_name, COUNT(*) FROM content_items i
+    JOIN courses c USING (course_id)
+    WHERE i.category = 'video_sites' AND i.host LIKE '%youtube%' AND i.is_hidden = 0
+    GROUP BY c.course_id;
+
+See Also
+--------
+- core.content_extractor.ContentExtractor.save_content_to_index : Adds a scanned course
+- core.download_ledger : Source of the downloads table
+"""
+
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+from core.download_ledger import LEDGER_FILENAME
+
+log = logging.getLogger(__name__)
+
+# Default file name, used by the GUI in its output folder
+INDEX_FILENAME = "content_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    course_id           TEXT PRIMARY KEY,
+    course_name         TEXT,
+    course_url          TEXT,
+    indexed_at          TEXT,
+    unfinished_sections TEXT,
+    item_count          INTEGER
+);
+CREATE TABLE IF NOT EXISTS resources (
+    id        INTEGER PRIMARY KEY,
+    course_id TEXT NOT NULL,
+    type      TEXT,
+    url       TEXT,
+    title     TEXT,
+    UNIQUE (course_id, url)
+);
+CREATE TABLE IF NOT EXISTS content_items (
+    id           INTEGER PRIMARY KEY,
+    course_id    TEXT NOT NULL,
+    resource_id  INTEGER REFERENCES resources (id),
+    category     TEXT NOT NULL,
+    type         TEXT,
+    title        TEXT,
+    url          TEXT,
+    host         TEXT,
+    file_type    TEXT,
+    file_name    TEXT,
+    download_url TEXT,
+    save_path    TEXT,
+    is_hidden    INTEGER,
+    position     INTEGER,
+    scan_date    TEXT,
+    path         TEXT,
+    extra        TEXT
+);
+CREATE INDEX IF NOT EXISTS content_items_course ON content_items (course_id);
+CREATE INDEX IF NOT EXISTS content_items_type ON content_items (type);
+CREATE INDEX IF NOT EXISTS content_items_category ON content_items (category);
+CREATE INDEX IF NOT EXISTS content_items_host ON content_items (host);
+CREATE INDEX IF NOT EXISTS content_items_file_type ON content_items (file_type);
+CREATE INDEX IF NOT EXISTS content_items_hidden ON content_items (is_hidden);
+CREATE TABLE IF NOT EXISTS captions (
+    item_id           INTEGER PRIMARY KEY REFERENCES content_items (id),
+    course_id         TEXT NOT NULL,
+    is_captioned      INTEGER,
+    machine_captioned INTEGER,
+    caption_status    TEXT
+);
+CREATE TABLE IF NOT EXISTS downloads (
+    course_id     TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    result        TEXT,
+    path          TEXT,
+    size          INTEGER,
+    sha256        TEXT,
+    file_id       TEXT,
+    version       TEXT,
+    downloaded_at TEXT,
+    PRIMARY KEY (course_id, url)
+);
+CREATE INDEX IF NOT EXISTS downloads_url ON downloads (url);
+"""
+
+# Item keys stored in their own columns; everything else goes to ``extra``
+_ITEM_COLUMNS = ("title", "url", "file_type", "file_name", "download_url", "save_path", "is_hidden",
+                 "order", "scan_date", "path", "source_page_type", "source_page_url", "class",
+                 "is_captioned", "machine_captioned", "caption_status")
+
+_CAPTION_KEYS = ("is_captioned", "machine_captioned", "caption_status")
+
+_LEDGER_COLUMNS = ("url", "result", "path", "size", "sha256", "file_id", "version", "downloaded_at")
+
+_COURSE_TABLES = ("captions", "content_items", "resources", "downloads", "courses")
+
+
+def content_lists(inventory: dict):
+    """Yield ``(category, items)`` for every content list in an inventory, e.g. ``("documents", [...])``."""
+    for value in inventory.get("content", {}).values():
+        for category, items in value.items():
+            if isinstance(items, list):
+                yield category, items
+
+
+def content_rows(inventory: dict):
+    """
+    Yield one flat dict per content item of an inventory.
+
+    Each row has the course, the list the item came from (``category``), its
+    ``type`` (node class for videos, otherwise the category), the resource it
+    was found on and the item fields. Keys without a column of their own are
+    collected in ``extra``. Values are passed through unconverted.
+    """
+    course_id = str(inventory.get("course_id"))
+    for category, items in content_lists(inventory):
+        for item in items:
+            path = item.get("path") or []
+            url = item.get("url")
+            yield {
+                "course_id": course_id,
+                "category": category,
+                "type": item.get("class") or category,
+                "title": item.get("title"),
+                "url": url,
+                "host": _host(url),
+                "file_type": item.get("file_type"),
+                "file_name": item.get("file_name"),
+                "download_url": item.get("download_url"),
+                "save_path": item.get("save_path"),
+                "is_hidden": item.get("is_hidden"),
+                "position": item.get("order"),
+                "scan_date": item.get("scan_date"),
+                "path": path,
+                "resource_type": item.get("source_page_type"),
+                "resource_url": item.get("source_page_url"),
+                # path runs from the item up to the course, so the next title is its page
+                "resource_title": path[1] if len(path) > 1 else None,
+                "has_captions": any(key in item for key in _CAPTION_KEYS),
+                "is_captioned": item.get("is_captioned"),
+                "machine_captioned": item.get("machine_captioned"),
+                "caption_status": item.get("caption_status"),
+                "extra": {key: value for key, value in item.items() if key not in _ITEM_COLUMNS},
+            }
+
+
+def _host(url):
+    try:
+        return urlparse(url).hostname if url else None
+    except ValueError:
+        return None
+
+
+def _flag(value):
+    return None if value is None else int(bool(value))
+
+
+def _text(value):
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+class ContentIndex:
+
+    """
+    Multi-course SQLite content index.
+
+    Usage::
+
+        with ContentIndex("content_index.sqlite") as index:
+            index.add_course(inventory, download_folder=course_folder)
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __contains__(self, course_id) -> bool:
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM courses WHERE course_id = ?",
+                                            (str(course_id),)).fetchone() is not None
+
+    def add_course(self, inventory: dict, download_folder: str = None) -> int:
+        """
+        Replace the rows of one course with ``inventory``, in one transaction.
+
+        Parameters
+        ----------
+        inventory : dict
+            The course's inventory in its JSON form (``ExportSession.export_data``).
+
+        download_folder : str, optional
+            The course's download folder. Its download ledger, if there is one,
+            is copied into the ``downloads`` table.
+
+        Returns
+        -------
+        int
+            The number of content items added.
+        """
+        course_id = str(inventory["course_id"])
+        count = 0
+        with self._lock, self._connection:
+            self.remove_course(course_id, commit=False)
+            resources = {}
+
+            for row in content_rows(inventory):
+                resource_id = self._resource_id(resources, course_id, row)
+                cursor = self._connection.execute(
+                    "INSERT INTO content_items (course_id, resource_id, category, type, title, url, host, "
+                    "file_type, file_name, download_url, save_path, is_hidden, position, scan_date, path, extra) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (course_id, resource_id, row["category"], row["type"], row["title"], row["url"], row["host"],
+                     row["file_type"], row["file_name"], row["download_url"], row["save_path"],
+                     _flag(row["is_hidden"]), row["position"], _text(row["scan_date"]), _text(row["path"]),
+                     json.dumps(row["extra"]) if row["extra"] else None))
+                if row["has_captions"]:
+                    self._connection.execute(
+                        "INSERT INTO captions (item_id, course_id, is_captioned, machine_captioned, caption_status) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (cursor.lastrowid, course_id, _flag(row["is_captioned"]),
+                         _flag(row["machine_captioned"]), _text(row["caption_status"])))
+                count += 1
+
+            self._connection.execute(
+                "INSERT INTO courses (course_id, course_name, course_url, indexed_at, unfinished_sections, item_count) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (course_id, inventory.get("course_name"), inventory.get("course_url"),
+                 datetime.now().isoformat(timespec="seconds"), inventory.get("unfinished_sections"), count))
+
+            if download_folder:
+                self._copy_ledger(course_id, download_folder)
+        return count
+
+    def remove_course(self, course_id, commit: bool = True):
+        """Delete every row of ``course_id``."""
+        with self._lock:
+            for table in _COURSE_TABLES:
+                self._connection.execute(f"DELETE FROM {table} WHERE course_id = ?", (str(course_id),))
+            if commit:
+                self._connection.commit()
+
+    def query(self, sql: str, parameters=()) -> list:
+        """Run a read query and return the rows as dicts."""
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, parameters)]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _resource_id(self, resources: dict, course_id: str, row: dict):
+        url = row["resource_url"]
+        if url is None:
+            return None
+        if url not in resources:
+            cursor = self._connection.execute(
+                "INSERT INTO resources (course_id, type, url, title) VALUES (?, ?, ?, ?)",
+                (course_id, row["resource_type"], url, row["resource_title"]))
+            resources[url] = cursor.lastrowid
+        return resources[url]
+
+    def _copy_ledger(self, course_id: str, download_folder: str):
+        """Copy the rows of the course's download ledger into ``downloads``, read-only."""
+        ledger_path = os.path.join(download_folder, ".manifest", LEDGER_FILENAME)
+        if not os.path.exists(ledger_path):
+            return
+        try:
+            ledger = sqlite3.connect(f"{pathlib.Path(os.path.abspath(ledger_path)).as_uri()}?mode=ro", uri=True)
+            try:
+                available = {row[1] for row in ledger.execute("PRAGMA table_info(downloads)")}
+                columns = [column for column in _LEDGER_COLUMNS if column in available]
+                rows = ledger.execute(f"SELECT {', '.join(columns)} FROM downloads").fetchall()
+            finally:
+                ledger.close()
+        except sqlite3.Error as exc:
+            log.warning(f"Could not read download ledger {ledger_path}: {exc}")
+            return
+        self._connection.executemany(
+            f"INSERT OR REPLACE INTO downloads (course_id, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})",
+            ((course_id, *row) for row in rows))
@@ -1,8 +1,8 @@
-from datetime import datetime
 from typing import List
 from urllib.parse import unquote_plus
 
 from core.downloader import path_constructor, derive_file_name
+from core.row_model import RowModel
 from tools.captioning_check import get_youtube_caption_info
 from tools.string_checking.other_tools import get_extension_from_filename, get_extension_from_mime_type
 
@@ -176,62 +176,58 @@ def main_dict(**items) -> dict:
 
 
 
-def document_dict(document_node, file_download_directory, flatten):
+def row_fields(node, rows: RowModel = None) -> dict:
+    """
+    The fields every content dict shares, from the node's ``NodeRow``.
+
+    Pass the extractor's ``RowModel`` so the ancestor walk is shared between
+    rows; without one a throwaway model is used.
+    """
+    row = (rows or RowModel()).row(node)
+    return {
+        "title": row.title,
+        "url": row.url,
+        "source_page_type": row.source_page_type,
+        "source_page_url": row.source_page_url,
+        "scan_date": row.scan_date,
+        "is_hidden": row.is_hidden,
+        "order": row.order,
+        "path": list(row.path),
+    }
+
+
+def document_dict(document_node, file_download_directory, flatten, rows: RowModel = None):
 
     document_dict = {
 
-        "title": getattr(document_node, "title", None),
-        "url": getattr(document_node, "url", None),
-        "source_page_type": document_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(document_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(document_node),
+        **row_fields(document_node, rows),
         "file_type": get_file_type(document_node),
-        "order": get_order(document_node),
-        "path": [node.title for node in build_path(document_node, ignore_root=True) if node.title is not None],
     }
 
     if file_download_directory:
-        document_dict["save_path"] = path_constructor(file_download_directory, document_node, flatten)
+        document_dict["save_path"] = path_constructor(file_download_directory, document_node, flatten, rows)
 
     return document_dict
 
 
-def document_site_dict(document_site_node):
+def document_site_dict(document_site_node, rows: RowModel = None):
 
     document_site_dict = {
 
-        "title": getattr(document_site_node, "title", None),
+        **row_fields(document_site_node, rows),
         "file_name": derive_file_name(document_site_node),
-        "url": getattr(document_site_node, "url", None),
-        "source_page_type": document_site_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(document_site_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(document_site_node),
-        "order": get_order(document_site_node),
-        "path": [node.title for node in build_path(document_site_node, ignore_root=True) if node.title is not None],
 
     }
     return document_site_dict
 
 
 
-def video_site_dict(video_site_node, check_caption_status):
+def video_site_dict(video_site_node, check_caption_status, rows: RowModel = None):
 
     video_site_dict = {
 
-        "title": getattr(video_site_node, "title", None),
-        "url": getattr(video_site_node, "url", None),
-        "source_page_type": video_site_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(video_site_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(video_site_node),
-        "order": get_order(video_site_node),
+        **row_fields(video_site_node, rows),
         "is_captioned": getattr(video_site_node, "captioned", False),
-        "path": [node.title for node in build_path(video_site_node, ignore_root=True) if node.title is not None],
         "class": video_site_node.__class__.__name__,
 
 
@@ -243,25 +239,17 @@ def video_site_dict(video_site_node, check_caption_status):
     return video_site_dict
 
 
-def video_file_dict(video_file_node, file_download_directory, flatten):
+def video_file_dict(video_file_node, file_download_directory, flatten, rows: RowModel = None):
 
     # check_if_canvas_media_in_shell(video_file_node)
 
     video_file_dict = {
 
-        "title": getattr(video_file_node, "title", None),
+        **row_fields(video_file_node, rows),
         "file_name": derive_file_name(video_file_node),
-        "url": getattr(video_file_node, "url", None),
-        "source_page_type": video_file_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(video_file_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(video_file_node),
         "file_type": get_file_type(video_file_node),
-        "order": get_order(video_file_node),
         "is_captioned": getattr(video_file_node, "captioned", False),
         "download_url": getattr(video_file_node, "download_url", getattr(video_file_node, "url", None)),
-        "path": [node.title for node in build_path(video_file_node, ignore_root=True) if node.title is not None],
         "class": video_file_node.__class__.__name__,
 
     }
@@ -277,7 +265,7 @@ def video_file_dict(video_file_node, file_download_directory, flatten):
         video_file_dict['canvas_media_id'] = video_file_node.media_id
 
     if file_download_directory:
-        video_file_dict["save_path"] = path_constructor(file_download_directory, video_file_node, flatten)
+        video_file_dict["save_path"] = path_constructor(file_download_directory, video_file_node, flatten, rows)
 
     if video_file_node.is_canvas_studio_file:
         video_file_dict["canvas_studio_id"] = getattr(video_file_node, 'id', None)
@@ -296,136 +284,58 @@ def video_file_dict(video_file_node, file_download_directory, flatten):
     return video_file_dict
 
 
-def audio_file_dict(audio_file_node, file_download_directory, flatten):
+def audio_file_dict(audio_file_node, file_download_directory, flatten, rows: RowModel = None):
 
     audio_file_dict = {
 
-        "title": getattr(audio_file_node, "title", None),
+        **row_fields(audio_file_node, rows),
         "file_name": derive_file_name(audio_file_node),
-        "url": getattr(audio_file_node, "url", None),
-        "source_page_type": audio_file_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(audio_file_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(audio_file_node),
         "file_type": get_file_type(audio_file_node),
-        "order": get_order(audio_file_node),
-        "path": [node.title for node in build_path(audio_file_node, ignore_root=True) if node.title is not None],
     }
 
     if file_download_directory:
-        audio_file_dict["save_path"] = path_constructor(file_download_directory, audio_file_node, flatten)
+        audio_file_dict["save_path"] = path_constructor(file_download_directory, audio_file_node, flatten, rows)
 
     return audio_file_dict
 
 
-def audio_site_dict(audio_site_node):
+def audio_site_dict(audio_site_node, rows: RowModel = None):
 
-    audio_site_dict = {
-
-        "title": getattr(audio_site_node, "title", None),
-        "url": getattr(audio_site_node, "url", None),
-        "source_page_type": audio_site_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(audio_site_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(audio_site_node),
-        "order": get_order(audio_site_node),
-        "path": [node.title for node in build_path(audio_site_node, ignore_root=True) if node.title is not None],
-
-    }
-    return audio_site_dict
+    return row_fields(audio_site_node, rows)
 
 
 
-def image_file_dict(image_file_node, file_download_directory, flatten):
+def image_file_dict(image_file_node, file_download_directory, flatten, rows: RowModel = None):
 
     image_file_dict = {
 
-        "title": getattr(image_file_node, "title", None),
+        **row_fields(image_file_node, rows),
         "file_name": derive_file_name(image_file_node),
-        "url": getattr(image_file_node, "url", None),
-        "source_page_type": image_file_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(image_file_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(image_file_node),
         "file_type": get_file_type(image_file_node),
-        "order": get_order(image_file_node),
-        "path": [node.title for node in build_path(image_file_node, ignore_root=True) if node.title is not None],
     }
 
     if file_download_directory:
-        image_file_dict["save_path"] = path_constructor(file_download_directory, image_file_node, flatten)
+        image_file_dict["save_path"] = path_constructor(file_download_directory, image_file_node, flatten, rows)
 
     return image_file_dict
 
 
 
-def digital_textbook_dict(node):
+def digital_textbook_dict(node, rows: RowModel = None):
 
-    digital_textbook_dict = {
+    return row_fields(node, rows)
 
-        "title": getattr(node, "title", None),
-        "url": getattr(node, "url", None),
-        "source_page_type": node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(node),
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(node),
-        "order": get_order(node),
-        "path": [n.title for n in build_path(node, ignore_root=True) if n.title is not None],
 
-    }
-    return digital_textbook_dict
+def institution_video_dict(node, rows: RowModel = None):
 
+    return row_fields(node, rows)
 
-def institution_video_dict(node):
 
-    institution_video_dict = {
+def file_storage_dict(node, rows: RowModel = None):
 
-        "title": getattr(node, "title", None),
-        "url": getattr(node, "url", None),
-        "source_page_type": node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(node),
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(node),
-        "order": get_order(node),
-        "path": [n.title for n in build_path(node, ignore_root=True) if n.title is not None],
+    return row_fields(node, rows)
 
-    }
-    return institution_video_dict
 
+def unsorted_dict(unsorted_node, rows: RowModel = None):
 
-def file_storage_dict(node):
-
-    file_storage_dict = {
-
-        "title": getattr(node, "title", None),
-        "url": getattr(node, "url", None),
-        "source_page_type": node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(node),
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(node),
-        "order": get_order(node),
-        "path": [n.title for n in build_path(node, ignore_root=True) if n.title is not None],
-
-    }
-    return file_storage_dict
-
-
-def unsorted_dict(unsorted_node):
-
-    unsorted_dict = {
-
-        "title": getattr(unsorted_node, "title", None),
-        "url": getattr(unsorted_node, "url", None),
-        "source_page_type": unsorted_node.parent.__class__.__name__,
-        "source_page_url": get_source_page_url(unsorted_node),
-        # "source_page_title": document_node.parent.html_url,
-        "scan_date": datetime.now(),
-        "is_hidden": is_hidden(unsorted_node),
-        "order": get_order(unsorted_node),
-        "path": [node.title for node in build_path(unsorted_node, ignore_root=True) if node.title is not None],
-
-    }
-    return unsorted_dict
\ No newline at end of file
+    return row_fields(unsorted_node, rows)
@@ -0,0 +1,191 @@
+"""
+Content Store
+=============
+
+Deduplication helpers for the downloader.
+
+The same syllabus or lecture video is often linked from a module, an
+assignment and a page. Each reference gets its own path from
+``path_constructor``, so without deduplication the file is downloaded once
+per reference. Files are identified by a content key:
+
+- Canvas files use their file id, taken from the API payload or from a
+  ``/files/{id}`` link, so different URLs for one file share a key.
+- Every other URL is its own key.
+
+Within one run, the first reference to a key is downloaded and the rest wait
+for it, then get a copy of it.
+
+Copies are the default because course files are often remediated in place: a
+hardlinked copy would carry that edit into every other folder. With
+``downloads.hardlink_duplicates`` set, references within a run are hardlinked
+instead (falling back to a copy where the file system does not support
+hardlinks), and a new download whose content hash matches a file downloaded
+earlier in the same run is replaced with a hardlink to it. Content hashes are
+only known after a download, so identical external files still transfer once
+each.
+
+Across runs the download ledger serves as the content-addressed index: a
+Canvas file id that is already on disk is copied instead of fetched. Files
+from earlier runs may have been remediated or edited in place, so they are
+only reused while they still match the ledger (``matches_record``: same size
+and SHA-256), and they are copied rather than hardlinked, so a later edit to
+one copy does not change the others.
+
+The first downloaded copy serves as the stored object, so no separate store
+directory is needed.
+
+See Also
+--------
+- core.download_ledger.DownloadLedger : find_by_file_id() / find_by_sha256()
+- core.downloader.DownloaderMixin.download : Schedules primaries and copies
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+
+from config.yaml_io import read_config
+from core.download_engine import host_group
+from core.file_writer import hash_file
+from core.shortcuts import is_shortcut
+
+log = logging.getLogger(__name__)
+
+_CANVAS_FILE_ID_RE = re.compile(r"/files/(\d+)")
+
+# Hardlink duplicates within a run instead of copying them; an in-place edit then changes every linked copy
+HARDLINK_DUPLICATES = bool(read_config().get('downloads', {}).get('hardlink_duplicates', False))
+
+
+def canvas_file_id(node):
+    """Return the Canvas file id of a content node, or None if it is not a Canvas file."""
+    if getattr(node, 'is_canvas_studio_file', False):
+        return None
+    if getattr(node, 'api_dict', None) and node.api_dict.get('id'):
+        return str(node.api_dict['id'])
+    url = getattr(node, 'url', None) or ''
+    if host_group(url) == 'canvas':
+        match = _CANVAS_FILE_ID_RE.search(url)
+        if match:
+            return match.group(1)
+    return None
+
+
+def content_key(node) -> str:
+    """Key that is equal for nodes that download the same content."""
+    file_id = canvas_file_id(node)
+    if file_id:
+        return f"file:{file_id}"
+    return f"url:{getattr(node, 'download_url', None) or node.url}"
+
+
+def usable_copy(path) -> bool:
+    """True if ``path`` is an existing downloaded file (not a shortcut) that can be linked from."""
+    return bool(path) and not is_shortcut(path) and os.path.isfile(path)
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a file on disk."""
+    digest = hashlib.sha256()
+    hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def matches_record(path, record: dict, check_hash: bool = True) -> bool:
+    """
+    True if ``path`` is a usable copy that still holds the content the ledger
+    recorded for it.
+
+    The size must match ``record['size']``, and with ``check_hash`` the
+    SHA-256 must match ``record['sha256']``. A record with neither is never
+    trusted, since an edit could not be detected.
+    """
+    if not usable_copy(path):
+        return False
+    size, sha256 = record.get('size'), record.get('sha256')
+    if size is None and sha256 is None:
+        return False
+    try:
+        if size is not None and os.path.getsize(path) != size:
+            log.info(f"Not reusing {path}: its size changed since it was downloaded")
+            return False
+        if check_hash and sha256 is not None and file_sha256(path) != sha256:
+            log.info(f"Not reusing {path}: its content changed since it was downloaded")
+            return False
+    except OSError as exc:
+        log.debug(f"Could not check {path}: {exc}")
+        return False
+    return True
+
+
+def link_or_copy(source: str, destination: str, hardlink: bool = True) -> str:
+    """
+    Place ``source`` at ``destination`` as a hardlink, falling back to a copy.
+
+    The link or copy is made under a temporary name and moved onto
+    ``destination``, so an existing file there is only replaced once the new
+    one is complete.
+
+    Parameters
+    ----------
+    hardlink : bool
+        False to always copy.
+
+    Returns
+    -------
+    str
+        ``"hardlink"`` or ``"copy"``.
+
+    Raises
+    ------
+    OSError
+        If neither a hardlink nor a copy could be made.
+    """
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp_path = f"{destination}.link"
+    method = "copy"
+    try:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        if hardlink:
+            try:
+                os.link(source, temp_path)
+                method = "hardlink"
+            except OSError as exc:
+                log.debug(f"Hardlink failed, copying instead: {source} -> {destination} | {exc}")
+        if method == "copy":
+            shutil.copy2(source, temp_path)
+        os.replace(temp_path, destination)
+        return method
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def replace_with_hardlink(source: str, destination: str) -> bool:
+    """
+    Replace ``destination`` with a hardlink to ``source``, an identical file.
+
+    Returns False, leaving ``destination`` untouched, if the file system does
+    not support hardlinks between the two paths.
+    """
+    if os.path.normcase(os.path.abspath(source)) == os.path.normcase(os.path.abspath(destination)):
+        return False
+    temp_path = f"{destination}.link"
+    try:
+        os.link(source, temp_path)
+        os.replace(temp_path, destination)
+        return True
+    except OSError as exc:
+        log.debug(f"Could not hardlink duplicate {destination} to {source}: {exc}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
@@ -2,11 +2,13 @@ from colorama import Fore, Style, init
 import os, sys, warnings
 from core.content_extractor import ContentExtractor
 from core.manifest import Manifest
+from core.scan_profiles import get_scan_profile
 from network.cred import set_canvas_studio_api_key_to_environment_variable
 from resource_nodes.canvas_studio import CanvasStudio
 from tools.canvas_tree import CanvasTree
 
 from network.api import get_course
+from network.scan_budget import start_course_budget, end_course_budget, default_course_time_limit, ScanBudgetExceeded
 from resource_nodes.announcements import Announcements
 from resource_nodes.assignments import Assignments
 from resource_nodes.discussions import Discussions
@@ -25,15 +27,30 @@ import tools.logger
 log = logging.getLogger(__name__)
 
 
+# Course sections in import order (root attribute name, resource container class)
+SCAN_SECTIONS = (
+    ('modules', Modules),
+    ('quizzes', Quizzes),
+    ('assignments', Assignments),
+    ('announcements', Announcements),
+    ('discussions', Discussions),
+    ('pages', Pages),
+    ('files', CanvasFiles),
+    ('media_objects', CanvasMediaObjects),
+)
+
 
 class CanvasCourseRoot(ContentExtractor):
 
 
-    def __init__(self, course_id):
+    def __init__(self, course_id, headless=False, scan_profile=None, course_time_limit=None):
 
         self.course_id = course_id
+        self.scan_profile = get_scan_profile(scan_profile)
+        self.course_time_limit = course_time_limit if course_time_limit is not None else default_course_time_limit()
+        self.unfinished_sections = []
         self.course_url = f"{os.environ.get('CANVAS_COURSE_PAGE_ROOT')}/{self.course_id}"
-        self.canvas_tree = CanvasTree()
+        self.canvas_tree = CanvasTree(headless=headless)
         self.manifest = Manifest()
         self.root_node = True
         self.title = None
@@ -56,7 +73,11 @@ class CanvasCourseRoot(ContentExtractor):
             self.exists = True
             print(f"\nStarting import for {self.title} | {self.course_url}\n")
             log.info(f"AUDIT: Course scan start | course_id={self.course_id} | title={self.title} | url={self.course_url}")
-            self._init_modules_root()
+            start_course_budget(self.course_time_limit)
+            try:
+                self._init_modules_root()
+            finally:
+                end_course_budget()
 
         if not course_api:
             log.warning(f"Course API: {self.course_id} Doesn't Exist")
@@ -65,29 +86,32 @@ class CanvasCourseRoot(ContentExtractor):
     def _init_modules_root(self):
 
         self.canvas_tree.init_node(self)
+        profile = self.scan_profile
 
+        sections = []
         if os.environ.get('studio_enabled') != 'True':
             print("Canvas Studio is not enabled. Skipping Canvas Studio Import")
+        elif not profile.section_enabled('canvas_studio'):
+            print(f"Skipping Canvas Studio Import (scan profile: {profile.name})")
         elif not set_canvas_studio_api_key_to_environment_variable():
             print("Canvas Studio is enabled but credentials could not be loaded. Skipping Canvas Studio Import")
         else:
-            self.canvas_studio = CanvasStudio(self.course_id, self)
-
-        self.modules = Modules(self.course_id, self)
-
-        self.quizzes = Quizzes(self.course_id, self)
-
-        self.assignments = Assignments(self.course_id, self)
-
-        self.announcements = Announcements(self.course_id, self)
-
-        self.discussions = Discussions(self.course_id, self)
-
-        self.pages = Pages(self.course_id, self)
+            sections.append(('canvas_studio', CanvasStudio))
 
-        self.files = CanvasFiles(self.course_id, self)
+        sections += [(name, section) for name, section in SCAN_SECTIONS if profile.section_enabled(name)]
 
-        self.media_objects = CanvasMediaObjects(self.course_id, self)
+        for index, (name, section) in enumerate(sections):
+            try:
+                setattr(self, name, section(self.course_id, self))
+            except ScanBudgetExceeded:
+                # Keep what was collected; the interrupted section is partial, the rest were never started
+                self.unfinished_sections = [unfinished for unfinished, _ in sections[index:]]
+                print(f"\n{Fore.YELLOW}Time budget of {self.course_time_limit}s reached. "
+                      f"Unfinished sections: {', '.join(self.unfinished_sections)}. "
+                      f"Exporting partial results.{Style.RESET_ALL}")
+                log.warning(f"AUDIT: Course scan budget exceeded | course_id={self.course_id} | "
+                            f"unfinished={self.unfinished_sections}")
+                break
 
 
         from tools.warning_collector import get_collector
@@ -95,3 +119,32 @@ class CanvasCourseRoot(ContentExtractor):
 
         log.info(f"AUDIT: Course scan complete | course_id={self.course_id} | items={len(self.manifest.content_list())}")
         print("Import Complete\n")
+        profile.print_report()
+
+        try:
+            self.save_snapshot()
+        except (OSError, TypeError, ValueError) as exc:
+            log.warning(f"Could not save course snapshot for {self.course_id}: {exc}")
+
+    def save_snapshot(self, path=None):
+        """
+        Save the scanned course tree and manifest to a snapshot file.
+
+        Defaults to ``%APPDATA%/canvas bot/snapshots/{course_id}.cbsnap``.
+        Returns the path written.
+        """
+        from core.snapshot import default_snapshot_path, write_snapshot
+        return write_snapshot(self, path or default_snapshot_path(self.course_id))
+
+    def load_snapshot(self, path=None):
+        """
+        Rebuild the course tree and manifest from a snapshot without any API calls.
+
+        Raises FileNotFoundError if no snapshot exists and ValueError if the
+        file is not a readable snapshot.
+        """
+        from core.snapshot import default_snapshot_path, read_snapshot_document, restore_snapshot
+        path = path or default_snapshot_path(self.course_id)
+        restore_snapshot(self, read_snapshot_document(path))
+        log.info(f"AUDIT: Course loaded from snapshot | course_id={self.course_id} | items={len(self.manifest.content_list())} | path={path}")
+        print(f"\nLoaded {self.title} from snapshot | {path}\n")
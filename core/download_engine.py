@@ -0,0 +1,299 @@
+"""
+Download Engine
+===============
+
+Runs file downloads on a worker pool while capping how many connections are
+open to any one host.
+
+Hosts are grouped so each kind of server gets its own limit:
+
+- ``canvas``   : Canvas file hosts (``*.instructure.com``, ``inscloudgate.net``)
+- ``studio``   : Canvas Studio / media CDN (``*.instructuremedia.com``)
+- ``external`` : everything else (each external host gets its own limit)
+
+A job whose host is at its limit waits in that host's queue, not on a pool
+worker, and is handed to the pool when one of the host's jobs finishes. Jobs
+for a saturated host (Studio's limit is 2) therefore never hold workers that
+Canvas transfers could use.
+
+Progress output from the workers is buffered per item and printed in item
+order by ``OrderedPrinter``, so the ``[n/total]`` lines stay readable no matter
+which download finishes first.
+
+Bandwidth can be capped with token buckets shared by all workers: one for the
+whole run (``downloads.max_rate_mb_per_second`` or ``--max-rate``) and one per
+host, sized by host group (``downloads.host_max_rate_mb_per_second``). A worker
+that writes a chunk takes that many tokens from both buckets and sleeps when
+they run dry, so the combined rate stays at the limit however many workers
+are running.
+
+Defaults come from ``downloads`` in ``config/config.yaml``.
+
+See Also
+--------
+- core.downloader.DownloaderMixin.download : Builds the jobs and aggregates stats
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
+
+from config.yaml_io import read_config
+
+log = logging.getLogger(__name__)
+
+_download_config = read_config().get('downloads', {})
+
+DEFAULT_DOWNLOAD_WORKERS = _download_config.get('workers', 4)
+DEFAULT_HOST_LIMITS = {'canvas': 4, 'studio': 2, 'external': 2, **_download_config.get('host_limits', {})}
+DEFAULT_MAX_RATE = _download_config.get('max_rate_mb_per_second') or None
+DEFAULT_HOST_MAX_RATES = _download_config.get('host_max_rate_mb_per_second') or {}
+
+MEGABYTE = 1048576
+
+
+def host_group(url: str) -> str:
+    """Classify a download URL as 'canvas', 'studio' or 'external'."""
+    host = (urlparse(url).hostname or '').lower()
+    studio_domain = (os.environ.get('CANVAS_STUDIO_DOMAIN') or '').lower()
+    canvas_domain = (os.environ.get('CANVAS_DOMAIN') or '').lower()
+
+    if host.endswith('instructuremedia.com') or (studio_domain and host == studio_domain):
+        return 'studio'
+    if host.endswith('instructure.com') or host.endswith('inscloudgate.net') \
+            or (canvas_domain and host.startswith(f"{canvas_domain}.")):
+        return 'canvas'
+    return 'external'
+
+
+class HostLimiter:
+
+    """
+    Per-host connection slots, sized by the host's group limit.
+
+    ``acquire(url, start)`` calls ``start()`` right away when the host has a
+    free slot and otherwise queues it for that host. ``release(url)`` passes
+    the freed slot to the host's next queued ``start``, in submission order.
+    """
+
+    def __init__(self, limits: dict = None):
+        self.limits = {**DEFAULT_HOST_LIMITS, **(limits or {})}
+        self._free = {}
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str, start) -> None:
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            if host not in self._free:
+                self._free[host] = max(1, int(self.limits.get(host_group(url), 1)))
+                self._queues[host] = deque()
+            if not self._free[host]:
+                self._queues[host].append(start)
+                return
+            self._free[host] -= 1
+        start()
+
+    def release(self, url: str) -> None:
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            if not self._queues[host]:
+                self._free[host] += 1
+                return
+            start = self._queues[host].popleft()
+        start()
+
+    def clear(self) -> None:
+        """Drop every queued ``start``."""
+        with self._lock:
+            for queue in self._queues.values():
+                queue.clear()
+
+
+class TokenBucket:
+
+    """
+    Thread-safe token bucket limiting a byte rate.
+
+    ``consume(n)`` takes ``n`` tokens and sleeps until they would have been
+    available. Tokens may go negative so chunks larger than the bucket still
+    pass; the caller simply waits off the debt.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> float:
+        """Take ``amount`` tokens, sleeping if needed. Returns the seconds slept."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class BandwidthLimiter:
+
+    """
+    Global and per-host token buckets for download traffic.
+
+    Rates are in MB per second; None or 0 means unlimited.
+    """
+
+    def __init__(self, max_rate: float = None, host_rates: dict = None):
+        self._global = TokenBucket(max_rate * MEGABYTE) if max_rate else None
+        self.host_rates = {**DEFAULT_HOST_MAX_RATES, **(host_rates or {})}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def throttle(self, url: str):
+        """Return a ``consume(n)`` callable for ``url``, or None if nothing limits it."""
+        buckets = [bucket for bucket in (self._global, self._host_bucket(url)) if bucket]
+        if not buckets:
+            return None
+
+        def consume(amount):
+            for bucket in buckets:
+                bucket.consume(amount)
+
+        return consume
+
+    def _host_bucket(self, url: str):
+        rate = self.host_rates.get(host_group(url))
+        if not rate:
+            return None
+        host = (urlparse(url).hostname or '').lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(rate * MEGABYTE)
+            return self._buckets[host]
+
+
+class OrderedPrinter:
+
+    """
+    Prints buffered output blocks in item order.
+
+    ``emit(index, lines)`` may be called in any order; a block is printed only
+    once every lower index has been emitted.
+    """
+
+    def __init__(self, start: int = 1):
+        self._next = start
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def emit(self, index: int, lines: list):
+        with self._lock:
+            self._pending[index] = lines
+            while self._next in self._pending:
+                for line in self._pending.pop(self._next):
+                    print(line)
+                self._next += 1
+
+
+class DownloadEngine:
+
+    """
+    Worker pool that runs download callables under per-host connection limits.
+
+    A job only reaches the pool once its host has a free slot (see
+    ``HostLimiter``), so pool workers never sit waiting for a busy host.
+
+    Usage::
+
+        engine = DownloadEngine(workers=4)
+        future = engine.submit(url, download_function, url, path)
+        for future in engine.as_completed([future]):
+            result = future.result()
+        engine.shutdown()
+    """
+
+    def __init__(self, workers: int = None, host_limits: dict = None, max_rate: float = None,
+                 host_rates: dict = None):
+        self.workers = max(1, int(workers or DEFAULT_DOWNLOAD_WORKERS))
+        self.limiter = HostLimiter(host_limits)
+        # The run's rate limit in MB/s after the config default is applied; None when unlimited
+        self.max_rate = (max_rate if max_rate is not None else DEFAULT_MAX_RATE) or None
+        self.bandwidth = BandwidthLimiter(self.max_rate, host_rates)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="download")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def submit(self, url: str, function, *args, **kwargs) -> Future:
+        """
+        Schedule ``function(*args, **kwargs)`` to run while holding a slot for
+        ``url``'s host. Returns at once; the job waits for the slot in the
+        host's queue.
+        """
+        future = Future()
+
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = function(*args, **kwargs)
+                    except BaseException as exc:
+                        future.set_exception(exc)
+                    else:
+                        future.set_result(result)
+            finally:
+                self.limiter.release(url)
+
+        def start():
+            try:
+                self._executor.submit(run)
+            except RuntimeError:
+                # The engine shut down while this job waited; it was cancelled with the rest
+                future.cancel()
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._forget)
+        self.limiter.acquire(url, start)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def throttle(self, url: str):
+        """Bandwidth throttle for ``url``'s transfers (None when unlimited)."""
+        return self.bandwidth.throttle(url)
+
+    @staticmethod
+    def as_completed(futures):
+        return as_completed(futures)
+
+    def shutdown(self, cancel_pending: bool = False):
+        with self._lock:
+            pending = list(self._pending)
+        if cancel_pending:
+            self.limiter.clear()
+            for future in pending:
+                future.cancel()
+        else:
+            # Jobs still queued for a host are not in the pool yet
+            wait(pending)
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Drop queued downloads if the run is being aborted
+        self.shutdown(cancel_pending=exc_type is not None)
+        return False
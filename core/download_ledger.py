@@ -0,0 +1,179 @@
+"""
+Download Ledger
+===============
+
+SQLite record of every file downloaded into a course folder, stored at
+``{course folder}/.manifest/download_ledger.sqlite``.
+
+It replaces the URL list in ``download_manifest.yaml``: lookups are indexed
+instead of a linear scan, and each result is committed as soon as the file
+finishes, so a crash or ``SystemExit`` mid-run keeps everything downloaded so
+far. An existing ``download_manifest.yaml`` is imported the first time the
+ledger is opened; the YAML file itself is left in place because it also marks
+the folder as created by Canvas Bot.
+
+Schema
+------
+``downloads`` has one row per URL::
+
+    url            TEXT PRIMARY KEY
+    result         TEXT     -- downloaded | shortcut | failed | imported
+    path           TEXT     -- where the file (or shortcut) was saved; for failed rows, the target
+                            --   path, where an interrupted download keeps its .part file
+    size           INTEGER  -- bytes on disk
+    sha256         TEXT     -- content hash, computed while streaming
+    file_id        TEXT     -- Canvas file / media id, when known
+    version        TEXT     -- remote version: Canvas modified_at/updated_at + size, or ETag
+    downloaded_at  TEXT     -- ISO timestamp of the last attempt
+
+``url``, ``sha256`` and ``file_id`` are indexed.
+
+See Also
+--------
+- core.downloader.DownloaderMixin.download : Reads and records results
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+LEDGER_FILENAME = "download_ledger.sqlite"
+
+# Results that count as "already downloaded" when a course is downloaded again
+COMPLETED_RESULTS = ("downloaded", "shortcut", "imported")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS downloads (
+    url           TEXT PRIMARY KEY,
+    result        TEXT NOT NULL,
+    path          TEXT,
+    size          INTEGER,
+    sha256        TEXT,
+    file_id       TEXT,
+    version       TEXT,
+    downloaded_at TEXT
+);
+CREATE INDEX IF NOT EXISTS downloads_sha256 ON downloads (sha256);
+CREATE INDEX IF NOT EXISTS downloads_file_id ON downloads (file_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class DownloadLedger:
+
+    """
+    Per-course download ledger.
+
+    Usage::
+
+        with DownloadLedger(course_folder) as ledger:
+            if url not in ledger:
+                ...
+                ledger.record(url, "downloaded", path=path, size=size, sha256=digest)
+    """
+
+    def __init__(self, course_folder: str):
+        manifest_dir = os.path.join(course_folder, ".manifest")
+        os.makedirs(manifest_dir, exist_ok=True)
+        self.path = os.path.join(manifest_dir, LEDGER_FILENAME)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            columns = {row['name'] for row in self._connection.execute("PRAGMA table_info(downloads)")}
+            if 'version' not in columns:
+                self._connection.execute("ALTER TABLE downloads ADD COLUMN version TEXT")
+        self._import_yaml_manifest(os.path.join(manifest_dir, "download_manifest.yaml"))
+
+    def __contains__(self, url) -> bool:
+        record = self.get(url)
+        return record is not None and record['result'] in COMPLETED_RESULTS
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def get(self, url):
+        """Return the ledger row for ``url`` as a dict, or None."""
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM downloads WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_sha256(self, sha256: str):
+        """Return a completed download with this content hash, or None."""
+        return self._find("sha256", sha256)
+
+    def find_by_file_id(self, file_id):
+        """Return a completed download of this Canvas file id, or None."""
+        return self._find("file_id", str(file_id))
+
+    def _find(self, column, value):
+        if value is None:
+            return None
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT * FROM downloads WHERE {column} = ? AND result IN ({','.join('?' * len(COMPLETED_RESULTS))}) "
+                f"ORDER BY downloaded_at DESC LIMIT 1",
+                (value, *COMPLETED_RESULTS)).fetchone()
+        return dict(row) if row else None
+
+    def record(self, url, result, path=None, size=None, sha256=None, file_id=None, version=None):
+        """Insert or replace the row for ``url`` and commit it immediately."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO downloads (url, result, path, size, sha256, file_id, version, downloaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, result, path, size, sha256, None if file_id is None else str(file_id), version,
+                 datetime.now().isoformat(timespec="seconds")))
+
+    def set_version(self, url, version):
+        """Store the remote version of an existing row without touching its result."""
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE downloads SET version = ? WHERE url = ?", (version, url))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _import_yaml_manifest(self, yaml_path):
+        """Copy the URLs of a pre-ledger ``download_manifest.yaml`` into the ledger, once."""
+        with self._lock:
+            if self._connection.execute("SELECT 1 FROM meta WHERE key = 'yaml_imported'").fetchone():
+                return
+
+            urls = []
+            try:
+                with open(yaml_path, "r") as f:
+                    urls = (yaml.safe_load(f) or {}).get('downloaded_files') or []
+            except FileNotFoundError:
+                pass
+            except (OSError, yaml.YAMLError) as exc:
+                log.warning(f"Could not import download manifest {yaml_path}: {exc}")
+                return
+
+            imported_at = datetime.now().isoformat(timespec="seconds")
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO downloads (url, result, downloaded_at) VALUES (?, 'imported', ?)",
+                    ((url, imported_at) for url in urls if url))
+                self._connection.execute("INSERT INTO meta (key, value) VALUES ('yaml_imported', ?)", (imported_at,))
+
+        if urls:
+            log.info(f"Imported {len(urls)} entries from {yaml_path} into the download ledger")
@@ -0,0 +1,355 @@
+"""
+Download Plan
+=============
+
+Change-aware planning for a download run.
+
+Before anything is transferred, each selected node is compared against the
+download ledger and classified:
+
+- ``new``       : never downloaded into this course folder
+- ``changed``   : downloaded before, but the remote version differs
+- ``unchanged`` : downloaded before and still current; skipped
+- ``copy``      : a Canvas file that an earlier run already saved under
+                  another URL; copied from that file instead of transferred
+
+The remote version is taken from the Canvas file payload when the node has
+one (``modified_at`` or ``updated_at``, plus ``size``). Other links that are
+already in the ledger get a ``HEAD`` request, and their ``ETag`` is used, or
+``Last-Modified`` + ``Content-Length`` when there is no ETag. Ledger rows
+written before versions were tracked adopt the current version the first time
+they are seen, so they are not re-downloaded just to learn it.
+
+A summary of new/changed/unchanged files and bytes is printed before the
+transfer starts, followed by the bytes to transfer per category.
+
+Preflight and Scheduling
+------------------------
+``check_disk_space()`` compares the bytes the run will write (transfers plus
+copies of earlier downloads, see ``DownloadPlan.write_bytes()``, plus a safety
+margin from ``downloads.disk_safety_margin`` / ``downloads.min_free_mb``) with
+the free space at the target, so a run that would fill a network share stops
+before it starts instead of hitting the ``OSError`` exit mid-run.
+
+``schedule()`` orders transfers longest-first. With a pool of workers this is
+the classic LPT heuristic: the big videos start immediately and the small
+documents fill the gaps at the end, which keeps the total run time close to
+the minimum. Unknown sizes are ordered by a per-category estimate.
+
+``estimate_duration()`` simulates that schedule using the throughput measured
+on earlier runs (kept in ``%APPDATA%/canvas bot/download_stats.json``) for
+``--dry-run``.
+
+See Also
+--------
+- core.download_ledger.DownloadLedger : Stores the version of every download
+- core.downloader.DownloaderMixin.download : Builds and follows the plan
+"""
+
+import heapq
+import json
+import logging
+import os
+import shutil
+from collections import namedtuple
+
+import requests
+from colorama import Fore, Style
+
+from config.yaml_io import read_config
+from network.scan_budget import request_timeout
+from sorters.sorters import force_to_shortcut
+from core.content_store import canvas_file_id, matches_record
+from core.download_ledger import COMPLETED_RESULTS
+
+log = logging.getLogger(__name__)
+
+_download_config = read_config().get('downloads', {})
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+COPY = "copy"
+
+# Statuses whose files are fetched from the server
+_TRANSFERRED = (NEW, CHANGED)
+
+DISK_SAFETY_MARGIN = float(_download_config.get('disk_safety_margin', 0.1))
+MIN_FREE_BYTES = int(_download_config.get('min_free_mb', 200)) * 1048576
+
+# Used to order files of unknown size; never reported as a size
+_UNKNOWN_SIZE_ESTIMATE = {
+    'videos': 200 * 1048576,
+    'audio': 20 * 1048576,
+    'documents': 1048576,
+    'images': 512 * 1024,
+}
+
+# status: NEW / CHANGED / UNCHANGED / COPY, size: expected bytes (None if unknown),
+# version: remote version string, category: documents / videos / audio / images
+PlanEntry = namedtuple("PlanEntry", ["status", "size", "version", "category"])
+
+
+def api_version(node):
+    """
+    Return (version, size) from a node's Canvas payload.
+
+    Both are None when the node has no payload or the payload carries no
+    timestamp.
+    """
+    api_dict = getattr(node, 'api_dict', None) or {}
+    timestamp = api_dict.get('modified_at') or api_dict.get('updated_at')
+    size = api_dict.get('size') if isinstance(api_dict.get('size'), int) else None
+    if not timestamp:
+        return None, size
+    return f"{timestamp}|{size}", size
+
+
+def head_version(url: str):
+    """Return (version, size) from a HEAD request, or (None, None) if the server doesn't say."""
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=request_timeout())
+    except requests.exceptions.RequestException as exc:
+        log.debug(f"HEAD failed for {url}: {exc}")
+        return None, None
+
+    if response.status_code >= 400:
+        return None, None
+    return response_version(response)
+
+
+def response_version(response):
+    """
+    Return (version, size) from the headers of a HEAD or GET response.
+
+    Uses the ETag when there is one, otherwise Last-Modified + Content-Length.
+    A partial (206) response has no usable version.
+    """
+    if response.status_code == 206:
+        return None, None
+    length = response.headers.get('Content-Length')
+    size = int(length) if length and length.isdigit() else None
+    etag = response.headers.get('ETag')
+    if etag:
+        return f"etag:{etag}", size
+    last_modified = response.headers.get('Last-Modified')
+    if last_modified:
+        return f"{last_modified}|{size}", size
+    return None, size
+
+
+class DownloadPlan:
+
+    """
+    Classification of every selected node for one download run.
+
+    Entries are keyed by ``id(node)``.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def __getitem__(self, node) -> PlanEntry:
+        return self.entries[id(node)]
+
+    def add(self, node, status, size=None, version=None, category=None):
+        self.entries[id(node)] = PlanEntry(status, size, version, category)
+
+    def totals(self) -> dict:
+        """Return {status: [count, known bytes, count with unknown size]}."""
+        totals = {NEW: [0, 0, 0], CHANGED: [0, 0, 0], UNCHANGED: [0, 0, 0], COPY: [0, 0, 0]}
+        for entry in self.entries.values():
+            counts = totals[entry.status]
+            counts[0] += 1
+            if entry.size is None:
+                counts[2] += 1
+            else:
+                counts[1] += entry.size
+        return totals
+
+    def category_totals(self) -> dict:
+        """Return {category: [count, known bytes]} for the files that will be transferred."""
+        totals = {}
+        for entry in self.entries.values():
+            if entry.status not in _TRANSFERRED:
+                continue
+            counts = totals.setdefault(entry.category or 'documents', [0, 0])
+            counts[0] += 1
+            counts[1] += entry.size or 0
+        return totals
+
+    def transfer_bytes(self) -> int:
+        """Known bytes of all new and changed files."""
+        return sum(entry.size or 0 for entry in self.entries.values() if entry.status in _TRANSFERRED)
+
+    def write_bytes(self) -> int:
+        """Known bytes written to disk: new and changed files plus copies of earlier downloads."""
+        return sum(entry.size or 0 for entry in self.entries.values() if entry.status != UNCHANGED)
+
+    def unknown_write_sizes(self) -> int:
+        """Number of files to be written whose size is not known, so ``write_bytes()`` leaves them out."""
+        return sum(1 for entry in self.entries.values() if entry.status != UNCHANGED and entry.size is None)
+
+    def print_summary(self):
+        totals = self.totals()
+        print(f"  {Fore.CYAN}Plan:{Style.RESET_ALL}")
+        for status, color in ((NEW, Fore.GREEN), (CHANGED, Fore.YELLOW), (UNCHANGED, Fore.LIGHTBLACK_EX),
+                              (COPY, Fore.CYAN)):
+            count, size, unknown = totals[status]
+            if status == COPY and not count:
+                continue
+            unknown_note = f", {unknown} of unknown size" if unknown and count else ""
+            print(f"    {color}{status.capitalize():<10}{Style.RESET_ALL} {count:>5} files  "
+                  f"{size / 1048576:>9.1f} MB{Fore.LIGHTBLACK_EX}{unknown_note}{Style.RESET_ALL}")
+
+        categories = self.category_totals()
+        if categories:
+            print(f"  {Fore.CYAN}To transfer:{Style.RESET_ALL}")
+            for category, (count, size) in categories.items():
+                print(f"    {category.capitalize():<10} {count:>5} files  {size / 1048576:>9.1f} MB")
+
+        log.info("AUDIT: Download plan | " + " | ".join(
+            f"{status}={count} ({size} bytes)" for status, (count, size, _) in totals.items()))
+
+
+def check_disk_space(directory: str, needed_bytes: int):
+    """
+    Check that ``directory`` has room for ``needed_bytes`` plus the safety margin.
+
+    Returns
+    -------
+    tuple
+        (enough space, bytes required including margin, bytes free). Free is
+        None when the drive can't be queried; that counts as enough space.
+    """
+    required = int(needed_bytes * (1 + DISK_SAFETY_MARGIN)) + MIN_FREE_BYTES
+
+    # The course folder may not exist yet; measure the nearest existing parent
+    probe = os.path.abspath(directory)
+    while not os.path.exists(probe) and os.path.dirname(probe) != probe:
+        probe = os.path.dirname(probe)
+    try:
+        free = shutil.disk_usage(probe).free
+    except OSError as exc:
+        log.warning(f"Could not check free space at {probe}: {exc}")
+        return True, required, None
+    return free >= required, required, free
+
+
+def _schedule_size(entry: PlanEntry) -> int:
+    if entry.size is not None:
+        return entry.size
+    return _UNKNOWN_SIZE_ESTIMATE.get(entry.category, _UNKNOWN_SIZE_ESTIMATE['documents'])
+
+
+def schedule(items: list, plan: DownloadPlan, node_of=lambda item: item) -> list:
+    """Return ``items`` ordered longest-first by planned size (stable for equal sizes)."""
+    return sorted(items, key=lambda item: _schedule_size(plan[node_of(item)]), reverse=True)
+
+
+def estimate_duration(plan: DownloadPlan, workers: int, bandwidth: float):
+    """
+    Estimate the seconds the planned transfers take on ``workers`` workers.
+
+    ``bandwidth`` is the measured aggregate throughput in bytes per second;
+    each worker is assumed to get an equal share. Files are placed
+    longest-first on whichever worker frees up first, as the engine does.
+    Returns None without a bandwidth measurement.
+    """
+    if not bandwidth:
+        return None
+    per_worker = bandwidth / max(1, workers)
+    sizes = sorted((_schedule_size(entry) for entry in plan.entries.values() if entry.status in _TRANSFERRED),
+                   reverse=True)
+    finish_times = [0.0] * max(1, workers)
+    for size in sizes:
+        heapq.heapreplace(finish_times, finish_times[0] + size / per_worker)
+    return max(finish_times)
+
+
+def _stats_path() -> str:
+    from network.set_config import save_config_data
+    return os.path.join(save_config_data(folder_only=True), "download_stats.json")
+
+
+def measured_bandwidth():
+    """Average download throughput (bytes/second) of earlier runs, or None."""
+    try:
+        with open(_stats_path(), "r", encoding="utf-8") as f:
+            return json.load(f).get('bandwidth_bps')
+    except (OSError, ValueError):
+        return None
+
+
+def record_bandwidth(transferred_bytes: int, seconds: float) -> None:
+    """Fold one run's throughput into the stored average. Tiny runs are ignored."""
+    if transferred_bytes < 1048576 or seconds <= 0:
+        return
+    current = transferred_bytes / seconds
+    previous = measured_bandwidth()
+    average = current if not previous else 0.7 * previous + 0.3 * current
+    try:
+        with open(_stats_path(), "w", encoding="utf-8") as f:
+            json.dump({'bandwidth_bps': average}, f)
+    except OSError as exc:
+        log.warning(f"Could not save download throughput: {exc}")
+
+
+def plan_downloads(nodes, ledger, engine, categories: dict = None) -> DownloadPlan:
+    """
+    Classify ``nodes`` against ``ledger``.
+
+    ``categories`` maps ``id(node)`` to its download category. ``HEAD``
+    requests for links without Canvas metadata run on ``engine`` so they
+    respect the per-host connection limits.
+    """
+    plan = DownloadPlan()
+    pending = {}
+    categories = categories or {}
+
+    for node in nodes:
+        category = categories.get(id(node))
+        version, size = api_version(node)
+        entry = ledger.get(node.url)
+        downloaded = entry is not None and entry['result'] in COMPLETED_RESULTS
+
+        if not downloaded:
+            # A Canvas file that is already on disk under another URL is copied, not transferred.
+            # Only its size is checked here; the downloader also compares the hash before copying
+            # and re-plans the node as NEW if that fails.
+            file_id = canvas_file_id(node)
+            stored = ledger.find_by_file_id(file_id) if file_id else None
+            if stored and stored['version'] in (None, version) and matches_record(stored['path'], stored, check_hash=False):
+                plan.add(node, COPY, size if size is not None else stored['size'], version, category)
+            else:
+                plan.add(node, NEW, size, version, category)
+            continue
+
+        # Shortcuts are created, not downloaded; nothing to compare
+        if entry['result'] == "shortcut" or force_to_shortcut.match(node.url):
+            plan.add(node, UNCHANGED, size, version, category)
+            continue
+
+        if version is None and not getattr(node, 'api_dict', None):
+            url = getattr(node, "download_url", None) or node.url
+            pending[engine.submit(url, head_version, url)] = (node, entry, category)
+            continue
+
+        plan.add(node, _compare(ledger, node, entry, version), size, version, category)
+
+    for future in engine.as_completed(pending):
+        node, entry, category = pending[future]
+        version, size = future.result()
+        plan.add(node, _compare(ledger, node, entry, version), size, version, category)
+
+    return plan
+
+
+def _compare(ledger, node, entry, version) -> str:
+    if version is None:
+        return UNCHANGED
+    if entry['version'] is None:
+        # Downloaded before versions were recorded; adopt the current one
+        ledger.set_version(node.url, version)
+        return UNCHANGED
+    return UNCHANGED if entry['version'] == version else CHANGED
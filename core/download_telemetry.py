@@ -0,0 +1,138 @@
+"""
+Download Telemetry
+==================
+
+Per-run transfer measurements, written as JSON next to the download ledger at
+``{course folder}/.manifest/download_report.json`` (replaced on every run that
+transfers something).
+
+The report holds the run totals (bytes, elapsed time, bytes per second, the
+estimate made at the start) and one record per transfer::
+
+    {
+        "url": "...", "host": "canvas", "result": "downloaded",
+        "bytes": 1048576, "seconds": 2.1, "ttfb_seconds": 0.35,
+        "bytes_per_second": 499321.9, "eta_seconds": 41.7
+    }
+
+``ttfb_seconds`` is the time from sending the request to receiving the
+response headers. ``eta_seconds`` is the time left for the rest of the planned
+bytes at the run's average rate when that file finished, so the report shows
+how the estimate converged.
+
+``max_rate_mb_per_second`` is the run's effective rate limit; ``null`` means
+unlimited (``--max-rate 0``, or no limit configured).
+
+See Also
+--------
+- core.downloader.DownloaderMixin.download : Records each transfer
+- core.download_engine.BandwidthLimiter : The rate limit recorded in the report
+"""
+
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from core.download_engine import host_group
+
+log = logging.getLogger(__name__)
+
+REPORT_FILENAME = "download_report.json"
+
+
+class DownloadTelemetry:
+
+    """
+    Collects transfer timings for one download run and writes the JSON report.
+    """
+
+    def __init__(self, root_directory: str, workers: int, max_rate=None):
+        self.path = os.path.join(root_directory, ".manifest", REPORT_FILENAME)
+        self.workers = workers
+        self.max_rate = max_rate
+        self.planned_bytes = 0
+        self.estimated_seconds = None
+        self.files = []
+        self._transferred = 0
+        self._started = None
+        self._started_at = None
+        self._lock = threading.Lock()
+
+    def start(self, planned_bytes: int = 0, estimated_seconds: float = None):
+        self.planned_bytes = planned_bytes
+        self.estimated_seconds = estimated_seconds
+        self._started = time.monotonic()
+        self._started_at = datetime.now().isoformat(timespec="seconds")
+
+    @property
+    def transferred_bytes(self) -> int:
+        return self._transferred
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started if self._started is not None else 0.0
+
+    def eta(self):
+        """Seconds left for the planned bytes at the average rate so far, or None."""
+        elapsed = self.elapsed()
+        if not self._transferred or not elapsed:
+            return None
+        remaining = max(0, self.planned_bytes - self._transferred)
+        return remaining / (self._transferred / elapsed)
+
+    def record(self, url: str, result: str, details: dict):
+        """Add one transfer. ``details`` is the dict filled in by ``_download_file``."""
+        transferred = details.get('bytes_written') or 0
+        seconds = details.get('seconds')
+        with self._lock:
+            self._transferred += transferred
+            self.files.append({
+                'url': url,
+                'host': host_group(url),
+                'result': result,
+                'bytes': transferred,
+                'seconds': _rounded(seconds),
+                'ttfb_seconds': _rounded(details.get('ttfb')),
+                'bytes_per_second': _rounded(transferred / seconds) if seconds and transferred else None,
+                'eta_seconds': _rounded(self.eta()),
+            })
+
+    def report(self, stats: dict) -> dict:
+        elapsed = self.elapsed()
+        ttfbs = [record['ttfb_seconds'] for record in self.files if record['ttfb_seconds'] is not None]
+        return {
+            'started_at': self._started_at,
+            'finished_at': datetime.now().isoformat(timespec="seconds"),
+            'elapsed_seconds': _rounded(elapsed),
+            'workers': self.workers,
+            'max_rate_mb_per_second': self.max_rate,
+            'planned_bytes': self.planned_bytes,
+            'estimated_seconds': _rounded(self.estimated_seconds),
+            'transferred_bytes': self._transferred,
+            'bytes_per_second': _rounded(self._transferred / elapsed) if elapsed else None,
+            'ttfb_seconds': {
+                'mean': _rounded(statistics.mean(ttfbs)) if ttfbs else None,
+                'median': _rounded(statistics.median(ttfbs)) if ttfbs else None,
+                'max': _rounded(max(ttfbs)) if ttfbs else None,
+            },
+            'totals': stats,
+            'files': self.files,
+        }
+
+    def write(self, stats: dict) -> str:
+        """Write the report (through a temp file) and return its path."""
+        report = self.report(stats)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        os.replace(temp_path, self.path)
+        log.info(f"AUDIT: Download telemetry | transferred={report['transferred_bytes']} | "
+                 f"elapsed={report['elapsed_seconds']}s | rate={report['bytes_per_second']} B/s | path={self.path}")
+        return self.path
+
+
+def _rounded(value, digits=3):
+    return round(value, digits) if value is not None else None
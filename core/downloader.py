@@ -5,7 +5,7 @@ Downloader Module
 This module provides file downloading capabilities for Canvas Bot, including:
 - Filename derivation from various sources (API metadata, URLs, titles)
 - Path construction with Windows compatibility
-- Windows shortcut (.lnk) creation for inaccessible files
+- Shortcut (.url / .lnk / .desktop) creation for inaccessible files
 - The DownloaderMixin class for ContentExtractor
 
 Architecture
@@ -16,7 +16,7 @@ The downloader sits at the final stage of the content pipeline::
                                                                    ↓
                                                     ┌──────────────┴──────────────┐
                                                     ↓                             ↓
-                                              Direct Download              Windows Shortcut
+                                              Direct Download                 Shortcut
                                               (requests.get)              (for failed downloads)
 
 Filename Derivation Priority
@@ -60,23 +60,36 @@ See Also
 --------
 - core.content_extractor.ContentExtractor : Uses DownloaderMixin
 - tools.string_checking.url_cleaning : Filename sanitization utilities
-- config.yaml_io : Download manifest management
+- core.download_ledger : Per-course record of downloaded files
 """
 
 from __future__ import annotations
 
 import logging
 import os.path
+import time
 from datetime import datetime
 from typing import TYPE_CHECKING
 from urllib.parse import unquote_plus
 
 import requests
-import win32com.client
 from colorama import Fore, Style
 from requests.exceptions import MissingSchema, InvalidURL
 
-from config.yaml_io import read_config, read_download_manifest, write_to_download_manifest
+from config.yaml_io import read_config
+from core.dash import download_dash, is_dash_response
+from core.download_engine import DownloadEngine, OrderedPrinter
+from core.content_store import (canvas_file_id, content_key, matches_record, link_or_copy, replace_with_hardlink,
+                                 HARDLINK_DUPLICATES)
+from core.download_ledger import DownloadLedger
+from core.download_telemetry import DownloadTelemetry
+from core.download_plan import (plan_downloads, check_disk_space, schedule, estimate_duration,
+                                 measured_bandwidth, record_bandwidth, response_version, CHANGED, COPY, NEW,
+                                 UNCHANGED)
+from core.shortcuts import write_shortcut, is_shortcut
+from core.file_writer import (write_response_atomically, resume_headers, remove_part_file, has_partial_download,
+                               DownloadInterrupted)
+from network.scan_budget import request_timeout
 from resource_nodes.base_content_node import BaseContentNode
 from sorters.sorters import force_to_shortcut, file_name_extractor
 from tools.string_checking.other_tools import (
@@ -88,6 +101,7 @@ from tools.string_checking.url_cleaning import sanitize_windows_filename, remove
 
 if TYPE_CHECKING:
     from core.content_extractor import ContentExtractor
+    from core.row_model import RowModel
 
 # Module configuration
 config = read_config()
@@ -124,7 +138,7 @@ def derive_filename_from_url(contentnode: BaseContentNode) -> str:
     Notes
     -----
     The "$$-" prefix is a convention that signals to `_download_file()` that
-    this file should be saved as a Windows shortcut rather than downloaded.
+    this file should be saved as a shortcut rather than downloaded.
 
     Example
     -------
@@ -257,7 +271,14 @@ def derive_file_name(node: BaseContentNode) -> str:
 # Path Construction Functions
 # =============================================================================
 
-def path_constructor(root_directory: str, node: BaseContentNode, flatten: bool) -> str:
+def resource_folder_name(node_) -> str:
+    """The download folder name of one resource node (a module, page, assignment, ...)."""
+    if node_.__class__.__name__ == "Module":
+        return sanitize_windows_filename(f"{str(node_.position)}-{node_.title[:50]}", folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
+    return sanitize_windows_filename(node_.title[:50], folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
+
+
+def path_constructor(root_directory: str, node: BaseContentNode, flatten: bool, rows: RowModel = None) -> str:
     """
     Construct the full file path for saving a downloaded file.
 
@@ -277,6 +298,12 @@ def path_constructor(root_directory: str, node: BaseContentNode, flatten: bool)
         If True, ignore course hierarchy and organize by content type only.
         If False, preserve the full folder structure from Canvas.
 
+    rows : RowModel, optional
+        The run's row model (``ContentExtractor.rows``). Its folder names are
+        memoized per ancestor, so sibling files reuse their folder chain, and
+        its date folder is fixed for the run. Without it the chain is walked
+        and sanitized for this node alone.
+
     Returns
     -------
     str
@@ -312,29 +339,22 @@ def path_constructor(root_directory: str, node: BaseContentNode, flatten: bool)
     derive_file_name : Generates the filename portion
     sanitize_windows_filename : Cleans invalid characters
     """
-    from core.content_scaffolds import build_path
-
     filename = sanitize_windows_filename(derive_file_name(node))
-    node_path = build_path(node, ignore_root=True)
-    paths = []
+    date_folder = rows.date_folder if rows is not None else sort_by_date()
 
     if flatten:
         # Flattened structure: just date and content type
-        return os.path.join(root_directory, sort_by_date(), f"{node.__class__.__name__}s", filename)
+        return os.path.join(root_directory, date_folder, f"{node.__class__.__name__}s", filename)
 
     # Hierarchical structure: build path from course tree
-    for node_ in node_path:
-        if hasattr(node_, 'is_resource'):
-            if node_.__class__.__name__ == "Module":
-
-                folder_name = sanitize_windows_filename(f"{str(node_.position)}-{node_.title[:50]}", folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
-                paths.append(folder_name)
-            else:
-                folder_name = sanitize_windows_filename(node_.title[:50], folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
-                paths.append(folder_name)
-
+    if rows is not None:
+        folders = rows.folder_names(node)
+    else:
+        from core.content_scaffolds import build_path
+        folders = [resource_folder_name(node_) for node_ in build_path(node, ignore_root=True)
+                   if hasattr(node_, 'is_resource')][::-1]
 
-    constructed_path = os.path.join(root_directory, sort_by_date(), *paths[::-1], f"{node.__class__.__name__}s", filename)
+    constructed_path = os.path.join(root_directory, date_folder, *folders, f"{node.__class__.__name__}s", filename)
 
     # Handle Windows 260 character path limit
     if len(constructed_path) > 260:
@@ -348,12 +368,12 @@ def path_constructor(root_directory: str, node: BaseContentNode, flatten: bool)
 
 
 # =============================================================================
-# Windows Shortcut Creation
+# Shortcut Creation
 # =============================================================================
 
-def create_windows_shortcut_from_url(url: str, shortcut_path: str) -> str:
+def create_shortcut_from_url(url: str, shortcut_path: str) -> str:
     """
-    Create a Windows shortcut (.lnk) file pointing to a URL.
+    Create a shortcut file pointing to a URL.
 
     Used when a file cannot be downloaded directly (authentication required,
     unavailable, etc.). The shortcut allows users to manually access the
@@ -365,7 +385,8 @@ def create_windows_shortcut_from_url(url: str, shortcut_path: str) -> str:
         The URL the shortcut should point to.
 
     shortcut_path : str
-        The intended file path. The extension will be replaced with ".lnk".
+        The intended file path. The extension will be replaced with the one
+        of the configured shortcut format.
 
     Returns
     -------
@@ -379,34 +400,27 @@ def create_windows_shortcut_from_url(url: str, shortcut_path: str) -> str:
 
     Notes
     -----
-    - Non-ASCII characters in the path are stripped to avoid encoding issues.
-    - The original file extension is replaced with ".lnk".
-    - Uses Windows Script Host (WScript.Shell) COM object.
+    - The format comes from ``downloads.shortcut_format``: ``.url`` Internet
+      Shortcuts by default, ``.desktop`` entries on Linux, or ``.lnk`` Shell
+      Links (see ``core.shortcuts``).
+    - The file is written directly, without COM, so it is safe to call from
+      download worker threads on any platform.
 
     Example
     -------
-    >>> create_windows_shortcut_from_url(
+    >>> create_shortcut_from_url(
     ...     "https://example.com/protected.pdf",
     ...     "C:/Downloads/protected.pdf"
     ... )
-    'C:/Downloads/protected.lnk'
+    'C:/Downloads/protected.url'
     """
-    # Strip non-ASCII characters and change extension to .lnk
-    encode_path_to_ascii = shortcut_path.encode('ascii', errors='ignore').decode('ascii')
-    shortcut_path = os.path.splitext(encode_path_to_ascii)[0] + ".lnk"
-
     try:
-        shell = win32com.client.Dispatch("WScript.Shell")
-        shortcut = shell.CreateShortCut(shortcut_path)
-        shortcut.Targetpath = url
-        shortcut.save()
-        return shortcut_path
+        return write_shortcut(url, shortcut_path)
     except Exception as exc:
         log.exception(f"Failed to create shortcut for {url} at {shortcut_path}: {exc}")
         raise
 
 
-
 # =============================================================================
 # DownloaderMixin Class
 # =============================================================================
@@ -421,7 +435,7 @@ class DownloaderMixin:
 
     The mixin is designed to be used with ContentExtractor, providing:
     - Batch downloading of multiple content types
-    - Progress tracking via download manifest
+    - Progress tracking via download ledger
     - Automatic shortcut creation for inaccessible files
     - Hidden content handling
 
@@ -444,7 +458,7 @@ class DownloaderMixin:
     Features
     --------
     - **Manifest Tracking**: Downloaded URLs are tracked to avoid re-downloading
-    - **Graceful Degradation**: Failed downloads become Windows shortcuts
+    - **Graceful Degradation**: Failed downloads become shortcuts
     - **Hidden Content**: Can optionally include unpublished/hidden content
     - **Content Type Filtering**: Select which types to download
 
@@ -458,7 +472,7 @@ class DownloaderMixin:
         Download content files from Canvas to a local directory.
 
         Orchestrates the download of multiple content nodes, tracking progress
-        in a manifest file and creating shortcuts for files that cannot be
+        in the download ledger and creating shortcuts for files that cannot be
         downloaded directly.
 
         Parameters
@@ -488,11 +502,35 @@ class DownloaderMixin:
             download_hidden_files : bool, default False
                 If True, include content hidden from students.
 
+            download_workers : int, optional
+                Number of concurrent downloads. Defaults to ``downloads.workers``
+                in config.yaml. Connections per host are capped separately.
+
+            max_rate : float, optional
+                Combined download rate cap in MB/s for all workers. Defaults
+                to ``downloads.max_rate_mb_per_second``; 0 means unlimited.
+
+            dry_run : bool, default False
+                Print the plan, the free-space check and an estimated duration
+                (from throughput measured on earlier runs), then return
+                without transferring anything.
+
         Notes
         -----
         - Documents are always included by default
-        - Progress is saved to download_manifest.yaml after completion
-        - Previously downloaded URLs (in manifest) are skipped
+        - Each result is committed to the download ledger
+          (``.manifest/download_ledger.sqlite``) as soon as the file finishes
+        - The run stops before transferring anything if the target lacks
+          free space for the bytes it will write (downloads and copies of
+          earlier downloads) plus ``downloads.disk_safety_margin``
+        - Transfers are submitted longest-first (LPT scheduling)
+        - A failed download records its path, so an interrupted transfer is
+          resumed into the ``.part`` file it left behind, in the earlier
+          run's date folder
+        - A download plan (new / changed / unchanged / copy) is printed first;
+          files in the ledger are skipped unless their Canvas ``modified_at``/
+          ``updated_at``/``size`` or HEAD ``ETag`` changed, and Canvas files
+          saved by an earlier run under another URL are copied
         - Hidden content is logged when included
 
         Example
@@ -504,9 +542,6 @@ class DownloaderMixin:
         ...     flatten=True
         ... )
         """
-        from core.content_scaffolds import is_hidden, get_source_page_url
-
-        download_manifest = read_download_manifest(root_directory)['downloaded_files']
         log.info(f"Downloading files to {root_directory} with params: {params}")
 
         # Extract params
@@ -516,6 +551,7 @@ class DownloaderMixin:
         include_image_files = params.get('include_image_files', False)
         flatten = params.get('flatten', False)
         download_hidden_files = params.get('download_hidden_files', False)
+        dry_run = params.get('dry_run', False)
 
         if not root_directory:
             root_directory = os.path.dirname(os.path.abspath(__file__))
@@ -523,15 +559,15 @@ class DownloaderMixin:
 
         # Build list of nodes to download (documents always included)
         download_nodes = list(content_extractor.get_document_objects())
+        categories = {id(node): 'documents' for node in download_nodes}
 
-        if include_video_files:
-            download_nodes.extend(content_extractor.get_video_file_objects())
-
-        if include_audio_files:
-            download_nodes.extend(content_extractor.get_audio_file_objects())
-
-        if include_image_files:
-            download_nodes.extend(content_extractor.get_image_file_objects())
+        for include, category, get_objects in ((include_video_files, 'videos', content_extractor.get_video_file_objects),
+                                               (include_audio_files, 'audio', content_extractor.get_audio_file_objects),
+                                               (include_image_files, 'images', content_extractor.get_image_file_objects)):
+            if include:
+                nodes = get_objects()
+                download_nodes.extend(nodes)
+                categories.update((id(node), category) for node in nodes)
 
         # Print download summary header
         total_count = len(download_nodes)
@@ -541,74 +577,198 @@ class DownloaderMixin:
         print(f"{Fore.CYAN}{'─' * 60}{Style.RESET_ALL}")
 
         # Track statistics
-        stats = {'downloaded': 0, 'skipped': 0, 'hidden': 0, 'shortcuts': 0, 'errors': 0}
+        stats = {'downloaded': 0, 'skipped': 0, 'hidden': 0, 'shortcuts': 0, 'errors': 0,
+                 'deduplicated': 0, 'bytes_saved': 0, 'updated': 0}
         shortcut_folders = set()
 
-        for idx, node in enumerate(download_nodes, 1):
-            # Progress indicator
-            progress = f"[{idx}/{total_count}]"
-
-            #check if active (has a source_url attribute that is not none)
-            if only_active_files:
-                if not get_source_page_url(node):
-                    print(f"{Fore.YELLOW}{progress}{Style.RESET_ALL} {Fore.MAGENTA}[Inactive]{Style.RESET_ALL} {_truncate_title(node.title)}")
+        # Progress lines are buffered per item and printed in item order as downloads finish
+        printer = OrderedPrinter()
+        jobs = {}
+        # content key -> references waiting for the first download of that content
+        waiting = {}
+        # Files downloaded by this run; only these are hardlinked to identical downloads (hardlink_duplicates)
+        run_paths = set()
+
+        telemetry = None
+
+        with DownloadLedger(root_directory) as ledger, \
+                DownloadEngine(workers=params.get('download_workers'), max_rate=params.get('max_rate')) as engine:
+
+            # Select nodes, then plan against the ledger before anything is transferred
+            selected = []
+            for idx, node in enumerate(download_nodes, 1):
+                #check if active (has a source_url attribute that is not none)
+                row = content_extractor.rows.row(node)
+                if only_active_files and not row.source_page_url:
+                    printer.emit(idx, [f"{Fore.YELLOW}[{idx}/{total_count}]{Style.RESET_ALL} {Fore.MAGENTA}[Inactive]{Style.RESET_ALL} {_truncate_title(node.title)}"])
                     continue
 
-            # Check if hidden
-            if is_hidden(node):
-                if download_hidden_files:
+                hidden = row.is_hidden
+                if hidden and not download_hidden_files:
+                    printer.emit(idx, [])
+                    continue
+                selected.append((idx, node, hidden))
+
+            plan = plan_downloads([node for _, node, _ in selected], ledger, engine, categories)
+            plan.print_summary()
+
+            # Preflight: stop before the first byte if the target can't hold what the run writes,
+            # transfers and copies of earlier downloads alike
+            enough_space, required, free = check_disk_space(root_directory, plan.write_bytes())
+            if dry_run:
+                self._print_dry_run(plan, engine.workers, required, free)
+                return
+            if not enough_space:
+                log.error(f"AUDIT: Download aborted | insufficient space | required={required} | free={free} | directory={root_directory}")
+                print(f"\n  {Fore.RED}\u2717 Not enough free space at the download location.{Style.RESET_ALL}")
+                print(f"  {Fore.RED}  Needs {required / 1048576:.0f} MB (including safety margin), "
+                      f"{free / 1048576:.0f} MB free. Nothing was downloaded.{Style.RESET_ALL}\n")
+                return
+            print()
+
+            transfers = []
+
+            for idx, node, hidden in selected:
+                # Progress indicator
+                progress = f"[{idx}/{total_count}]"
+                lines = []
+                planned = plan[node]
+
+                if hidden:
                     stats['hidden'] += 1
-                    print(f"{Fore.YELLOW}{progress}{Style.RESET_ALL} {Fore.MAGENTA}[Hidden]{Style.RESET_ALL} {_truncate_title(node.title)}")
-                else:
+                    lines.append(f"{Fore.YELLOW}{progress}{Style.RESET_ALL} {Fore.MAGENTA}[Hidden]{Style.RESET_ALL} {_truncate_title(node.title)}")
+
+                # Check if already downloaded and still current
+                if planned.status == UNCHANGED and node.url in ledger:
+                    stats['skipped'] += 1
+                    printer.emit(idx, lines + [f"{Fore.LIGHTBLACK_EX}{progress} [skip] {_truncate_title(node.title)} (already downloaded){Style.RESET_ALL}"])
                     continue
 
-            # Check if already downloaded
-            if node.url in download_manifest:
-                stats['skipped'] += 1
-                print(f"{Fore.LIGHTBLACK_EX}{progress} [skip] {_truncate_title(node.title)} (already downloaded){Style.RESET_ALL}")
-                continue
-
-            # Build path and download
-            full_file_path = path_constructor(root_directory, node, flatten)
-
-            # Create "Content Location" shortcut to the source Canvas page
-            parent_type = node.parent.__class__.__name__
-            target_folder = os.path.dirname(full_file_path)
-            if not flatten and parent_type in ("Module", "ModuleItem"):
-                relative_parts = os.path.relpath(full_file_path, root_directory).split(os.sep)
-                module_folder = os.path.join(root_directory, *relative_parts[:3])
-                if module_folder not in shortcut_folders:
-                    source_url = get_source_page_url(node)
+                if planned.status == CHANGED:
+                    stats['updated'] += 1
+                    lines.append(f"{Fore.YELLOW}{progress}{Style.RESET_ALL} {Fore.YELLOW}[Updated]{Style.RESET_ALL} {_truncate_title(node.title)}")
+
+                # Build path and download
+                full_file_path = path_constructor(root_directory, node, flatten, content_extractor.rows)
+
+                # An earlier run was interrupted: finish its .part file where it was left, even if
+                # that run's date folder differs from today's
+                previous = ledger.get(node.url)
+                if previous and previous['result'] == "failed" and previous['path'] \
+                        and previous['path'] != full_file_path and has_partial_download(
+                            create_long_path_file(previous['path']) if os.name == 'nt' else previous['path']):
+                    full_file_path = previous['path']
+
+                # Create "Content Location" shortcut to the source Canvas page
+                parent_type = node.parent.__class__.__name__
+                target_folder = os.path.dirname(full_file_path)
+                if not flatten and parent_type in ("Module", "ModuleItem"):
+                    relative_parts = os.path.relpath(full_file_path, root_directory).split(os.sep)
+                    module_folder = os.path.join(root_directory, *relative_parts[:3])
+                    if module_folder not in shortcut_folders:
+                        source_url = content_extractor.rows.row(node).source_page_url
+                        if source_url:
+                            shortcut_path = os.path.join(module_folder, "Content Location")
+                            if not os.path.exists(module_folder):
+                                os.makedirs(module_folder)
+                            create_shortcut_from_url(source_url, shortcut_path)
+                            shortcut_folders.add(module_folder)
+                elif target_folder not in shortcut_folders:
+                    source_url = content_extractor.rows.row(node).source_page_url
                     if source_url:
-                        shortcut_path = os.path.join(module_folder, "Content Location")
-                        if not os.path.exists(module_folder):
-                            os.makedirs(module_folder)
-                        create_windows_shortcut_from_url(source_url, shortcut_path)
-                        shortcut_folders.add(module_folder)
-            elif target_folder not in shortcut_folders:
-                source_url = get_source_page_url(node)
-                if source_url:
-                    shortcut_path = os.path.join(target_folder, "Content Location")
-                    if not os.path.exists(target_folder):
-                        os.makedirs(target_folder)
-                    create_windows_shortcut_from_url(source_url, shortcut_path)
-                    shortcut_folders.add(target_folder)
-
-            url = getattr(node, "download_url", None) or node.url
-            result = self._download_file(url, full_file_path, bool(force_to_shortcut.match(node.url)))
-
-            # Track result
-            if result:
-                if result.endswith('.lnk'):
-                    stats['shortcuts'] += 1
-                else:
-                    stats['downloaded'] += 1
-                download_manifest.append(node.url)
+                        shortcut_path = os.path.join(target_folder, "Content Location")
+                        if not os.path.exists(target_folder):
+                            os.makedirs(target_folder)
+                        create_shortcut_from_url(source_url, shortcut_path)
+                        shortcut_folders.add(target_folder)
+
+                reference = (idx, node, full_file_path, lines)
+
+                # Same content already scheduled in this run: link to it once it arrives
+                key = content_key(node)
+                if key in waiting:
+                    waiting[key].append(reference)
+                    continue
 
-        # Save manifest
-        write_to_download_manifest(root_directory, "downloaded_files", download_manifest)
+                # Same Canvas file already on disk from an earlier run, and not edited since: copy it
+                if planned.status == COPY:
+                    stored = ledger.find_by_file_id(canvas_file_id(node))
+                    if stored and matches_record(stored['path'], stored):
+                        self._place_duplicate(ledger, stats, stored['path'], stored, reference)
+                        printer.emit(idx, lines)
+                        continue
+                    # The earlier copy's content no longer matches the ledger; transfer the file after all
+                    plan.add(node, NEW, planned.size, planned.version, planned.category)
+
+                waiting[key] = []
+                transfers.append((reference, key))
+
+            if transfers:
+                telemetry = DownloadTelemetry(root_directory, engine.workers, engine.max_rate)
+                telemetry.start(plan.transfer_bytes(), estimate_duration(plan, engine.workers, measured_bandwidth()))
+
+            # Longest first, so small files fill the gaps at the end of the run
+            for reference, key in schedule(transfers, plan, node_of=lambda transfer: transfer[0][1]):
+                self._submit_download(engine, jobs, reference, key)
+
+            while jobs:
+                round_jobs, jobs = jobs, {}
+                for future in engine.as_completed(round_jobs):
+                    (idx, node, full_file_path, lines), key, details = round_jobs[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        log.exception(f"Download failed: {exc}, {node.url}")
+                        lines.append(f"  {Fore.RED}\u2717{Style.RESET_ALL} Error: {_truncate_title(node.title)} {Fore.LIGHTBLACK_EX}({exc.__class__.__name__}){Style.RESET_ALL}")
+                        result = None
+
+                    # Track result; the ledger commits each row so an aborted run keeps its progress
+                    file_id = canvas_file_id(node)
+                    references = waiting.pop(key, [])
+                    outcome = "failed" if not result else "shortcut" if is_shortcut(result) else "downloaded"
+                    telemetry.record(getattr(node, "download_url", None) or node.url, outcome, details)
+                    if outcome == "downloaded":
+                        stats['downloaded'] += 1
+                        record = {'size': details.get('size'), 'sha256': details.get('sha256'),
+                                  'version': plan[node].version or details.get('version')}
+
+                        # Identical content from another URL was downloaded earlier in this run; share its data
+                        # when hardlinks are enabled. Files from earlier runs are left alone, since they may
+                        # be edited in place later.
+                        existing = HARDLINK_DUPLICATES and ledger.find_by_sha256(record['sha256'])
+                        if (existing and existing['path'] in run_paths
+                                and matches_record(existing['path'], existing, check_hash=False)
+                                and replace_with_hardlink(existing['path'], result)):
+                            stats['deduplicated'] += 1
+                            stats['bytes_saved'] += record['size'] or 0
+                            lines.append(f"    {Fore.LIGHTBLACK_EX}identical to {_truncate_title(os.path.basename(existing['path']))}, hardlinked{Style.RESET_ALL}")
+
+                        ledger.record(node.url, "downloaded", path=result, file_id=file_id, **record)
+                        run_paths.add(result)
+                        for reference in references:
+                            self._place_duplicate(ledger, stats, result, record, reference, hardlink=HARDLINK_DUPLICATES)
+                            printer.emit(reference[0], reference[3])
+                    else:
+                        if result:
+                            stats['shortcuts'] += 1
+                            ledger.record(node.url, "shortcut", path=result, file_id=file_id)
+                        else:
+                            stats['errors'] += 1
+                            # The path lets the next run find a kept .part file, whatever its date folder
+                            ledger.record(node.url, "failed", path=full_file_path, file_id=file_id)
+                        # Nothing to link to; each waiting reference makes its own attempt
+                        for reference in references:
+                            self._submit_download(engine, jobs, reference)
+                    printer.emit(idx, lines)
+
+        if telemetry:
+            record_bandwidth(telemetry.transferred_bytes, telemetry.elapsed())
+            try:
+                telemetry.write(stats)
+            except OSError as exc:
+                log.warning(f"Could not write download report: {exc}")
 
-        log.info(f"AUDIT: Download complete | downloaded={stats['downloaded']} | skipped={stats['skipped']} | shortcuts={stats['shortcuts']} | directory={root_directory}")
+        log.info(f"AUDIT: Download complete | downloaded={stats['downloaded']} | skipped={stats['skipped']} | shortcuts={stats['shortcuts']} | errors={stats['errors']} | updated={stats['updated']} | deduplicated={stats['deduplicated']} | bytes_saved={stats['bytes_saved']} | directory={root_directory}")
 
         # Print summary
         print()
@@ -617,18 +777,96 @@ class DownloaderMixin:
         print(f"{Fore.CYAN}{'─' * 60}{Style.RESET_ALL}")
         print(f"  {Fore.GREEN}\u2713{Style.RESET_ALL} Downloaded:  {stats['downloaded']}")
         print(f"  {Fore.BLUE}\u2192{Style.RESET_ALL} Skipped:     {stats['skipped']}")
+        if stats['updated'] > 0:
+            print(f"  {Fore.YELLOW}\u21BB{Style.RESET_ALL} Updated:     {stats['updated']}")
         if stats['hidden'] > 0:
             print(f"  {Fore.MAGENTA}\u25CF{Style.RESET_ALL} Hidden:      {stats['hidden']}")
         if stats['shortcuts'] > 0:
             print(f"  {Fore.YELLOW}\u26A0{Style.RESET_ALL} Shortcuts:   {stats['shortcuts']}")
+        if stats['deduplicated'] > 0:
+            print(f"  {Fore.CYAN}={Style.RESET_ALL} Duplicates:  {stats['deduplicated']} "
+                  f"{Fore.LIGHTBLACK_EX}({stats['bytes_saved'] / 1048576:.1f} MB saved){Style.RESET_ALL}")
+        if stats['errors'] > 0:
+            print(f"  {Fore.RED}\u2717{Style.RESET_ALL} Errors:      {stats['errors']}")
+        print()
+
+    @staticmethod
+    def _print_dry_run(plan, workers: int, required: int, free) -> None:
+        """Print the disk check and estimated duration for ``--dry-run``."""
         print()
+        if free is None:
+            print(f"  Disk space:  {Fore.YELLOW}could not be checked{Style.RESET_ALL}")
+        else:
+            color = Fore.GREEN if free >= required else Fore.RED
+            print(f"  Disk space:  {color}{free / 1048576:.0f} MB free{Style.RESET_ALL}, "
+                  f"{required / 1048576:.0f} MB needed (including safety margin)")
+        copies = plan.write_bytes() - plan.transfer_bytes()
+        print(f"  To write:    {plan.transfer_bytes() / 1048576:.1f} MB downloaded, {copies / 1048576:.1f} MB copied "
+              f"from earlier downloads")
+        unknown = plan.unknown_write_sizes()
+        if unknown:
+            print(f"               {Fore.YELLOW}{unknown} files of unknown size are not included{Style.RESET_ALL}")
+
+        bandwidth = measured_bandwidth()
+        seconds = estimate_duration(plan, workers, bandwidth)
+        if seconds is None:
+            print(f"  Estimate:    {Fore.LIGHTBLACK_EX}unknown (no download speed measured yet){Style.RESET_ALL}")
+        else:
+            minutes, remainder = divmod(int(round(seconds)), 60)
+            print(f"  Estimate:    {minutes}m {remainder:02d}s with {workers} workers "
+                  f"at {bandwidth / 1048576:.1f} MB/s measured")
+        print(f"\n  {Fore.CYAN}Dry run: nothing was downloaded.{Style.RESET_ALL}\n")
+
+    def _submit_download(self, engine: DownloadEngine, jobs: dict, reference: tuple, key: str = None) -> None:
+        """Queue a download for ``reference`` (idx, node, path, lines) on the engine."""
+        idx, node, full_file_path, lines = reference
+        url = getattr(node, "download_url", None) or node.url
+        details = {}
+        future = engine.submit(url, self._download_file, url, full_file_path,
+                               bool(force_to_shortcut.match(node.url)), lines.append, details, engine.throttle(url),
+                               getattr(node, "download_url_is_manifest", False))
+        jobs[future] = (reference, key, details)
+
+    def _place_duplicate(self, ledger: DownloadLedger, stats: dict, source: str, record: dict, reference: tuple,
+                         hardlink: bool = False) -> None:
+        """
+        Put an already downloaded file at another reference's path.
 
-    def _download_file(self, url: str, filename: str, force_shortcut: bool = False) -> str:
+        The file is copied (or with ``hardlink=True``, hardlinked) from
+        ``source`` instead of being downloaded again, and recorded in the
+        ledger under the reference's URL.
+        """
+        idx, node, full_file_path, lines = reference
+        if os.name == 'nt':
+            full_file_path = create_long_path_file(full_file_path)
+        display_name = _truncate_title(os.path.basename(full_file_path), 45)
+
+        if os.path.normcase(os.path.abspath(source)) == os.path.normcase(os.path.abspath(full_file_path)):
+            stats['skipped'] += 1
+            lines.append(f"  {Fore.LIGHTBLACK_EX}[skip] {_truncate_title(node.title)} (already downloaded){Style.RESET_ALL}")
+        else:
+            try:
+                method = link_or_copy(source, full_file_path, hardlink=hardlink)
+            except OSError as exc:
+                log.exception(f"Could not place duplicate: {exc}, {full_file_path}")
+                stats['errors'] += 1
+                lines.append(f"  {Fore.RED}\u2717{Style.RESET_ALL} Could not copy duplicate: {display_name}")
+                return
+            stats['deduplicated'] += 1
+            stats['bytes_saved'] += record.get('size') or 0
+            lines.append(f"  {Fore.CYAN}={Style.RESET_ALL} {display_name} {Fore.LIGHTBLACK_EX}({method} of existing download){Style.RESET_ALL}")
+
+        if node.url not in ledger:
+            ledger.record(node.url, "downloaded", path=full_file_path, size=record.get('size'),
+                          sha256=record.get('sha256'), file_id=canvas_file_id(node), version=record.get('version'))
+
+    def _download_file(self, url: str, filename: str, force_shortcut: bool = False, report=print,
+                       details: dict = None, throttle=None, dash_manifest: bool = False) -> str:
         """
         Download a single file from a URL to a local path.
 
         Handles the actual HTTP download with error handling, creating a
-        Windows shortcut if the download fails or is forced.
+        shortcut if the download fails or is forced.
 
         Parameters
         ----------
@@ -642,16 +880,38 @@ class DownloaderMixin:
             If True, create a shortcut instead of downloading.
             Used for URLs that are known to require authentication.
 
+        report : callable, default print
+            Receives each progress line. The download engine passes a buffer
+            so lines from concurrent workers are printed in order.
+
+        details : dict, optional
+            Filled with the ``size``, ``sha256``, ``bytes_written`` and
+            remote ``version`` (ETag / Last-Modified) of a completed download,
+            plus the ``ttfb`` and total ``seconds`` of the transfer.
+
+        throttle : callable, optional
+            Bandwidth throttle from ``DownloadEngine.throttle()``; called with
+            the size of each chunk written.
+
+        dash_manifest : bool, default False
+            The URL serves a DASH manifest (Canvas Studio
+            ``download_url_is_manifest``). Its segments are downloaded and
+            joined into one MP4 by ``core.dash``. Responses with an
+            ``application/dash+xml`` content type are treated the same way.
+
         Returns
         -------
         str or None
             The path where the file was saved, or None if download failed
-            completely. Note: shortcut paths end with ".lnk".
+            completely. Note: shortcut paths end with ".url", ".lnk" or
+            ".desktop" (see ``core.shortcuts.is_shortcut``).
 
         Error Handling
         --------------
         - HTTP 4xx errors: Creates shortcut, logs warning
         - Connection errors: Creates shortcut, logs error
+        - Interrupted transfer: Keeps the partial file for resume, returns None
+        - Unreadable DASH manifest: Creates shortcut, logs warning
         - Permission errors: Creates shortcut, logs error
         - Invalid URL: Logs error, returns None
 
@@ -659,64 +919,94 @@ class DownloaderMixin:
         -----
         - Creates parent directories if they don't exist
         - Uses Windows long path prefix (\\\\?\\) on Windows
-        - Downloads in 8KB chunks for memory efficiency
+        - Streams into a ``.part`` file and renames it into place when
+          complete, so an interrupted download never leaves a truncated file
+          under its final name (see ``core.file_writer``)
+        - An interrupted download keeps its ``.part`` file and returns None
+          instead of creating a shortcut, so the next run resumes it with an
+          HTTP Range request
         """
         # Handle Windows long path names
         if os.name == 'nt':
             filename = create_long_path_file(filename)
 
-        # Create parent directories
-        if not os.path.exists(os.path.dirname(filename)):
-            os.makedirs(os.path.dirname(filename))
+        # Create parent directories (exist_ok: other workers may create the same folder)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
 
         # Force to shortcut if pattern matches
         if force_shortcut:
-            print(f"  {Fore.YELLOW}\u26A0{Style.RESET_ALL} Creating shortcut: {_truncate_title(os.path.basename(filename))}")
-            return create_windows_shortcut_from_url(url, filename)
+            report(f"  {Fore.YELLOW}\u26A0{Style.RESET_ALL} Creating shortcut: {_truncate_title(os.path.basename(filename))}")
+            return create_shortcut_from_url(url, filename)
 
+        details = {} if details is None else details
+        started = time.monotonic()
         try:
-            response = requests.get(url, stream=True, verify=True, headers=user_agent)
+            response = requests.get(url, stream=True, verify=True, timeout=request_timeout(),
+                                    headers={**user_agent, **resume_headers(url, filename)})
+            details['ttfb'] = time.monotonic() - started
+
+            # The kept .part file no longer matches the server copy; start over
+            if response.status_code == 416:
+                remove_part_file(filename)
+                response = requests.get(url, stream=True, verify=True, headers=user_agent, timeout=request_timeout())
 
             # Handle HTTP errors
             if response.status_code in [401, 402, 403, 404, 405, 406]:
                 log.warning(f"HTTP {response.status_code} {response.reason}: {url}")
-                print(f"  {Fore.RED}\u2717{Style.RESET_ALL} HTTP {response.status_code}: {_truncate_title(os.path.basename(filename))} {Fore.LIGHTBLACK_EX}(creating shortcut){Style.RESET_ALL}")
-                return create_windows_shortcut_from_url(url, filename)
+                report(f"  {Fore.RED}\u2717{Style.RESET_ALL} HTTP {response.status_code}: {_truncate_title(os.path.basename(filename))} {Fore.LIGHTBLACK_EX}(creating shortcut){Style.RESET_ALL}")
+                return create_shortcut_from_url(url, filename)
 
             # Download successfully
             display_name = _truncate_title(os.path.basename(filename), 45)
-            print(f"  {Fore.GREEN}\u2193{Style.RESET_ALL} {display_name}")
+            report(f"  {Fore.GREEN}\u2193{Style.RESET_ALL} {display_name}")
 
             try:
-                with open(filename, 'wb') as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                            file.flush()
-                            os.fsync(file.fileno())
-
+                if dash_manifest or is_dash_response(response):
+                    written = download_dash(response.text, response.url, filename, headers=user_agent,
+                                            throttle=throttle)
+                else:
+                    written = write_response_atomically(response, filename, url, throttle=throttle)
+                details.update(size=written.size, sha256=written.sha256, bytes_written=written.bytes_written,
+                               version=response_version(response)[0], seconds=time.monotonic() - started)
                 return filename
 
+            except DownloadInterrupted as exc:
+                log.warning(f"Download interrupted: {exc}, {url}")
+                if exc.bytes_kept:
+                    report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Interrupted: {_truncate_title(os.path.basename(filename))} "
+                           f"{Fore.LIGHTBLACK_EX}({exc.bytes_kept / 1048576:.1f} MB kept, run again to resume){Style.RESET_ALL}")
+                else:
+                    report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Interrupted: {_truncate_title(os.path.basename(filename))} "
+                           f"{Fore.LIGHTBLACK_EX}(run again to retry){Style.RESET_ALL}")
+                return None
+
+            except ValueError as exc:
+                log.warning(f"Unreadable DASH manifest: {exc}, {url}")
+                report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Unreadable media manifest: {_truncate_title(os.path.basename(filename))} "
+                       f"{Fore.LIGHTBLACK_EX}(creating shortcut){Style.RESET_ALL}")
+                return create_shortcut_from_url(url, filename)
+
             except OSError as exc:
                 log.exception(f"OS Error during file write: {exc}, {filename}")
+                # Fatal for the whole run, so print directly instead of buffering
                 print(f"\n  {Fore.RED}\u2717 Unable to save file: {_truncate_title(os.path.basename(filename))}{Style.RESET_ALL}")
                 print(f"  {Fore.RED}  The download destination is no longer accessible. "
                       f"Check that the drive is connected and try again.{Style.RESET_ALL}")
                 raise SystemExit(1)
 
-        except requests.exceptions.ConnectionError as exc:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
             log.exception(f"Connection Error: {exc}, {url}")
-            print(f"  {Fore.RED}\u2717{Style.RESET_ALL} Connection error: {_truncate_title(os.path.basename(filename))} {Fore.LIGHTBLACK_EX}(creating shortcut){Style.RESET_ALL}")
-            return create_windows_shortcut_from_url(url, filename)
+            report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Connection error: {_truncate_title(os.path.basename(filename))} {Fore.LIGHTBLACK_EX}(creating shortcut){Style.RESET_ALL}")
+            return create_shortcut_from_url(url, filename)
 
         except MissingSchema as exc:
             log.exception(f"Missing Schema Error: {exc}, {url}")
-            print(f"  {Fore.RED}\u2717{Style.RESET_ALL} Invalid URL (missing schema): {_truncate_title(str(url), 40)}")
+            report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Invalid URL (missing schema): {_truncate_title(str(url), 40)}")
             return None
 
         except InvalidURL as exc:
             log.exception(f"Invalid URL Error: {exc}, {url}")
-            print(f"  {Fore.RED}\u2717{Style.RESET_ALL} Invalid URL: {_truncate_title(str(url), 40)}")
+            report(f"  {Fore.RED}\u2717{Style.RESET_ALL} Invalid URL: {_truncate_title(str(url), 40)}")
             return None
 
 
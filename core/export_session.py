@@ -0,0 +1,105 @@
+"""
+Export Session
+==============
+
+One content inventory per course and output location, shared by every export
+of a run.
+
+``ContentExtractor.get_all_content`` walks the whole manifest: it builds the
+path of every node, constructs each save path and, when requested, checks
+YouTube caption status. The JSON export, the Excel export and the Content
+Viewer's ``.manifest/content.json`` all need the same inventory, so an
+``ExportSession`` builds it once and hands it to each of them:
+
+- ``content``     : the inventory as returned by ``get_all_content``.
+- ``export_data`` : the same inventory in its JSON form: keys sorted, tuples
+                    as lists and other values (datetimes) as strings. Its key
+                    order sets the Excel sheet and column order.
+- ``to_json()``   : the JSON document, identical to what
+                    ``get_all_content_as_json`` always produced.
+
+``export_data`` replaces the ``json.loads(json.dumps(...))`` round trip the
+Excel export used to do.
+
+``write_json()`` streams the JSON export item by item. If no other export has
+built the inventory yet, the items come straight from the manifest and are not
+kept, so a JSON-only run holds one item at a time. Run the Excel export first
+when both are wanted; the JSON file is then written from its inventory.
+
+Sessions are created by ``ContentExtractor.export_session`` after the scan has
+finished, and cached per download directory, ``flatten`` and caption-check
+setting.
+
+See Also
+--------
+- core.content_extractor.ContentExtractor.export_session : Cached session lookup
+- tools.export_to_excel.save_as_excel : Consumes ``export_data``
+- core.json_writer.write_inventory : Streams the JSON export
+"""
+
+import json
+import logging
+
+from core.json_writer import json_ready, write_inventory
+
+log = logging.getLogger(__name__)
+
+
+class ExportSession:
+
+    """The content inventory of one course, built once and shared by its exports."""
+
+    def __init__(self, extractor, file_download_directory: str = None, **params):
+        """
+        Parameters
+        ----------
+        extractor : ContentExtractor
+            The scanned course.
+
+        file_download_directory : str, optional
+            Course download folder used for the ``save_path`` fields. Pass None to omit them.
+
+        **params : dict
+            Passed to ``get_all_content`` (flatten, check_video_site_caption_status).
+        """
+        self.extractor = extractor
+        self.file_download_directory = file_download_directory
+        self.params = params
+        self._content = None
+        self._export_data = None
+
+    @property
+    def content(self) -> dict:
+        """The inventory from ``get_all_content``, built on first use."""
+        if self._content is None:
+            self._content = self.extractor.get_all_content(self.file_download_directory, **self.params)
+            log.debug(f"Content inventory built | course_id={self.extractor.course_id}")
+        return self._content
+
+    @property
+    def export_data(self) -> dict:
+        """The inventory in its JSON form (sorted keys, string values for non-JSON types)."""
+        if self._export_data is None:
+            self._export_data = json_ready(self.content)
+        return self._export_data
+
+    def to_json(self) -> str:
+        """The inventory as pretty-printed JSON (4-space indent, sorted keys)."""
+        # export_data is already sorted, so no sort_keys pass is needed
+        return json.dumps(self.export_data, indent=4)
+
+    def write_json(self, path: str, compact: bool = False, jsonl_path: str = None) -> int:
+        """
+        Stream the inventory to ``path`` (see core.json_writer.write_inventory).
+
+        Uses the inventory if another export already built it, otherwise a
+        lazy one that is not kept. Returns the number of JSON Lines records
+        written.
+        """
+        if self._export_data is not None:
+            inventory = self._export_data
+        elif self._content is not None:
+            inventory = self._content
+        else:
+            inventory = self.extractor.get_all_content(self.file_download_directory, lazy=True, **self.params)
+        return write_inventory(inventory, path, compact, jsonl_path)
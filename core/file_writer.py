@@ -0,0 +1,287 @@
+"""
+File Writer
+===========
+
+Atomic, resumable write path for downloaded files.
+
+A download is streamed into ``{filename}.part`` through a large write buffer
+and renamed onto ``filename`` only after the last byte is written and the size
+has been checked. An interrupted download therefore never leaves a truncated
+file under its final name, and the skip-if-exists check in the downloader can
+trust what it finds.
+
+The data is flushed to disk once, just before the rename, instead of after
+every chunk. Set ``downloads.fsync`` to ``false`` in ``config/config.yaml`` to
+leave flushing to the operating system entirely (faster on network drives,
+slightly less safe if the machine loses power mid-run).
+
+Resuming
+--------
+Next to each ``.part`` file a small JSON sidecar (``{filename}.part.json``)
+records the source URL, the expected size and the server's validators
+(``ETag`` / ``Last-Modified``). If a download is interrupted, both files are
+kept. The next attempt sends ``Range: bytes={part size}-`` with ``If-Range``:
+
+- ``206 Partial Content`` : the remaining bytes are appended to the ``.part`` file
+- ``200 OK``              : the file changed on the server (or ranges are not
+                            supported), so the download restarts from zero
+
+Resuming is only attempted when the sidecar holds a validator, so a partial
+file is never stitched onto a different version of the document.
+
+Defaults come from ``downloads`` in ``config/config.yaml``.
+
+See Also
+--------
+- core.downloader.DownloaderMixin._download_file : Uses resume_headers() and write_response_atomically()
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections import namedtuple
+
+import requests
+
+from config.yaml_io import read_config
+
+log = logging.getLogger(__name__)
+
+_download_config = read_config().get('downloads', {})
+
+PART_SUFFIX = ".part"
+SIDECAR_SUFFIX = ".part.json"
+DEFAULT_CHUNK_SIZE = int(_download_config.get('chunk_size_kb', 256)) * 1024
+DEFAULT_WRITE_BUFFER = int(_download_config.get('write_buffer_kb', 1024)) * 1024
+DEFAULT_FSYNC = bool(_download_config.get('fsync', True))
+
+# bytes_written excludes resumed bytes; size and sha256 describe the whole finished file
+WriteResult = namedtuple("WriteResult", ["bytes_written", "size", "sha256"])
+
+
+class DownloadInterrupted(requests.exceptions.ConnectionError):
+
+    """
+    Raised when a download stops before the expected number of bytes arrived.
+
+    ``bytes_kept`` is the size of the ``.part`` file left for the next attempt
+    (0 if nothing could be kept).
+    """
+
+    def __init__(self, message, bytes_kept=0):
+        super().__init__(message)
+        self.bytes_kept = bytes_kept
+
+
+def part_path(filename: str) -> str:
+    """Return the temporary path a download is written to before it is renamed."""
+    return f"{filename}{PART_SUFFIX}"
+
+
+def sidecar_path(filename: str) -> str:
+    """Return the path of the resume metadata kept next to a ``.part`` file."""
+    return f"{filename}{SIDECAR_SUFFIX}"
+
+
+def remove_part_file(filename: str) -> None:
+    """Delete a leftover ``.part`` file and its sidecar for ``filename``, if any."""
+    for path in (part_path(filename), sidecar_path(filename)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            log.warning(f"Could not remove partial download {path}: {exc}")
+
+
+def has_partial_download(filename: str) -> bool:
+    """True if a ``.part`` file with its resume sidecar is kept for ``filename``."""
+    return _partial_size(filename) > 0 and os.path.isfile(sidecar_path(filename))
+
+
+def _read_sidecar(filename: str):
+    try:
+        with open(sidecar_path(filename), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(filename: str, record: dict) -> None:
+    with open(sidecar_path(filename), "w", encoding="utf-8") as f:
+        json.dump(record, f)
+
+
+def _partial_size(filename: str) -> int:
+    try:
+        return os.path.getsize(part_path(filename))
+    except OSError:
+        return 0
+
+
+def resume_headers(url: str, filename: str) -> dict:
+    """
+    Build the ``Range``/``If-Range`` headers to resume a partial download.
+
+    Returns an empty dict when there is nothing to resume: no ``.part`` file,
+    no sidecar, a sidecar for a different URL, or no validator to check the
+    server copy against. Stale partial files are removed in that case.
+    """
+    size = _partial_size(filename)
+    if not size:
+        return {}
+
+    record = _read_sidecar(filename)
+    validator = None
+    if record and record.get('url') == url:
+        etag = record.get('etag')
+        # If-Range only accepts strong ETags
+        validator = etag if etag and not etag.startswith('W/') else record.get('last_modified')
+
+    if not validator or (record.get('size') and size >= record['size']):
+        remove_part_file(filename)
+        return {}
+
+    return {'Range': f"bytes={size}-", 'If-Range': validator}
+
+
+def hash_file(path: str, digest) -> None:
+    """Feed an existing file into a running hash."""
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(DEFAULT_WRITE_BUFFER), b''):
+            digest.update(block)
+
+
+def _content_range(response):
+    """Parse ``Content-Range: bytes start-end/total`` into (start, total). Total may be None."""
+    value = response.headers.get('Content-Range', '')
+    try:
+        unit, _, spec = value.partition(' ')
+        span, _, total = spec.partition('/')
+        start = int(span.split('-')[0])
+        return start, (int(total) if total and total != '*' else None)
+    except ValueError:
+        return None, None
+
+
+def _expected_size(response, offset: int):
+    """Total size of the file, or None if the response doesn't say (or is compressed)."""
+    if response.headers.get('Content-Encoding', 'identity') != 'identity':
+        return None
+    if response.status_code == 206:
+        return _content_range(response)[1]
+    length = response.headers.get('Content-Length')
+    return int(length) + offset if length and length.isdigit() else None
+
+
+def write_response_atomically(response, filename: str, url: str = None, chunk_size: int = None,
+                              buffer_size: int = None, fsync: bool = None, throttle=None) -> WriteResult:
+    """
+    Stream an HTTP response body to ``filename`` through a ``.part`` file.
+
+    A ``206 Partial Content`` response that continues the existing ``.part``
+    file is appended to it; any other response starts the file over.
+
+    Parameters
+    ----------
+    response : requests.Response
+        A response opened with ``stream=True``, usually requested with
+        ``resume_headers()``.
+
+    filename : str
+        Final path of the file.
+
+    url : str, optional
+        Source URL recorded in the sidecar. Defaults to ``response.url``.
+
+    chunk_size : int, optional
+        Bytes read from the response per iteration. Defaults to
+        ``downloads.chunk_size_kb``.
+
+    buffer_size : int, optional
+        Size of the file write buffer. Defaults to ``downloads.write_buffer_kb``.
+
+    fsync : bool, optional
+        Flush the file to disk once before renaming it into place. Defaults
+        to ``downloads.fsync``.
+
+    throttle : callable, optional
+        Called with the size of every chunk; blocks to hold a bandwidth limit
+        (see ``core.download_engine.BandwidthLimiter``).
+
+    Returns
+    -------
+    WriteResult
+        Bytes written by this call, total file size and the SHA-256 of the
+        finished file.
+
+    Raises
+    ------
+    DownloadInterrupted
+        If the connection drops mid-stream or the finished file is smaller than
+        the server said. The ``.part`` file is kept when it can be resumed.
+    OSError
+        If the file cannot be written or renamed.
+    """
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    buffer_size = buffer_size or DEFAULT_WRITE_BUFFER
+    fsync = DEFAULT_FSYNC if fsync is None else fsync
+
+    temp_path = part_path(filename)
+    offset = 0
+    if response.status_code == 206:
+        start, _ = _content_range(response)
+        offset = _partial_size(filename)
+        if start != offset:
+            remove_part_file(filename)
+            raise DownloadInterrupted(f"Server resumed at byte {start}, expected {offset}: {filename}")
+
+    expected = _expected_size(response, offset)
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    resumable = bool(etag or last_modified) and response.headers.get('Accept-Ranges', 'bytes' if offset else 'none') == 'bytes'
+
+    if offset:
+        log.info(f"Resuming download at {offset} bytes: {filename}")
+    if resumable:
+        _write_sidecar(filename, {'url': url or response.url, 'size': expected,
+                                  'etag': etag, 'last_modified': last_modified})
+
+    digest = hashlib.sha256()
+    if offset:
+        hash_file(temp_path, digest)
+
+    written = 0
+    try:
+        with open(temp_path, 'ab' if offset else 'wb', buffering=buffer_size) as file:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    file.write(chunk)
+                    digest.update(chunk)
+                    if throttle:
+                        throttle(len(chunk))
+                    written += len(chunk)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+    except requests.exceptions.RequestException as exc:
+        if not resumable:
+            remove_part_file(filename)
+        raise DownloadInterrupted(f"Connection dropped: {exc}", _partial_size(filename) if resumable else 0)
+    except BaseException:
+        if not resumable:
+            remove_part_file(filename)
+        raise
+
+    # Verify the size before the file gets its final name
+    total = offset + written
+    if expected is not None and total != expected:
+        if total > expected or not resumable:
+            remove_part_file(filename)
+            raise DownloadInterrupted(f"Size mismatch ({total} of {expected} bytes): {filename}")
+        raise DownloadInterrupted(f"Download incomplete ({total} of {expected} bytes): {filename}", total)
+
+    os.replace(temp_path, filename)
+    remove_part_file(filename)
+    return WriteResult(written, total, digest.hexdigest())
@@ -0,0 +1,203 @@
+"""
+JSON Writer
+===========
+
+Incremental writer for the content inventory JSON export.
+
+``json.dumps`` needs the whole inventory as one nested dict, and the
+pretty-printed result as one string, before anything reaches the disk. This
+writer walks the inventory instead and writes each content list
+(``documents``, ``video_files``, ``image_files``, ...) item by item, so the
+lists can be generators (``ContentExtractor.get_all_content(lazy=True)``) and
+only one item is held at a time.
+
+Output is identical to ``json.dumps(inventory, indent=4, sort_keys=True,
+default=str)``. Two options change it:
+
+- ``compact``    : no indentation or spaces after separators. Items are
+                   encoded by the C encoder, which ``indent`` disables.
+- ``jsonl_path`` : also write a JSON Lines sidecar with one content item per
+                   line. Each line carries ``course_id`` and ``category`` (the
+                   list the item came from) so lines from several courses
+                   can be concatenated.
+
+Both files are written to ``{path}.part`` and renamed into place when complete.
+
+See Also
+--------
+- core.export_session.ExportSession.write_json : Picks the cached inventory or a lazy one
+"""
+
+import json
+import logging
+import os
+from json.encoder import encode_basestring_ascii as encode_string
+from types import GeneratorType
+
+from core.file_writer import part_path
+
+log = logging.getLogger(__name__)
+
+WRITE_BUFFER = 1024 * 1024
+INDENT = "    "
+
+
+def json_ready(value):
+    """
+    Return ``value`` as ``json.loads(json.dumps(value, sort_keys=True, default=str))`` would,
+    without producing the JSON text.
+    """
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else json.dumps(key): json_ready(item)
+                for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [json_ready(item) for item in value]
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def _key(key) -> str:
+    # JSON object keys are strings; json.dumps converts the others the same way
+    return encode_string(key if isinstance(key, str) else json.dumps(key))
+
+
+def _scalar(value) -> str:
+    if isinstance(value, str):
+        return encode_string(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return json.dumps(value)
+    return encode_string(str(value))
+
+
+def encode_indented(value, depth: int = 0) -> str:
+    """
+    ``json.dumps(value, indent=4, sort_keys=True, default=str)``, indented as if
+    nested ``depth`` levels deep.
+
+    ``json.dumps`` falls back to its pure-Python encoder whenever ``indent`` is
+    set. Building the text with ``str.join`` around the C string escaper
+    takes about 40% less time per content item.
+    """
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        pad = "\n" + INDENT * (depth + 1)
+        return ("{" + ",".join(pad + _key(key) + ": " + encode_indented(item, depth + 1)
+                               for key, item in sorted(value.items()))
+                + "\n" + INDENT * depth + "}")
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return "[]"
+        pad = "\n" + INDENT * (depth + 1)
+        return "[" + ",".join(pad + encode_indented(item, depth + 1) for item in value) + "\n" + INDENT * depth + "]"
+    return _scalar(value)
+
+
+def encode_compact(value) -> str:
+    """``value`` as JSON without whitespace, sorted keys, other types as strings (C encoder)."""
+    return json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+
+
+class _InventoryWriter:
+
+    def __init__(self, file, compact: bool, lines=None, course_id=None):
+        self.write = file.write
+        self.compact = compact
+        self.lines = lines
+        self.course_id = course_id
+        self.items = 0
+
+    def encode(self, value, depth: int) -> str:
+        return encode_compact(value) if self.compact else encode_indented(value, depth)
+
+    def write_value(self, value, depth: int, key=None):
+        if isinstance(value, dict):
+            self.write_dict(value, depth)
+        elif isinstance(value, (list, tuple, GeneratorType)):
+            self.write_list(value, depth, key)
+        else:
+            self.write(self.encode(value, depth))
+
+    def write_dict(self, value: dict, depth: int):
+        if not value:
+            self.write("{}")
+            return
+        pad = "" if self.compact else "\n" + INDENT * (depth + 1)
+        separator = ":" if self.compact else ": "
+        self.write("{")
+        for index, (key, item) in enumerate(sorted(value.items())):
+            self.write(("," if index else "") + pad + _key(key) + separator)
+            self.write_value(item, depth + 1, key)
+        self.write("}" if self.compact else "\n" + INDENT * depth + "}")
+
+    def write_list(self, items, depth: int, key=None):
+        pad = "" if self.compact else "\n" + INDENT * (depth + 1)
+        # Every JSON Lines record starts with the course and the list it came from
+        line_prefix = f'{{"course_id": {_scalar(self.course_id)}, "category": {_scalar(key)}, '
+        empty = True
+        for item in items:
+            self.write(("[" if empty else ",") + pad + self.encode(item, depth + 1))
+            empty = False
+            if self.lines is not None and isinstance(item, dict) and item:
+                self.lines.write(line_prefix + json.dumps(item, sort_keys=True, default=str)[1:] + "\n")
+                self.items += 1
+        if empty:
+            self.write("[]")
+        else:
+            self.write("]" if self.compact else "\n" + INDENT * depth + "]")
+
+
+def write_inventory(inventory: dict, path: str, compact: bool = False, jsonl_path: str = None) -> int:
+    """
+    Write a content inventory to ``path`` one item at a time.
+
+    Parameters
+    ----------
+    inventory : dict
+        The inventory from ``get_all_content``. Its content lists may be
+        generators (``lazy=True``); each is consumed once.
+
+    path : str
+        The JSON file to write.
+
+    compact : bool, default False
+        Write without indentation.
+
+    jsonl_path : str, optional
+        Also write a JSON Lines file with one content item per line.
+
+    Returns
+    -------
+    int
+        The number of JSON Lines records written (0 without ``jsonl_path``).
+    """
+    temp_paths = [part_path(path)] + ([part_path(jsonl_path)] if jsonl_path else [])
+    try:
+        with open(temp_paths[0], "w", buffering=WRITE_BUFFER) as file:
+            lines = open(temp_paths[1], "w", buffering=WRITE_BUFFER) if jsonl_path else None
+            try:
+                writer = _InventoryWriter(file, compact, lines, inventory.get("course_id"))
+                writer.write_value(inventory, 0)
+            finally:
+                if lines:
+                    lines.close()
+        os.replace(temp_paths[0], path)
+        if jsonl_path:
+            os.replace(temp_paths[1], jsonl_path)
+    except BaseException:
+        for temp_path in temp_paths:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        raise
+    return writer.items
@@ -1,3 +1,4 @@
+import threading
 from typing import Type, List, Union
 from resource_nodes.base_content_node import BaseContentNode
 
@@ -6,42 +7,79 @@ class Manifest:
 
     """
     This class is used to store all of the nodes that are created during the course of the program.
+
+    All reads and writes go through a re-entrant lock so the manifest can be shared by scan threads.
+    Item ids keep their first-insertion order. ``claim_id`` reserves an id before its node is
+    constructed, so concurrent workers never build the same item twice.
     """
 
     def __init__(self):
         self.manifest = dict()
+        self._claimed = set()
+        self._lock = threading.RLock()
 
     def add_item_to_manifest(self, node):
-        if not self.get_item_from_manifest(node.item_id):
+        with self._lock:
+            self._claimed.discard(node.item_id)
+            if node.item_id not in self.manifest:
+                self.manifest[node.item_id] = [node]
+            else:
+                self.manifest[node.item_id].append(node)
+
+    def add_item_if_absent(self, node) -> bool:
+        """Atomically add a node only if its item id is not in the manifest. Returns True if added."""
+        with self._lock:
+            if node.item_id in self.manifest:
+                return False
+            self._claimed.discard(node.item_id)
             self.manifest[node.item_id] = [node]
-        else:
-            self.manifest[node.item_id].append(node)
+            return True
+
+    def claim_id(self, item_id) -> bool:
+        """
+        Atomically reserve an item id that is about to be built.
+
+        Returns False if the id is already in the manifest or claimed by another worker.
+        The claim is cleared when the node is added, or by ``release_id`` if it never is.
+        """
+        with self._lock:
+            if item_id in self.manifest or item_id in self._claimed:
+                return False
+            self._claimed.add(item_id)
+            return True
+
+    def release_id(self, item_id):
+        with self._lock:
+            self._claimed.discard(item_id)
 
     def get_item_from_manifest(self, node_id):
-        node = self.manifest.get(node_id)
-        if node is not None:
-            return self.manifest[node_id][0]
+        with self._lock:
+            node = self.manifest.get(node_id)
+            if node:
+                return node[0]
 
     def keys(self):
-        return self.manifest.keys()
+        with self._lock:
+            return list(self.manifest.keys())
 
     def node_exists(self, node) -> bool:
-        if node.item_id in self.manifest.keys():
-            return True
-        return False
+        return self.id_exists(node.item_id)
 
     def content_list(self) -> List[Union[Type[BaseContentNode]]]:
-        return [self.manifest[key][0] for key in self.keys() if hasattr(self.manifest[key][0], "is_content")]
+        with self._lock:
+            return [nodes[0] for nodes in self.manifest.values() if hasattr(nodes[0], "is_content")]
 
     def id_exists(self, item_id) -> bool:
-        if item_id in self.manifest.keys():
-            return True
-        return False
+        with self._lock:
+            return item_id in self.manifest or item_id in self._claimed
 
     def print_manifest(self):
-        for item in self.manifest:
-            print(item, self.manifest[item])
+        with self._lock:
+            items = list(self.manifest.items())
+        for item, nodes in items:
+            print(item, nodes)
 
 
     def get_content_nodes(self, node_class_name):
-        return [self.manifest[key][0] for key in self.keys() if self.manifest[key][0].__class__.__name__ == node_class_name]
\ No newline at end of file
+        with self._lock:
+            return [nodes[0] for nodes in self.manifest.values() if nodes[0].__class__.__name__ == node_class_name]
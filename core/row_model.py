@@ -0,0 +1,172 @@
+"""
+Row Model
+=========
+
+The fields every content row derives from a node's place in the course tree,
+computed once per node.
+
+Each ``*_dict`` builder in ``core.content_scaffolds`` used to call
+``get_source_page_url``, ``is_hidden``, ``get_order`` and ``build_path`` for its
+node. The last three each walk from the node up to the course root, so every
+row walked its ancestor chain three times, and the hundreds of items on one
+page walked the same chain over and over. ``RowModel`` walks each chain once:
+
+- ``is_hidden``, ``order`` and the path titles of an ancestor are derived from
+  its parent's and memoized, so a node only looks at the ancestors not seen
+  before (usually none).
+- ``source_page_type`` / ``source_page_url`` are memoized per parent page.
+- ``scan_date`` is taken once per model instead of once per row.
+- The sanitized download folder names of each ancestor chain are memoized the
+  same way (``folder_names``), and the dated download folder is taken once
+  (``date_folder``), for ``core.downloader.path_constructor``.
+
+The results are identical to the ``core.content_scaffolds`` functions. A
+``ContentExtractor`` keeps one model (``ContentExtractor.rows``) for the
+finished scan, shared by the JSON, Excel, SQLite and columnar exports and by
+the download selection; the tree view builds one per display.
+
+See Also
+--------
+- core.content_scaffolds : The ``*_dict`` builders that consume ``NodeRow``
+"""
+
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+# title, url                         : the node's own attributes
+# source_page_type, source_page_url  : the page the node was found on
+# is_hidden, order, path             : as is_hidden(), get_order() and the "path" titles (a tuple) of the export
+NodeRow = namedtuple("NodeRow", ["title", "url", "source_page_type", "source_page_url",
+                                 "scan_date", "is_hidden", "order", "path"])
+
+# Derived state of one tree node, including its ancestors
+_Chain = namedtuple("_Chain", ["is_hidden", "order", "titles"])
+
+
+def _flagged_hidden(node) -> bool:
+    # The flags is_hidden() checks on each node of the path
+    attributes = node.__dict__
+    return (attributes.get("hidden_for_user") is True
+            or attributes.get("published") is False
+            or attributes.get("hide_from_students") is True
+            or attributes.get("locked") is True)
+
+
+class RowModel:
+
+    """Memoized ``NodeRow`` values for the nodes of one scanned course. Safe to share between threads."""
+
+    def __init__(self, scan_date: datetime = None):
+        self.scan_date = scan_date or datetime.now()
+        self._lock = threading.Lock()
+        self._chains = {}    # id(node) -> _Chain
+        self._pages = {}     # id(parent) -> (source_page_type, source_page_url)
+        self._rows = {}      # id(node) -> NodeRow
+        self._folders = {}   # id(node) -> sanitized folder names from the course root down to the node
+        self._date_folder = None
+        # Rows are keyed by id(); holding the nodes keeps the ids from being reused
+        self._nodes = []
+
+    def _chain(self, node) -> _Chain:
+        """Hidden state, order and path titles of ``node`` and its ancestors."""
+        chain = self._chains.get(id(node))
+        if chain is not None:
+            return chain
+
+        # Walk up to the first ancestor that is already known (or the course root)
+        pending = []
+        current = node
+        while True:
+            chain = self._chains.get(id(current))
+            if chain is not None:
+                break
+            if hasattr(current, "root_node"):
+                title = getattr(current, "title", None)
+                chain = _Chain(False, 0, (title,) if title is not None else ())
+                self._chains[id(current)] = chain
+                break
+            pending.append(current)
+            current = current.parent
+
+        for current in reversed(pending):
+            position = current.__dict__.get("position")
+            title = current.title
+            chain = _Chain(chain.is_hidden or _flagged_hidden(current),
+                           position if position is not None else chain.order,
+                           ((title,) + chain.titles) if title is not None else chain.titles)
+            self._chains[id(current)] = chain
+            self._nodes.append(current)
+        return chain
+
+    def _page(self, node) -> tuple:
+        from core.content_scaffolds import get_source_page_url
+
+        parent = node.parent
+        page = self._pages.get(id(parent))
+        if page is None:
+            page = self._pages[id(parent)] = (parent.__class__.__name__, get_source_page_url(node))
+        return page
+
+    def row(self, node) -> NodeRow:
+        """The ``NodeRow`` of a content node, computed on first use."""
+        row = self._rows.get(id(node))
+        if row is not None:
+            return row
+        with self._lock:
+            row = self._rows.get(id(node))
+            if row is None:
+                chain = self._chain(node)
+                source_page_type, source_page_url = self._page(node)
+                row = NodeRow(getattr(node, "title", None), getattr(node, "url", None), source_page_type,
+                              source_page_url, self.scan_date, chain.is_hidden, chain.order, chain.titles)
+                self._rows[id(node)] = row
+        return row
+
+    def is_hidden(self, node) -> bool:
+        """``core.content_scaffolds.is_hidden`` through the memoized ancestor chain."""
+        with self._lock:
+            return self._chain(node).is_hidden
+
+    @property
+    def date_folder(self) -> str:
+        """The dated download folder (``sort_by_date()``), fixed for the model's lifetime."""
+        if self._date_folder is None:
+            from core.downloader import sort_by_date
+            self._date_folder = sort_by_date()
+        return self._date_folder
+
+    def folder_names(self, node) -> tuple:
+        """
+        The download folders of ``node``'s resource ancestors, course root first,
+        as ``path_constructor`` names them.
+        """
+        from core.downloader import resource_folder_name
+
+        with self._lock:
+            folders = self._folders.get(id(node))
+            if folders is not None:
+                return folders
+
+            # Walk up to the first ancestor with known folders (or past the course root)
+            pending = []
+            current = node
+            while True:
+                folders = self._folders.get(id(current))
+                if folders is not None:
+                    break
+                pending.append(current)
+                if hasattr(current, "root_node"):
+                    folders = ()
+                    break
+                current = current.parent
+
+            for current in reversed(pending):
+                if hasattr(current, "is_resource"):
+                    folders = folders + (resource_folder_name(current),)
+                self._folders[id(current)] = folders
+                self._nodes.append(current)
+            return folders
@@ -0,0 +1,102 @@
+"""
+Scan Profiles
+=============
+
+Declarative scan profiles that prune course sections and expansion steps
+before any request is issued. Profiles are defined under ``scan_profiles`` in
+``config/config.yaml``.
+
+Sections are the top-level resource containers built by
+``CanvasCourseRoot._init_modules_root`` (``modules``, ``pages``, ``files``,
+...). Expansions are follow-up fetches made while building nodes:
+
+- ``data_api_links`` : Canvas data-api links found in page/assignment HTML
+- ``box_pages``      : Box shared-folder pages fetched by ``BoxPage``
+
+Each skipped step is recorded so a "requests saved" report can be printed
+after the scan. Skipped sections count one listing request each; the items
+they would have expanded are not known, so the section total is a lower bound.
+"""
+
+import logging
+import threading
+
+from colorama import Fore, Style
+
+from config.yaml_io import read_config
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SCAN_PROFILE = "full"
+
+
+def get_scan_profile_names() -> list:
+    """Return the names of all configured scan profiles."""
+    return list(read_config().get('scan_profiles', {}).keys())
+
+
+def get_scan_profile(name=None) -> "ScanProfile":
+    """
+    Load a scan profile from the config by name.
+
+    Raises
+    ------
+    ValueError
+        If the profile is not defined in ``config/config.yaml``.
+    """
+    name = name or DEFAULT_SCAN_PROFILE
+    profiles = read_config().get('scan_profiles', {})
+    if name not in profiles:
+        raise ValueError(f"Unknown scan profile '{name}'. Available profiles: {', '.join(profiles)}")
+    return ScanProfile(name, profiles[name])
+
+
+class ScanProfile:
+
+    """
+    A named set of skipped sections and expansions, plus a tally of the requests it avoided.
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.description = config.get('description', '')
+        self.skip_sections = set(config.get('skip_sections') or [])
+        self.skip_expansions = set(config.get('skip_expansions') or [])
+        self._saved = {}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f"<ScanProfile {self.name}>"
+
+    def section_enabled(self, section) -> bool:
+        if section in self.skip_sections:
+            self.record_saved(section)
+            return False
+        return True
+
+    def expansion_enabled(self, expansion, request_count=1) -> bool:
+        if expansion in self.skip_expansions:
+            self.record_saved(expansion, request_count)
+            return False
+        return True
+
+    def record_saved(self, step, count=1):
+        with self._lock:
+            self._saved[step] = self._saved.get(step, 0) + count
+
+    def requests_saved(self) -> dict:
+        with self._lock:
+            return dict(self._saved)
+
+    def print_report(self):
+        """Print the requests avoided by this profile. Nothing is printed for the full profile."""
+        saved = self.requests_saved()
+        if not saved:
+            return
+        total = sum(saved.values())
+        print(f"{Fore.CYAN}Scan profile '{self.name}' skipped {len(saved)} step(s), "
+              f"saving at least {total} request(s):{Style.RESET_ALL}")
+        for step, count in saved.items():
+            kind = "section" if step in self.skip_sections else "expansion"
+            print(f"  - {step} ({kind}): {count}")
+        log.info(f"AUDIT: Scan profile {self.name} | requests_saved={total} | {saved}")
@@ -0,0 +1,188 @@
+"""
+Shortcuts
+=========
+
+Pure-Python writers for the link files Canvas Bot leaves in place of content
+it can't download, and for the "Content Location" links to Canvas pages.
+
+Three formats are supported, chosen with ``downloads.shortcut_format``:
+
+- ``url``     : Internet Shortcut (``[InternetShortcut]`` INI file). Opens in
+                the default browser on Windows and macOS.
+- ``lnk``     : Windows Shell Link (MS-SHLLINK binary format). The link runs
+                ``explorer.exe`` with the URL as its argument, which hands it
+                to the default browser.
+- ``desktop`` : freedesktop.org ``Type=Link`` entry, for Linux file managers.
+- ``auto``    : ``desktop`` on Linux, ``url`` everywhere else (default).
+
+The files are written directly, with no COM (``WScript.Shell``) round trip,
+so they can be created from any download worker thread and on machines
+without pywin32. Each file is written to a temporary name and renamed into
+place, so a reader never sees half a shortcut.
+
+URLs are percent-encoded before they are written, so control characters or
+line breaks in a URL can't add keys to the INI-style formats.
+
+See Also
+--------
+- core.downloader.create_shortcut_from_url : Downloader entry point
+"""
+
+import logging
+import os
+import struct
+import sys
+import tempfile
+import uuid
+from urllib.parse import quote
+
+from config.yaml_io import read_config
+
+log = logging.getLogger(__name__)
+
+SHORTCUT_EXTENSIONS = {"url": ".url", "lnk": ".lnk", "desktop": ".desktop"}
+
+# Characters that may appear unencoded in a URL; everything else is %-encoded
+_URL_SAFE = ":/?#[]@!$&'()*+,;=%~"
+
+# MS-SHLLINK constants
+_LINK_CLSID = uuid.UUID("00021401-0000-0000-C000-000000000046").bytes_le
+_HAS_LINK_INFO = 0x02
+_HAS_NAME = 0x04
+_HAS_ARGUMENTS = 0x20
+_IS_UNICODE = 0x80
+_SW_SHOWNORMAL = 1
+_DRIVE_FIXED = 3
+_VOLUME_ID_AND_LOCAL_BASE_PATH = 0x01
+_LNK_TARGET = "C:\\Windows\\explorer.exe"
+
+_configured_format = str(read_config().get('downloads', {}).get('shortcut_format', 'auto')).lower()
+
+
+def default_format() -> str:
+    """The shortcut format configured in ``downloads.shortcut_format``, with ``auto`` resolved."""
+    if _configured_format in SHORTCUT_EXTENSIONS:
+        return _configured_format
+    if _configured_format != 'auto':
+        log.warning(f"Unknown shortcut_format '{_configured_format}', using auto")
+    return "desktop" if sys.platform.startswith("linux") else "url"
+
+
+def is_shortcut(path) -> bool:
+    """True if ``path`` is a shortcut written by Canvas Bot, in any format."""
+    return bool(path) and os.path.splitext(path)[1].lower() in SHORTCUT_EXTENSIONS.values()
+
+
+def _safe_url(url: str) -> str:
+    return quote(url.strip(), safe=_URL_SAFE)
+
+
+def url_shortcut(url: str) -> bytes:
+    """Contents of a ``.url`` Internet Shortcut."""
+    return f"[InternetShortcut]\r\nURL={_safe_url(url)}\r\n".encode("ascii")
+
+
+def desktop_entry(url: str, name: str) -> bytes:
+    """Contents of a ``.desktop`` link entry."""
+    # Desktop Entry string escapes; names come from Canvas titles
+    name = name.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t")
+    return (f"[Desktop Entry]\nVersion=1.0\nType=Link\nName={name}\nURL={_safe_url(url)}\n"
+            f"Icon=text-html\n").encode("utf-8")
+
+
+def _string_data(value: str) -> bytes:
+    encoded = value.encode("utf-16-le")
+    return struct.pack("<H", len(encoded) // 2) + encoded
+
+
+def lnk_shortcut(url: str, name: str) -> bytes:
+    """
+    Contents of a ``.lnk`` Shell Link that opens ``url`` in the default browser.
+
+    The link has a LinkInfo pointing at ``explorer.exe`` on a fixed drive and
+    carries the URL as its command line arguments; no target ID list is
+    written.
+    """
+    header = struct.pack(
+        "<I16sIIQQQIiIHHII",
+        0x4C, _LINK_CLSID,
+        _HAS_LINK_INFO | _HAS_NAME | _HAS_ARGUMENTS | _IS_UNICODE,
+        0,           # file attributes
+        0, 0, 0,     # creation, access and write times
+        0,           # target file size
+        0,           # icon index
+        _SW_SHOWNORMAL,
+        0, 0, 0, 0)  # hot key, reserved
+
+    volume_id = struct.pack("<IIII", 0x11, _DRIVE_FIXED, 0, 0x10) + b"\x00"
+    local_base_path = _LNK_TARGET.encode("ascii") + b"\x00"
+    header_size = 0x1C
+    volume_offset = header_size
+    base_path_offset = volume_offset + len(volume_id)
+    suffix_offset = base_path_offset + len(local_base_path)
+    link_info_size = suffix_offset + 1
+    link_info = struct.pack("<IIIIIII", link_info_size, header_size, _VOLUME_ID_AND_LOCAL_BASE_PATH,
+                            volume_offset, base_path_offset, 0, suffix_offset)
+    link_info += volume_id + local_base_path + b"\x00"
+
+    return (header + link_info + _string_data(name) + _string_data(f'"{_safe_url(url)}"')
+            + struct.pack("<I", 0))
+
+
+def write_shortcut(url: str, path: str, shortcut_format: str = None) -> str:
+    """
+    Write a shortcut to ``url`` next to ``path``.
+
+    Parameters
+    ----------
+    url : str
+        The URL the shortcut opens.
+
+    path : str
+        The intended file path. Its extension is replaced with the one of
+        the shortcut format.
+
+    shortcut_format : str, optional
+        ``url``, ``lnk`` or ``desktop``. Defaults to ``default_format()``.
+
+    Returns
+    -------
+    str
+        The path of the shortcut file.
+
+    Raises
+    ------
+    ValueError
+        If ``shortcut_format`` is not a known format.
+    OSError
+        If the file can't be written.
+    """
+    shortcut_format = shortcut_format or default_format()
+    if shortcut_format not in SHORTCUT_EXTENSIONS:
+        raise ValueError(f"Unknown shortcut format: {shortcut_format}")
+
+    shortcut_path = os.path.splitext(path)[0] + SHORTCUT_EXTENSIONS[shortcut_format]
+    name = os.path.basename(os.path.splitext(path)[0])
+    if shortcut_format == "url":
+        data = url_shortcut(url)
+    elif shortcut_format == "lnk":
+        data = lnk_shortcut(url, name)
+    else:
+        data = desktop_entry(url, name)
+
+    directory = os.path.dirname(shortcut_path) or "."
+    fd, temp_path = tempfile.mkstemp(prefix=".shortcut-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if shortcut_format == "desktop":
+            # File managers only launch entries that are marked executable
+            os.chmod(temp_path, 0o755)
+        os.replace(temp_path, shortcut_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return shortcut_path
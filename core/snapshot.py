@@ -0,0 +1,361 @@
+"""
+Snapshot Module
+===============
+
+Serializes a scanned course (the Manifest plus the CanvasTree structure) to a
+compact binary file so it can be reloaded without touching the network.
+
+Tree printing, JSON/Excel export and download planning only need the node
+objects and their attributes, so a reloaded course behaves exactly like a
+freshly scanned one for those operations.
+
+File Format
+-----------
+The file is pickle-free. It consists of a fixed magic header, a one byte
+schema version and a zlib-compressed UTF-8 JSON document::
+
+    b"CBSNAP" | version (1 byte) | zlib(json)
+
+The JSON document has this shape::
+
+    {
+        "course": {"course_id": ..., "course_url": ..., "title": ..., "course_name": ..., "scan_profile": ...},
+        "sections": {"modules": 0, "pages": 12, ...},   # root attribute -> node index
+        "nodes": [
+            {
+                "class": "Module",          # class name, resolved on load
+                "tree_parent": null,        # index of the tree parent (null = course root)
+                "parent": null,             # index of node.parent (may differ after rectify)
+                "children": [1, 2],         # indices of node.children
+                "attrs": {...}              # instance attributes (see below)
+            },
+            ...
+        ],
+        "manifest": [[item_id, [node indices]], ...]
+    }
+
+Nodes are stored in tree insertion order, so rebuilding them in list order
+recreates the same tree, statistics and manifest ordering.
+
+Attribute values JSON has no type for are tagged and restored with their
+type: ``{"__tuple__": [...]}``, ``{"__set__": [...]}``,
+``{"__datetime__": "2026-10-18T09:30:00"}`` and ``{"__date__": "2026-10-18"}``.
+Anything else (functions, arbitrary objects) cannot be stored. Those
+attributes are left out and logged per node class, as a warning unless they
+are functions. Version 1 snapshots predate the tags and are still read.
+
+See Also
+--------
+- core.course_root.CanvasCourseRoot : save_snapshot() / load_snapshot()
+- core.manifest.Manifest : Node storage that is restored
+- tools.canvas_tree.CanvasTree : Tree structure that is restored
+"""
+
+import importlib
+import json
+import logging
+import os
+import zlib
+from datetime import date, datetime
+
+from core.scan_profiles import get_scan_profile
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"CBSNAP"
+SNAPSHOT_VERSION = 2
+# Versions read_snapshot_document accepts
+_READABLE_VERSIONS = (1, 2)
+SNAPSHOT_EXTENSION = ".cbsnap"
+
+# Attributes that hold object references and are rebuilt from the node indices
+_STRUCTURAL_ATTRIBUTES = ("parent", "root", "children")
+
+# Type names of dropped attributes that hold code rather than data
+_CALLABLE_TYPES = ("function", "method", "builtin_function_or_method", "partial")
+
+# Modules that define node classes, imported for their subclasses
+_NODE_MODULES = ("core.node_factory", "resource_nodes.canvas_studio", "resource_nodes.canvasfiles",
+                 "resource_nodes.media_objects")
+
+
+def default_snapshot_path(course_id) -> str:
+    """
+    Return the default snapshot location for a course.
+
+    Snapshots live next to the log file and config in
+    ``%APPDATA%/canvas bot/snapshots/{course_id}.cbsnap``.
+    """
+    from network.set_config import save_config_data
+
+    app_folder = save_config_data(folder_only=True)
+    return os.path.join(app_folder, "snapshots", f"{course_id}{SNAPSHOT_EXTENSION}")
+
+
+def _is_json_safe(value) -> bool:
+    """Check that a value round-trips through JSON without changing type."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_safe(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json_safe(item) for key, item in value.items())
+    return False
+
+
+# Values JSON has no type for are stored as {tag: JSON value} and converted back on load
+_TUPLE_TAG = "__tuple__"
+_SET_TAG = "__set__"
+_DATETIME_TAG = "__datetime__"
+_DATE_TAG = "__date__"
+
+
+class _Unsupported(Exception):
+    """Raised for a value that has no JSON encoding."""
+
+
+def _encode(value):
+    """
+    Encode a value as JSON, tagging tuples, sets, datetimes and dates so they
+    are restored with their type. Raises _Unsupported for anything else.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TUPLE_TAG: [_encode(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {_SET_TAG: [_encode(item) for item in value]}
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    if isinstance(value, date):
+        return {_DATE_TAG: value.isoformat()}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {key: _encode(item) for key, item in value.items()}
+    raise _Unsupported(type(value).__name__)
+
+
+def _decode(value):
+    """Reverse ``_encode``."""
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            (tag, item), = value.items()
+            if tag == _TUPLE_TAG:
+                return tuple(_decode(element) for element in item)
+            if tag == _SET_TAG:
+                return {_decode(element) for element in item}
+            if tag == _DATETIME_TAG:
+                return datetime.fromisoformat(item)
+            if tag == _DATE_TAG:
+                return date.fromisoformat(item)
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+
+def _node_attributes(node, dropped: dict) -> dict:
+    """
+    Collect the encodable instance attributes of a node.
+
+    Attributes that cannot be stored are added to ``dropped``
+    (class name -> {attribute name: type name}).
+    """
+    attributes = {}
+    for key, value in node.__dict__.items():
+        if key in _STRUCTURAL_ATTRIBUTES:
+            continue
+        try:
+            attributes[key] = _encode(value)
+        except _Unsupported as exc:
+            dropped.setdefault(node.__class__.__name__, {})[key] = str(exc)
+    return attributes
+
+
+def _log_dropped(dropped: dict) -> None:
+    # Bound API request functions are expected; anything else may change a --from-snapshot export
+    for class_name, attributes in dropped.items():
+        data = sorted(name for name, type_name in attributes.items() if type_name not in _CALLABLE_TYPES)
+        code = sorted(name for name, type_name in attributes.items() if type_name in _CALLABLE_TYPES)
+        if data:
+            log.warning(f"Snapshot leaves out {class_name} attributes that cannot be stored: "
+                        + ", ".join(f"{name} ({attributes[name]})" for name in data))
+        if code:
+            log.debug(f"Snapshot leaves out {class_name} functions: {', '.join(code)}")
+
+
+def _node_classes() -> dict:
+    """Map class names to every Node and BaseContentNode subclass."""
+    # Importing the factory pulls in every resource and content node module
+    for module in _NODE_MODULES:
+        importlib.import_module(module)
+    from resource_nodes.base_content_node import BaseContentNode
+    from resource_nodes.base_node import Node
+
+    classes = {}
+    pending = [Node, BaseContentNode]
+    while pending:
+        cls = pending.pop()
+        classes[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def build_snapshot(course_root) -> dict:
+    """
+    Build the snapshot document for a scanned course.
+
+    Parameters
+    ----------
+    course_root : CanvasCourseRoot
+        A course that has completed ``initialize_course()``.
+
+    Returns
+    -------
+    dict
+        The JSON-safe snapshot document described in the module docstring.
+    """
+    structure = course_root.canvas_tree.structure()
+    index_of = {id(node): idx for idx, (node, _) in enumerate(structure)}
+
+    def index(node):
+        # The course root (and anything outside the tree) maps to None
+        return index_of.get(id(node))
+
+    nodes = []
+    dropped = {}
+    for node, tree_parent in structure:
+        nodes.append({
+            "class": node.__class__.__name__,
+            "tree_parent": index(tree_parent),
+            "parent": index(getattr(node, "parent", None)),
+            "children": [index_of[id(child)] for child in getattr(node, "children", []) if id(child) in index_of],
+            "attrs": _node_attributes(node, dropped),
+        })
+    _log_dropped(dropped)
+
+    manifest = []
+    for item_id, manifest_nodes in course_root.manifest.manifest.items():
+        indices = [index_of[id(node)] for node in manifest_nodes if id(node) in index_of]
+        if indices and _is_json_safe(item_id):
+            manifest.append([item_id, indices])
+
+    # Root attributes that point at section nodes (modules, pages, files, ...)
+    sections = {key: index_of[id(value)] for key, value in course_root.__dict__.items()
+                if id(value) in index_of}
+
+    return {
+        "course": {
+            "course_id": course_root.course_id,
+            "course_url": course_root.course_url,
+            "title": course_root.title,
+            "course_name": course_root.course_name,
+            "scan_profile": course_root.scan_profile.name,
+            "unfinished_sections": course_root.unfinished_sections,
+        },
+        "sections": sections,
+        "nodes": nodes,
+        "manifest": manifest,
+    }
+
+
+def write_snapshot(course_root, path: str) -> str:
+    """
+    Write a course snapshot to disk.
+
+    The file is written to a temporary name first and then renamed, so a
+    crash never leaves a truncated snapshot behind.
+
+    Returns
+    -------
+    str
+        The path the snapshot was written to.
+    """
+    document = build_snapshot(course_root)
+    payload = zlib.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(bytes([SNAPSHOT_VERSION]))
+        f.write(payload)
+    os.replace(temp_path, path)
+
+    log.info(f"AUDIT: Snapshot saved | course_id={course_root.course_id} | nodes={len(document['nodes'])} | path={path}")
+    return path
+
+
+def read_snapshot_document(path: str) -> dict:
+    """
+    Read and decode a snapshot file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no snapshot exists at ``path``.
+    ValueError
+        If the file is not a snapshot or was written by an unsupported version.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(SNAPSHOT_MAGIC):
+        raise ValueError(f"Not a Canvas Bot snapshot: {path}")
+
+    version = data[len(SNAPSHOT_MAGIC)]
+    if version not in _READABLE_VERSIONS:
+        raise ValueError(f"Unsupported snapshot version {version} (expected one of {_READABLE_VERSIONS}): {path}")
+
+    try:
+        return json.loads(zlib.decompress(data[len(SNAPSHOT_MAGIC) + 1:]).decode("utf-8"))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Corrupt snapshot {path}: {exc}")
+
+
+def restore_snapshot(course_root, document: dict) -> None:
+    """
+    Rebuild the tree and manifest of ``course_root`` from a snapshot document.
+
+    Nodes are created with ``__new__`` so no constructor (and therefore no
+    API request) runs. Attributes, parent/child links, tree placement and
+    manifest entries are restored exactly as they were at save time.
+    """
+    classes = _node_classes()
+
+    course = document["course"]
+    course_root.course_id = course["course_id"]
+    course_root.course_url = course["course_url"]
+    course_root.title = course["title"]
+    course_root.course_name = course["course_name"]
+    course_root.exists = True
+    course_root.scan_profile = get_scan_profile(course.get("scan_profile"))
+    course_root.unfinished_sections = course.get("unfinished_sections", [])
+
+    nodes = []
+    for record in document["nodes"]:
+        cls = classes.get(record["class"])
+        if cls is None:
+            raise ValueError(f"Unknown node class in snapshot: {record['class']}")
+        node = cls.__new__(cls)
+        node.__dict__.update({key: _decode(value) for key, value in record["attrs"].items()})
+        node.root = course_root
+        nodes.append(node)
+
+    def resolve(idx):
+        return course_root if idx is None else nodes[idx]
+
+    for node, record in zip(nodes, document["nodes"]):
+        node.parent = resolve(record["parent"])
+        node.children = [nodes[idx] for idx in record["children"]]
+
+    course_root.canvas_tree.init_node(course_root)
+    for node, record in zip(nodes, document["nodes"]):
+        course_root.canvas_tree.add_node(node, parent=resolve(record["tree_parent"]))
+
+    for item_id, indices in document["manifest"]:
+        course_root.manifest.manifest[item_id] = [nodes[idx] for idx in indices]
+
+    for attribute, idx in document["sections"].items():
+        setattr(course_root, attribute, nodes[idx])
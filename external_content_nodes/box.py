@@ -1,4 +1,5 @@
 import json
+import warnings
 from colorama import Fore, Style, init
 import requests
 from bs4 import BeautifulSoup
@@ -7,6 +8,7 @@ import re
 from colorama import Style, Fore
 
 from config.yaml_io import read_config
+from network.scan_budget import request_timeout, budget_exhausted, ScanBudgetExceeded
 
 from resource_nodes.content_nodes import FileStorageSite
 from tools.string_checking.other_tools import get_extension_from_filename
@@ -18,7 +20,8 @@ class BoxPage(FileStorageSite):
 
     def __init__(self, parent, root, api_dict=None, url=None, title=None, **kwargs):
         super().__init__(parent, root, api_dict, url, title, **kwargs)
-        self.get_box_html_page()
+        if self.root.scan_profile.expansion_enabled('box_pages'):
+            self.get_box_html_page()
 
 
 
@@ -31,7 +34,13 @@ class BoxPage(FileStorageSite):
 
     def get_box_html_page(self):
         from core.node_factory import get_content_node
-        page_request = requests.get(self.url)
+        try:
+            page_request = requests.get(self.url, timeout=request_timeout())
+        except requests.exceptions.RequestException as exc:
+            if budget_exhausted():
+                raise ScanBudgetExceeded(f"Course scan time budget exhausted during {self.url}") from exc
+            warnings.warn(f"Could not fetch Box page\n    {self.url}: {exc.__class__.__name__}", UserWarning)
+            return
 
         if page_request:
             page_html = BeautifulSoup(page_request.content, features="html.parser")
@@ -40,6 +40,7 @@ class CanvasBotGUI:
         self.var_output_folder = ctk.StringVar()
 
         self.var_download = ctk.BooleanVar()
+        self.var_content_index = ctk.BooleanVar()
 
         self.var_video = ctk.BooleanVar()
         self.var_audio = ctk.BooleanVar()
@@ -47,8 +48,11 @@ class CanvasBotGUI:
         self.var_hidden = ctk.BooleanVar()
         self.var_inactive = ctk.BooleanVar()
         self.var_flatten = ctk.BooleanVar()
+        self.var_download_workers = ctk.StringVar(value="4")
         self.var_content_tree = ctk.BooleanVar()
         self.var_full_tree = ctk.BooleanVar()
+        from core.scan_profiles import DEFAULT_SCAN_PROFILE
+        self.var_scan_profile = ctk.StringVar(value=DEFAULT_SCAN_PROFILE)
 
         # --- Controller ---
         self.controller = GUIController(self)
@@ -312,6 +316,13 @@ class CanvasBotGUI:
         _add_focus_ring(cb_download)
         Tooltip(cb_download, "Download course documents to the output folder")
 
+        cb_content_index = ctk.CTkCheckBox(actions_row, text="Update content index",
+                                           variable=self.var_content_index)
+        cb_content_index.pack(side="left", padx=(0, 15))
+        _add_focus_ring(cb_content_index)
+        Tooltip(cb_content_index, "Add each course to content_index.sqlite in the output folder, "
+                                  "a database of every scanned course (same as --output_as_sqlite)")
+
 
     # ── Options ──
 
@@ -362,6 +373,11 @@ class CanvasBotGUI:
         _add_focus_ring(cb_flatten)
         Tooltip(cb_flatten, "Download all files to a single flat directory instead of preserving module structure")
 
+        ctk.CTkLabel(left, text="Download workers", anchor="w").grid(row=4, column=0, sticky="w", padx=6, pady=(1, 4))
+        self.download_workers_menu = ctk.CTkOptionMenu(left, values=["1", "2", "4", "8"], variable=self.var_download_workers, height=24)
+        self.download_workers_menu.grid(row=4, column=1, sticky="ew", padx=6, pady=(1, 4))
+        Tooltip(self.download_workers_menu, "Number of files to download at once. Use 1 for slow or metered connections")
+
         # ── Right: Display Options (1 row x 2 inner columns) ──
         right = ctk.CTkFrame(columns, fg_color=("gray86", "gray20"), corner_radius=6, height=0)
         right.grid(row=0, column=1, sticky="nsew", padx=(3, 0))
@@ -381,6 +397,12 @@ class CanvasBotGUI:
         _add_focus_ring(self.cb_full_tree)
         Tooltip(self.cb_full_tree, "Print complete course tree including all resources (single course only)")
 
+        from core.scan_profiles import get_scan_profile_names
+        ctk.CTkLabel(right, text="Scan profile", anchor="w").grid(row=2, column=0, sticky="w", padx=6, pady=(1, 4))
+        self.scan_profile_menu = ctk.CTkOptionMenu(right, values=get_scan_profile_names(), variable=self.var_scan_profile, height=24)
+        self.scan_profile_menu.grid(row=2, column=1, sticky="ew", padx=6, pady=(1, 4))
+        Tooltip(self.scan_profile_menu, "Skip course sections not needed for the job: documents-only, media-audit, or inventory-count (fastest)")
+
     # ── Run Button ──
 
     def _build_run_button(self, parent):
@@ -663,7 +663,7 @@ class ContentViewer:
         # Compiled/managed code
         ".dll", ".sys", ".drv", ".cpl", ".ocx",
         # Shortcuts & links (can redirect to executables)
-        ".lnk", ".url",
+        ".lnk", ".url", ".desktop",
         # Java / .NET
         ".jar", ".class",
         # Office macros (macro-enabled formats)
@@ -51,14 +51,18 @@ class GUIController:
         self.view.var_output_folder.set(output_folder)
 
         self.view.var_download.set(data.get("download", True))
+        self.view.var_content_index.set(data.get("content_index", False))
         self.view.var_video.set(data.get("include_video", False))
         self.view.var_audio.set(data.get("include_audio", False))
         self.view.var_image.set(data.get("include_image", False))
         self.view.var_hidden.set(data.get("include_hidden", False))
         self.view.var_inactive.set(data.get("include_inactive", False))
         self.view.var_flatten.set(data.get("flatten", False))
+        self.view.var_download_workers.set(str(data.get("download_workers", 4)))
         self.view.var_content_tree.set(data.get("content_tree", False))
         self.view.var_full_tree.set(data.get("full_tree", False))
+        from core.scan_profiles import DEFAULT_SCAN_PROFILE
+        self.view.var_scan_profile.set(data.get("scan_profile", DEFAULT_SCAN_PROFILE))
         self.validate_run()
 
     def save_settings(self):
@@ -68,14 +72,17 @@ class GUIController:
                 "course_list": self.view.var_course_list.get(),
                 "output_folder": self.view.var_output_folder.get(),
                 "download": self.view.var_download.get(),
+                "content_index": self.view.var_content_index.get(),
                 "include_video": self.view.var_video.get(),
                 "include_audio": self.view.var_audio.get(),
                 "include_image": self.view.var_image.get(),
                 "include_hidden": self.view.var_hidden.get(),
                 "include_inactive": self.view.var_inactive.get(),
                 "flatten": self.view.var_flatten.get(),
+                "download_workers": int(self.view.var_download_workers.get()),
                 "content_tree": self.view.var_content_tree.get(),
                 "full_tree": self.view.var_full_tree.get(),
+                "scan_profile": self.view.var_scan_profile.get(),
             }
             folder = os.path.dirname(self.settings_path())
             os.makedirs(folder, exist_ok=True)
@@ -408,6 +415,7 @@ class GUIController:
             import pythoncom
             pythoncom.CoInitialize()
             from canvas_bot import CanvasBot, read_course_list
+            from core.content_index import INDEX_FILENAME
             from network.cred import set_canvas_api_key_to_environment_variable, load_config_data_from_appdata
 
             # Check credentials
@@ -461,6 +469,7 @@ class GUIController:
                 "download_hidden_files": self.view.var_hidden.get(),
                 "only_active_files": not self.view.var_inactive.get(),
                 "flatten": self.view.var_flatten.get(),
+                "download_workers": int(self.view.var_download_workers.get()),
             }
 
             output_folder = self.view.var_output_folder.get().strip() or None
@@ -473,18 +482,15 @@ class GUIController:
                 print(f"Course {i}/{total} — ID: {course_id}")
                 print(f"{'='*50}\n")
 
-                bot = CanvasBot(course_id)
+                headless = not (self.view.var_content_tree.get() or self.view.var_full_tree.get())
+                bot = CanvasBot(course_id, headless=headless, scan_profile=self.view.var_scan_profile.get())
                 bot.start()
 
                 # Compute course subfolder once for all operations
                 course_folder = None
                 if output_folder and bot.exists:
-                    from tools.string_checking.url_cleaning import sanitize_windows_filename
                     from config.yaml_io import create_download_manifest
-                    course_folder = os.path.join(
-                        os.path.normpath(output_folder),
-                        f"{sanitize_windows_filename(bot.course_name)} - {bot.course_id}",
-                    )
+                    course_folder = bot.course_folder(output_folder)
 
                 # Save content.json to .manifest/ for Content Viewer
                 if course_folder:
@@ -500,6 +506,11 @@ class GUIController:
                 if output_folder and do_download:
                     bot.download_files(output_folder, **params)
 
+                # Add the course to the output folder's cross-course index (after downloading, for the ledger)
+                if course_folder and self.view.var_content_index.get():
+                    bot.save_content_to_index(os.path.join(output_folder, INDEX_FILENAME),
+                                              **{**params, "download_folder": output_folder})
+
 
             self.set_status("Complete")
             print(f"\nAll done — {total} course(s) processed.")
@@ -0,0 +1,354 @@
+"""
+Account Course Listing
+======================
+
+Lists every course of a Canvas account (``/accounts/:id/courses``) with
+concurrent page requests.
+
+The first page is fetched on its own. Its ``Link`` header names the last page
+(``rel="last"``), so the remaining pages are known up front and are requested
+on a small thread pool (``account_courses.workers``). Pages are still yielded
+in page order, each as soon as it and the pages before it have arrived, so a
+caller can write rows while later pages are in flight.
+
+When Canvas leaves out the last-page link, numbered pages are requested in
+rounds of ``workers`` pages until a short or empty page marks the end.
+Bookmark-style ``next`` links (no page number) are followed one at a time.
+
+All workers share one request rate (``account_courses.requests_per_second``).
+Canvas reports what is left of the token's request budget in
+``X-Rate-Limit-Remaining``; below ``account_courses.rate_limit_floor`` every
+worker pauses briefly so the budget can refill. A throttled response (``403
+Rate Limit Exceeded`` or ``429``) pauses every worker and the page is retried.
+A page that still fails is logged, counted in ``stats["failed_pages"]`` and
+skipped.
+
+Filters:
+
+- ``enrollment_term_id`` : passed to Canvas, so only that term's courses are
+  listed.
+- ``updated_since``      : keeps the courses whose content changed at or
+  after the given time. The Course objects of this endpoint carry no
+  ``updated_at``, so the change is read from the course content: a course
+  created since then is kept outright; otherwise its most recently updated
+  page and file are requested (``/courses/:id/pages`` and
+  ``/courses/:id/files`` with ``sort=updated_at&order=desc&per_page=1``), on
+  the same workers and request rate as the listing. That is up to two
+  requests per listed course, so combine it with ``enrollment_term_id`` on
+  large accounts. A course whose content could not be checked is kept.
+
+Defaults come from ``account_courses`` in ``config/config.yaml``.
+
+See Also
+--------
+- tools.course_extractor.extract_courses : Writes the listing to CSV
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from config.yaml_io import read_config
+from network.api import _clean_url
+from network.cred import get_access_token
+from network.scan_budget import request_timeout
+
+log = logging.getLogger(__name__)
+
+_account_config = read_config().get('account_courses', {})
+
+ACCOUNT_ID = str(_account_config.get('account_id', 1))
+PER_PAGE = int(_account_config.get('per_page', 100))
+WORKERS = max(1, int(_account_config.get('workers', 4)))
+REQUESTS_PER_SECOND = float(_account_config.get('requests_per_second', 10))
+RATE_LIMIT_FLOOR = float(_account_config.get('rate_limit_floor', 100))
+
+# Retries of one page after a throttled response or a dropped connection
+_RETRIES = 3
+_THROTTLE_PAUSE = 2.0
+_LOW_BUDGET_PAUSE = 1.0
+
+
+def parse_timestamp(value):
+    """
+    A timezone-aware datetime from a datetime, a date or an ISO 8601 string
+    (``2026-10-17``, ``2026-10-17T02:00:00Z``). Naive values are taken as local
+    time. Returns None for None or an empty string; raises ValueError for
+    anything else it cannot read.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value if value.tzinfo else value.astimezone()
+
+
+def _timestamp(value):
+    # An unreadable timestamp from Canvas counts as absent
+    try:
+        return parse_timestamp(value)
+    except ValueError:
+        return None
+
+
+def _page_number(link: dict):
+    # The numeric ``page`` of a Link header entry, or None for bookmark pages
+    page = parse_qs(urlparse(link.get('url', '')).query).get('page', [''])[0]
+    return int(page) if page.isdigit() else None
+
+
+class AccountCourseLister:
+
+    """Concurrent listing of the courses in one Canvas account. One lister serves one listing."""
+
+    def __init__(self, account_id=ACCOUNT_ID, per_page: int = PER_PAGE, workers: int = WORKERS,
+                 requests_per_second: float = REQUESTS_PER_SECOND, rate_limit_floor: float = RATE_LIMIT_FLOOR,
+                 api_path: str = None, access_token: str = None):
+        """
+        Parameters
+        ----------
+        account_id : str or int
+            The Canvas account whose courses are listed.
+
+        per_page : int
+            Courses per page (Canvas caps this at 100).
+
+        workers : int
+            Page requests in flight at once.
+
+        requests_per_second : float
+            Request rate shared by all workers (0 = unlimited).
+
+        rate_limit_floor : float
+            ``X-Rate-Limit-Remaining`` below which workers pause to let the budget refill.
+
+        api_path : str, optional
+            Canvas API root. Defaults to the ``API_PATH`` environment variable.
+
+        access_token : str, optional
+            Defaults to the saved Canvas access token.
+        """
+        self.account_id = account_id
+        self.per_page = per_page
+        self.workers = max(1, workers)
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.rate_limit_floor = rate_limit_floor
+        self.api_path = api_path
+        self.access_token = access_token
+        self.stats = {"total_pages": None, "pages": 0, "requests": 0, "retries": 0, "failed_pages": 0,
+                      "change_checks": 0, "failed_change_checks": 0}
+        self._lock = threading.Lock()
+        self._next_request = 0.0
+        self._paused_until = 0.0
+
+    @property
+    def root(self) -> str:
+        return self.api_path or os.environ.get('API_PATH')
+
+    @property
+    def url(self) -> str:
+        return f"{self.root}/accounts/{self.account_id}/courses"
+
+    def _params(self, page, enrollment_term_id=None) -> dict:
+        params = {"page": page, "per_page": self.per_page,
+                  "access_token": self.access_token or get_access_token()}
+        if enrollment_term_id:
+            params["enrollment_term_id"] = enrollment_term_id
+        return params
+
+    def _wait_turn(self):
+        # Spaces request starts by the shared interval and holds everyone during a pause
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request, self._paused_until)
+            self._next_request = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _get(self, url: str, params: dict = None, failure_stat: str = "failed_pages"):
+        """
+        One page request with throttling and retries.
+
+        Returns ``(items, links)``, or ``(None, {})`` if the page could not be
+        fetched; that is counted in ``stats[failure_stat]``.
+        """
+        clean_url = _clean_url(url)
+        for attempt in range(_RETRIES + 1):
+            if attempt:
+                with self._lock:
+                    self.stats["retries"] += 1
+            self._wait_turn()
+            with self._lock:
+                self.stats["requests"] += 1
+            try:
+                response = requests.get(url, params=params, verify=True, timeout=request_timeout())
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as exc:
+                log.warning(f"Course listing request failed: {exc.__class__.__name__} | URL: {clean_url} "
+                            f"| page={(params or {}).get('page')}")
+                self._pause(_THROTTLE_PAUSE * (attempt + 1))
+                continue
+
+            remaining = response.headers.get('X-Rate-Limit-Remaining')
+            try:
+                if remaining is not None and float(remaining) < self.rate_limit_floor:
+                    log.info(f"Canvas rate limit budget low ({float(remaining):.0f}), pausing")
+                    self._pause(_LOW_BUDGET_PAUSE)
+            except ValueError:
+                pass
+
+            throttled = response.status_code == 429 or (
+                response.status_code == 403 and b"Rate Limit Exceeded" in response.content)
+            if throttled:
+                retry_after = response.headers.get('Retry-After', '')
+                delay = float(retry_after) if retry_after.isdigit() else _THROTTLE_PAUSE * (attempt + 1)
+                log.info(f"Canvas throttled the course listing, pausing {delay:.0f}s")
+                self._pause(delay)
+                continue
+            if response.status_code != 200:
+                log.warning(f"Course listing failed: {clean_url} | page={(params or {}).get('page')} "
+                            f"| Status Code: {response.status_code}")
+                break
+            try:
+                courses = response.json()
+            except ValueError:
+                log.warning(f"Course listing returned invalid JSON: {clean_url}")
+                break
+            if not isinstance(courses, list):
+                log.warning(f"Course listing returned {type(courses).__name__}, expected a list: {clean_url}")
+                break
+            return courses, response.links
+
+        with self._lock:
+            self.stats[failure_stat] += 1
+        return None, {}
+
+    def _fetch_page(self, page: int, enrollment_term_id=None):
+        courses, _ = self._get(self.url, self._params(page, enrollment_term_id))
+        return page, courses
+
+    def pages(self, enrollment_term_id=None):
+        """
+        Yield ``(page_number, courses)`` for every page, in page order.
+
+        ``courses`` is None for a page that could not be fetched. Bookmark
+        pages are numbered in the order they were followed.
+        """
+        courses, links = self._get(self.url, self._params(1, enrollment_term_id))
+        if courses is None:
+            return
+        self.stats["pages"] += 1
+        yield 1, courses
+
+        last_page = _page_number(links['last']) if 'last' in links else None
+        next_page = _page_number(links['next']) if 'next' in links else None
+        if 'next' not in links or not courses:
+            return
+
+        if last_page is None and next_page is None:
+            # Bookmark pagination: each page only knows the next one
+            page = 1
+            while 'next' in links:
+                courses, links = self._get(links['next']['url'],
+                                           {"access_token": self.access_token or get_access_token()})
+                page += 1
+                if courses is None:
+                    return
+                self.stats["pages"] += 1
+                yield page, courses
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="account-courses") as executor:
+            if last_page is not None:
+                self.stats["total_pages"] = last_page
+                log.debug(f"Course listing | account={self.account_id} | pages={last_page}")
+                for page, courses in executor.map(lambda p: self._fetch_page(p, enrollment_term_id),
+                                                  range(2, last_page + 1)):
+                    self.stats["pages"] += courses is not None
+                    yield page, courses
+                return
+
+            # No last-page link: request rounds of numbered pages until one comes back short
+            first = 2
+            while True:
+                batch = range(first, first + self.workers)
+                fetched = 0
+                for page, courses in executor.map(lambda p: self._fetch_page(p, enrollment_term_id), batch):
+                    if courses is None:
+                        yield page, courses
+                        continue
+                    fetched += 1
+                    self.stats["pages"] += 1
+                    yield page, courses
+                    if len(courses) < self.per_page:
+                        return
+                if not fetched:
+                    # A whole round failed; without a page count there is no telling where the end is
+                    return
+                first += self.workers
+
+    def _latest_update(self, course_id, collection: str):
+        # updated_at of the most recently updated page or file of a course; False if the request failed
+        items, _ = self._get(f"{self.root}/courses/{course_id}/{collection}",
+                             {"sort": "updated_at", "order": "desc", "per_page": 1,
+                              "access_token": self.access_token or get_access_token()},
+                             failure_stat="failed_change_checks")
+        if items is None:
+            return False
+        return _timestamp(items[0].get('updated_at')) if items else None
+
+    def changed_since(self, course: dict, since) -> bool:
+        """
+        True if ``course`` was created, or had a page or file updated, at or
+        after ``since``, or if that could not be checked.
+        """
+        since = parse_timestamp(since)
+        created = _timestamp(course.get('created_at'))
+        if created is not None and created >= since:
+            return True
+        with self._lock:
+            self.stats["change_checks"] += 1
+        for collection in ("pages", "files"):
+            updated = self._latest_update(course.get('id'), collection)
+            if updated is False or (updated is not None and updated >= since):
+                return True
+        return False
+
+    def filter_changed(self, courses: list, since, executor=None) -> list:
+        """The courses of one page that ``changed_since`` keeps, checked concurrently, in page order."""
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="course-changes") as executor:
+                return self.filter_changed(courses, since, executor)
+        since = parse_timestamp(since)
+        return [course for course, changed in zip(courses, executor.map(lambda c: self.changed_since(c, since),
+                                                                         courses)) if changed]
+
+    def courses(self, enrollment_term_id=None, updated_since=None):
+        """
+        Yield the account's courses, page by page, filtered as described in
+        the module docstring.
+        """
+        since = parse_timestamp(updated_since)
+        if since is None:
+            for _, courses in self.pages(enrollment_term_id):
+                yield from courses or ()
+            return
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="course-changes") as executor:
+            for _, courses in self.pages(enrollment_term_id):
+                yield from self.filter_changed(courses or [], since, executor)
+
+
+def list_account_courses(enrollment_term_id=None, updated_since=None, **options):
+    """All courses of the configured account (see AccountCourseLister); ``options`` go to the lister."""
+    return AccountCourseLister(**options).courses(enrollment_term_id, updated_since)
@@ -7,6 +7,7 @@ import json
 import warnings
 
 from network.cred import set_canvas_api_key_to_environment_variable, load_config_data_from_appdata, get_access_token
+from network.scan_budget import request_timeout, budget_exhausted, ScanBudgetExceeded
 
 log = logging.getLogger(__name__)
 
@@ -39,7 +40,13 @@ def response_handler(request_url):
     clean_url = _clean_url(request_url)
     try:
         # Perform the GET request
-        request = requests.get(request_url, verify=True)
+        request = requests.get(request_url, verify=True, timeout=request_timeout())
+    except requests.exceptions.Timeout as exc:
+        if budget_exhausted():
+            raise ScanBudgetExceeded(f"Course scan time budget exhausted during {clean_url}") from exc
+        log.error(f"Request timed out: {exc} | URL: {clean_url}")
+        warnings.warn(f"Request timed out\n    {clean_url}", UserWarning)
+        return None
     except RequestsConnectionError as exc:
         # Log and warn for connection errors
         log.error(f"Connection error: {exc} | URL: {clean_url}")
@@ -0,0 +1,86 @@
+"""
+Scan time budget shared by the Canvas, Studio and Box request handlers.
+
+Every request gets a timeout, so a dead host can't hang a scan. While a course
+scan is running, the timeout is also capped by the time left in the course
+budget. Once that budget runs out, ``request_timeout()`` raises
+``ScanBudgetExceeded``, which ``CanvasCourseRoot`` catches to stop the scan
+cleanly and keep what was collected.
+
+Defaults come from ``scan_budget`` in ``config/config.yaml``.
+"""
+
+import logging
+import threading
+import time
+
+from config.yaml_io import read_config
+
+log = logging.getLogger(__name__)
+
+_budget_config = read_config().get('scan_budget', {})
+
+_lock = threading.Lock()
+_request_timeout = _budget_config.get('request_timeout_seconds') or None
+_course_deadline = None  # time.monotonic() value the current course must finish by
+
+# Below this many seconds a request is not worth starting
+_MINIMUM_REQUEST_WINDOW = 1.0
+
+
+class ScanBudgetExceeded(Exception):
+    """Raised when the current course scan has used up its time budget."""
+
+
+def default_course_time_limit():
+    """Configured per-course time limit in seconds, or None for no limit."""
+    return _budget_config.get('course_time_limit_seconds') or None
+
+
+def set_request_timeout(seconds):
+    """Override the per-request timeout (seconds). None or 0 disables it."""
+    global _request_timeout
+    with _lock:
+        _request_timeout = seconds or None
+
+
+def start_course_budget(seconds):
+    """Start the time budget for a course scan. None or 0 means no limit."""
+    global _course_deadline
+    with _lock:
+        _course_deadline = time.monotonic() + seconds if seconds else None
+
+
+def end_course_budget():
+    """Clear the course budget once a scan has finished."""
+    global _course_deadline
+    with _lock:
+        _course_deadline = None
+
+
+def remaining():
+    """Seconds left in the course budget, or None if no budget is running."""
+    with _lock:
+        if _course_deadline is None:
+            return None
+        return _course_deadline - time.monotonic()
+
+
+def budget_exhausted() -> bool:
+    time_left = remaining()
+    return time_left is not None and time_left < _MINIMUM_REQUEST_WINDOW
+
+
+def request_timeout():
+    """
+    Timeout to pass to ``requests`` for the next call.
+
+    Returns the per-request timeout, shortened to the time left in the course
+    budget. Raises ScanBudgetExceeded if the budget has run out.
+    """
+    time_left = remaining()
+    if time_left is None:
+        return _request_timeout
+    if time_left < _MINIMUM_REQUEST_WINDOW:
+        raise ScanBudgetExceeded("Course scan time budget exhausted")
+    return min(_request_timeout, time_left) if _request_timeout else time_left
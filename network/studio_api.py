@@ -10,6 +10,7 @@ from requests.exceptions import MissingSchema, JSONDecodeError
 
 
 from network.cred import get_studio_token
+from network.scan_budget import request_timeout, budget_exhausted, ScanBudgetExceeded
 
 log = logging.getLogger(__name__)
 
@@ -77,7 +78,7 @@ def authorize_studio_token():
             'client_secret': client_secret
         }
 
-        response = requests.post(CANVAS_STUDIO_TOKEN_URL, data=token_payload)
+        response = requests.post(CANVAS_STUDIO_TOKEN_URL, data=token_payload, timeout=request_timeout())
         token_data = response.json()
 
         if response.status_code == 200:
@@ -120,7 +121,7 @@ def refresh_studio_token(reauth_token: str):
         print("Error: Canvas Studio Token URL not found")
         return None
 
-    response = requests.post(CANVAS_STUDIO_TOKEN_URL, data=payload, headers=headers)
+    response = requests.post(CANVAS_STUDIO_TOKEN_URL, data=payload, headers=headers, timeout=request_timeout())
     response_data = response.json()
 
     if response.status_code == 200:
@@ -143,9 +144,14 @@ def response_handler(request_url):
                "Authorization": f"Bearer {get_studio_token()}"}
 
     try:
-        request = requests.get(request_url, headers=headers)
-
+        request = requests.get(request_url, headers=headers, timeout=request_timeout())
 
+    except requests.exceptions.Timeout as exc:
+        if budget_exhausted():
+            raise ScanBudgetExceeded(f"Course scan time budget exhausted during {clean_url}") from exc
+        log.error(f"Request timed out: {exc} | URL: {clean_url}")
+        warnings.warn(f"Request timed out\n    {clean_url}", UserWarning)
+        return None
     except requests.exceptions.ConnectionError as exc:
         log.exception(f"{exc} {clean_url}")
         warnings.warn(f"{exc} {clean_url}", UserWarning)
@@ -178,7 +184,7 @@ def post_handler(args):
 
     headers['Authorization'] = f"Bearer {get_studio_token()}"
 
-    caption_post = requests.post(post_url, headers=headers, files=file_data)
+    caption_post = requests.post(post_url, headers=headers, files=file_data, timeout=request_timeout())
     if caption_post.status_code == 201:
         log.info(f"Request: {clean_url} | Status Code: {caption_post.status_code}")
         print("Caption file successfully uploaded to Canvas Studio")
@@ -201,7 +207,11 @@ def download_handler(request_url):
     headers = {"accept": "application/json",
                "Authorization": f"Bearer {get_studio_token()}"}
     try:
-        request = requests.get(request_url, headers=headers)
+        request = requests.get(request_url, headers=headers, timeout=request_timeout())
+    except requests.exceptions.Timeout as exc:
+        log.error(f"Request timed out: {exc} | URL: {clean_url}")
+        warnings.warn(f"Request timed out\n    {clean_url}", UserWarning)
+        return None
     except requests.exceptions.ConnectionError as exc:
         log.error(f"Connection error: {exc} | URL: {clean_url}")
         warnings.warn(f"Connection error\n    {clean_url}", UserWarning)
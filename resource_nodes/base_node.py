@@ -52,6 +52,9 @@ class Node:
 
         data_api_links = self.get_data_api_links(html)
 
+        if data_api_links and not self.root.scan_profile.expansion_enabled('data_api_links', len(data_api_links)):
+            return
+
         for link in data_api_links:
             api_page = get_url(link[0])
             if api_page:
@@ -66,7 +69,13 @@ class Node:
                             if data_api_node == Module:
                                 # need to handle this differently
                                 continue
-                            initialized_node = data_api_node(self, self.root, api_dict, bypass_get_url=True)
+                            # claim the id so a concurrent scan can't build the same node twice
+                            if not self.root.manifest.claim_id(item_id):
+                                continue
+                            try:
+                                initialized_node = data_api_node(self, self.root, api_dict, bypass_get_url=True)
+                            finally:
+                                self.root.manifest.release_id(item_id)
                             self.children.append(initialized_node)
 
     def add_content_nodes_to_children(self, html):
@@ -26,8 +26,11 @@ class CanvasFiles(Node):
             for file_dict in api_request:
                 if not self.root.manifest.id_exists(file_dict['id']):
                     content_node = get_content_node(None, file_dict)
-                    if content_node:
-                        self.children.append(content_node(self, self.parent, file_dict))
+                    if content_node and self.root.manifest.claim_id(file_dict['id']):
+                        try:
+                            self.children.append(content_node(self, self.parent, file_dict))
+                        finally:
+                            self.root.manifest.release_id(file_dict['id'])
 
 
 class CanvasFolder(Node):
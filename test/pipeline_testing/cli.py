@@ -360,5 +360,230 @@ def batch_test(corpus, output):
         tester.save_report(output)
 
 
+@cli.command()
+@click.option('--rows', default=100000, type=int, help='Documents rows in the synthetic inventory')
+@click.option('--memory', is_flag=True, help='Also measure the peak Python heap (slower)')
+@click.option('--no-compare', 'no_compare', is_flag=True, help='Skip reading both workbooks back to compare cells')
+def excel_benchmark(rows, memory, no_compare):
+    """
+    Time the regular and --excel-streaming Excel writes of a synthetic
+    inventory and check that both workbooks hold the same cells. Runs offline.
+
+    Example:
+        python -m test.pipeline_testing excel-benchmark --rows 100000 --memory
+    """
+    from test.pipeline_testing.excel_benchmark import run_excel_benchmark
+
+    report = run_excel_benchmark(rows=rows, measure_memory=memory, compare=not no_compare)
+    click.echo(f"{report['rows']} Documents rows")
+    for mode in ("regular", "streaming"):
+        result = report[mode]
+        memory_note = f", peak heap {result['peak_heap_mb']} MB" if 'peak_heap_mb' in result else ""
+        click.echo(f"  {mode:<9} {result['seconds']}s, {result['file_mb']} MB file{memory_note}")
+    if 'same_values' in report:
+        click.echo(f"  same cell values: {report['same_values']}")
+        if not report['same_values']:
+            raise SystemExit(1)
+
+
+@cli.command()
+@click.option('--videos', default=500, type=int, help='Distinct YouTube videos to check')
+@click.option('--latency', default=0.2, type=float, help='Simulated API round trip (seconds)')
+@click.option('--rate-limit-every', 'rate_limit_every', default=0, type=int,
+              help='Answer every Nth request with 429 (0 = never)')
+@click.option('--workers', default=8, type=int, help='Concurrent requests')
+def caption_check(videos, latency, rate_limit_every, workers):
+    """
+    Time the YouTube caption checker against a local mock API.
+    Runs once with an empty cache and once with the cache it wrote.
+
+    Example:
+        python -m test.pipeline_testing caption-check --videos 500
+    """
+    from test.pipeline_testing.mock_youtube import run_caption_check
+
+    report = run_caption_check(videos=videos, latency=latency, rate_limit_every=rate_limit_every, workers=workers)
+    click.echo(f"{report['videos']} videos, {report['links']} links")
+    for run in ("cold", "warm"):
+        click.echo(f"  {run}: {report[f'{run}_seconds']}s, {report[f'{run}_requests']} API requests, "
+                   f"{report[f'{run}_wrong']} wrong, {report[f'{run}_missing']} without status")
+
+
+
+
+@cli.command()
+@click.option('--size-mb', 'size_mb', default=200, type=int, help='Size of the served file in MB')
+@click.option('--directory', type=click.Path(file_okay=False), default=None,
+              help='Where the copies are written (default: a temporary folder)')
+def write_benchmark(size_mb, directory):
+    """
+    Compare the download writers in MB/s against a local http.server. The
+    old writer fsyncs every 8 KB chunk; the new one buffers into a .part
+    file and fsyncs once.
+
+    Example:
+        python -m test.pipeline_testing write-benchmark --size-mb 500 --directory Z:\\scratch
+    """
+    from test.pipeline_testing.write_benchmark import run_write_benchmark
+
+    report = run_write_benchmark(size_mb=size_mb, directory=directory)
+    click.echo(f"{report['size_mb']} MB file over http://127.0.0.1")
+    for writer in report['writers']:
+        click.echo(f"  {writer['writer']:<28} {writer['mb_per_second']:>8} MB/s, intact: {writer['intact']}, "
+                   f".part left behind: {writer['part_left']}")
+
+
+@cli.command()
+@click.option('--workers', default=4, type=int, help='Segments fetched at once')
+def dash_check(workers):
+    """
+    Download the DASH stand-in in test/pipeline_testing/fixtures/dash from a
+    local http.server and check the parsed segment URLs and the written bytes.
+    Runs offline.
+
+    Example:
+        python -m test.pipeline_testing dash-check --workers 8
+    """
+    from test.pipeline_testing.dash_check import run_dash_check
+
+    checks = run_dash_check(workers=workers)
+    for name, passed, detail in checks:
+        click.echo(f"  {'PASS' if passed else 'FAIL'}  {name} ({detail})")
+    if not all(passed for _, passed, _ in checks):
+        raise SystemExit(1)
+
+
+@cli.command()
+def shortcut_check():
+    """
+    Write .url, .desktop and .lnk shortcuts and parse them back: INI keys,
+    the Shell Link header, LinkInfo offsets and the argument string. Runs
+    offline, on any platform.
+
+    Example:
+        python -m test.pipeline_testing shortcut-check
+    """
+    from test.pipeline_testing.shortcut_check import run_shortcut_check
+
+    checks = run_shortcut_check()
+    for name, passed, detail in checks:
+        click.echo(f"  {'PASS' if passed else 'FAIL'}  {name} ({detail})")
+    if not all(passed for _, passed, _ in checks):
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option('--threads', default=16, type=int, help='Threads inserting at once')
+@click.option('--modules', default=50, type=int, help='Modules in the synthetic course')
+@click.option('--items', default=3000, type=int, help='Items built through claim_id')
+@click.option('--links', default=1000, type=int, help='Items added through add_item_if_absent')
+@click.option('--seed', default=0, type=int, help='Seed for the per-thread insert order')
+def manifest_stress(threads, modules, items, links, seed):
+    """
+    Race threads inserting the same synthetic course into one Manifest and
+    CanvasTree. Fails if any id is built twice, goes missing, or the tree
+    is not intact. Runs offline.
+
+    Example:
+        python -m test.pipeline_testing manifest-stress --threads 32 --items 10000
+    """
+    from test.pipeline_testing.manifest_stress import run_manifest_stress
+
+    reports = run_manifest_stress(threads=threads, modules=modules, items=items, links=links, seed=seed)
+    for report in reports:
+        click.echo(f"{report['mode']} tree: {report['inserts']} concurrent inserts of {report['nodes']} nodes, "
+                   f"{report['released_claims']} claims released and retried")
+        click.echo(f"  duplicates: {report['duplicate_builds']} built, {report['manifest_duplicates']} in manifest; "
+                   f"missing: {report['missing']}; leftover claims: {report['leftover_claims']}")
+        click.echo(f"  tree: {report['tree_nodes']} nodes, {report['wrong_parents']} wrong parents, "
+                   f"statistics match: {report['statistics_match']}, treelib intact: {report['treelib_intact']}")
+        for error in report['errors']:
+            click.echo(f"  error: {error}")
+        click.echo(f"  {'PASS' if report['ok'] else 'FAIL'}")
+    if not all(report['ok'] for report in reports):
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option('--modules', default=20, type=int, help='Modules in the synthetic course')
+@click.option('--pages', default=10, type=int, help='Pages per module')
+@click.option('--items', default=25, type=int, help='Documents per page')
+def row_benchmark(modules, pages, items):
+    """
+    Time the per-node cost of building export rows, before and after the row model.
+    Runs offline on a synthetic course.
+
+    Example:
+        python -m test.pipeline_testing row-benchmark --modules 20 --pages 10 --items 25
+    """
+    from test.pipeline_testing.row_benchmark import run_row_benchmark
+
+    report = run_row_benchmark(modules=modules, pages=pages, items=items)
+    click.echo(f"{report['nodes']} content nodes, microseconds per node")
+    for stage in ("fields", "document_dict"):
+        before, after = report[f"{stage}_before_us"], report[f"{stage}_after_us"]
+        click.echo(f"  {stage}: {before} -> {after} ({before / max(after, 0.1):.1f}x), "
+                   f"{report[f'{stage}_mismatches']} rows differ")
+
+
+@cli.command()
+@click.option('--modules', default=10, type=int, help='Modules in the synthetic course')
+@click.option('--depth', default=6, type=int, help='Folder levels between a module and its pages')
+@click.option('--pages', default=5, type=int, help='Pages per innermost folder')
+@click.option('--items', default=20, type=int, help='Documents per page')
+def path_benchmark(modules, depth, pages, items):
+    """
+    Time save-path construction on a deeply nested course, before and after the folder cache.
+    Runs offline on a synthetic course.
+
+    Example:
+        python -m test.pipeline_testing path-benchmark --depth 8
+    """
+    from test.pipeline_testing.path_benchmark import run_path_benchmark
+
+    report = run_path_benchmark(modules=modules, depth=depth, pages=pages, items=items)
+    click.echo(f"{report['nodes']} content nodes, {report['depth']} folder levels, "
+               f"{report['shortened']} paths shortened to fit 260 characters")
+    click.echo(f"  microseconds per node: {report['before_us']} -> {report['after_us']} "
+               f"({report['before_us'] / max(report['after_us'], 0.1):.1f}x)")
+    click.echo(f"  paths that differ: {report['mismatches']} cached, {report['uncached_mismatches']} uncached")
+
+
+
+@cli.command()
+@click.option('--courses', default=20000, type=int, help='Courses in the mock account')
+@click.option('--latency', default=0.15, type=float, help='Simulated API round trip in seconds')
+@click.option('--workers', default=4, type=int, help='Concurrent page requests')
+@click.option('--requests-per-second', 'requests_per_second', default=10.0, type=float,
+              help='Request rate shared by the workers (0 = unlimited)')
+@click.option('--throttle-every', 'throttle_every', default=0, type=int,
+              help='Answer every Nth request with 403 Rate Limit Exceeded (0 = never)')
+@click.option('--no-last-link', 'no_last_link', is_flag=True, help='Leave rel="last" out of the Link header')
+@click.option('--skip-legacy', 'skip_legacy', is_flag=True, help='Skip the one-page-at-a-time baseline')
+@click.option('--delta-courses', 'delta_courses', default=200, type=int,
+              help='Courses in the mock account for the --updated-since listing (checks each course)')
+def course_list_benchmark(courses, latency, workers, requests_per_second, throttle_every, no_last_link,
+                          skip_legacy, delta_courses):
+    """
+    Time listing all courses of an account against a local mock Canvas, one
+    page at a time (as before) and with concurrent paging. Runs offline.
+
+    Example:
+        python -m test.pipeline_testing course-list-benchmark --courses 20000 --throttle-every 25
+    """
+    from test.pipeline_testing.mock_canvas_accounts import run_account_listing
+
+    report = run_account_listing(courses=courses, latency=latency, workers=workers,
+                                 requests_per_second=requests_per_second, throttle_every=throttle_every,
+                                 last_link=not no_last_link, legacy=not skip_legacy, delta_courses=delta_courses)
+    click.echo(f"{report['courses']} courses")
+    if "legacy_seconds" in report:
+        click.echo(f"  one page at a time: {report['legacy_seconds']}s, complete: {report['legacy_matches']}")
+    click.echo(f"  concurrent: {report['seconds']}s, {report['requests']} requests, {report['retries']} retries, "
+               f"{report['failed_pages']} failed pages, complete: {report['matches']}")
+    click.echo(f"  term filter: {report['term_courses']} courses, correct: {report['term_matches']}")
+    click.echo(f"  updated since: {report['delta_courses']} of {delta_courses} courses in {report['delta_seconds']}s, "
+               f"{report['delta_requests']} requests, correct: {report['delta_matches']}")
+
 if __name__ == '__main__':
     cli()
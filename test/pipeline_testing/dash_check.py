@@ -0,0 +1,100 @@
+"""
+Check of the DASH downloader against a local static-file stand-in.
+
+Serves ``fixtures/dash`` (an MPD with two video representations addressed by
+``$Number$`` and a fixed duration, and one audio representation addressed by
+``$Time$`` and a ``SegmentTimeline``, plus their init and media segments)
+with ``http.server``, then:
+
+- parses the manifest with ``core.dash.parse_mpd`` and compares every
+  representation's URLs with the fixture's files
+- writes every representation with ``_download_representation``, with one
+  worker and with several, and compares the output with the init segment and
+  media segments concatenated in order
+- runs ``download_dash`` end to end: lowest-bandwidth video plus the
+  ``.audio.m4a`` file next to it
+- points a representation at a missing segment and checks that
+  ``DownloadInterrupted`` is raised and no ``.part`` file is left behind
+"""
+
+import os
+import tempfile
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "dash")
+
+# Files of each representation in the order they must be written
+EXPECTED = {
+    "v360": ["v360/init.mp4"] + [f"v360/seg-{number:03d}.m4s" for number in range(1, 5)],
+    "v720": ["v720/init.mp4"] + [f"v720/seg-{number:03d}.m4s" for number in range(1, 5)],
+    "a64": ["a64/init.mp4"] + [f"a64/seg-{time}.m4s" for time in (0, 4, 8, 12)],
+}
+
+
+def _expected_bytes(representation_id: str) -> bytes:
+    data = b""
+    for name in EXPECTED[representation_id]:
+        with open(os.path.join(FIXTURE, name), "rb") as f:
+            data += f.read()
+    return data
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def run_dash_check(workers: int = 4) -> list:
+    """One ``(check, passed, detail)`` tuple per check."""
+    import requests
+
+    from core.dash import _download_representation, download_dash, parse_mpd
+    from core.file_writer import DownloadInterrupted, part_path
+    from test.pipeline_testing.write_benchmark import StaticFileServer
+
+    checks = []
+    with StaticFileServer(FIXTURE) as server, tempfile.TemporaryDirectory() as folder:
+        manifest_url = server.url("manifest.mpd")
+        manifest_text = requests.get(manifest_url).text
+        streams = parse_mpd(manifest_text, manifest_url)
+
+        ids = {"video": ["v360", "v720"], "audio": ["a64"]}
+        for content_type, expected_ids in ids.items():
+            for representation, representation_id in zip(streams[content_type], expected_ids):
+                urls = representation.urls()
+                expected_urls = [server.url(name) for name in EXPECTED[representation_id]]
+                checks.append((f"parse_mpd {representation_id} urls", urls == expected_urls,
+                               f"{len(urls)} urls"))
+            # zip() above pairs them lowest bandwidth first, so the url checks also cover the order
+            checks.append((f"parse_mpd {content_type} representations",
+                           len(streams[content_type]) == len(expected_ids),
+                           f"bandwidths {[item.bandwidth for item in streams[content_type]]}"))
+
+        for content_type, expected_ids in ids.items():
+            for representation, representation_id in zip(streams[content_type], expected_ids):
+                for worker_count in sorted({1, workers}):
+                    target = os.path.join(folder, f"{representation_id}-{worker_count}.mp4")
+                    result = _download_representation(representation, target, {}, worker_count)
+                    expected = _expected_bytes(representation_id)
+                    checks.append((f"_download_representation {representation_id}, {worker_count} workers",
+                                   _read(target) == expected and result.bytes_written == len(expected)
+                                   and not os.path.exists(part_path(target)),
+                                   f"{result.bytes_written} bytes"))
+
+        target = os.path.join(folder, "lecture.mp4")
+        download_dash(manifest_text, manifest_url, target, workers=workers)
+        audio_target = os.path.join(folder, "lecture.audio.m4a")
+        checks.append(("download_dash video", _read(target) == _expected_bytes("v360"), "lowest bandwidth video"))
+        checks.append(("download_dash audio", os.path.isfile(audio_target)
+                       and _read(audio_target) == _expected_bytes("a64"), os.path.basename(audio_target)))
+
+        broken = streams["video"][0]
+        broken.segment_urls = broken.segment_urls[:2] + [server.url("v360/seg-099.m4s")] + broken.segment_urls[2:]
+        target = os.path.join(folder, "broken.mp4")
+        try:
+            _download_representation(broken, target, {}, workers)
+            interrupted = False
+        except DownloadInterrupted:
+            interrupted = True
+        checks.append(("missing segment", interrupted and not os.path.exists(target)
+                       and not os.path.exists(part_path(target)), "DownloadInterrupted, nothing left behind"))
+    return checks
@@ -0,0 +1,72 @@
+"""
+Benchmark of the Excel export on a large synthetic inventory.
+
+Builds a course inventory with ``rows`` Documents rows (every ninth one
+hidden, the rest with a hyperlink) and writes it twice with
+``tools.export_to_excel.build_xcel_file``:
+
+- the regular workbook, with every cell held in memory until the save
+- write-only (``--excel-streaming``) sheets, with rows written as they are appended
+
+Reports seconds for each, optionally the peak Python heap (``tracemalloc``;
+slows the run down), and whether both workbooks hold the same cell values.
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+
+def synthetic_inventory(rows: int = 100000) -> dict:
+    """A course inventory with ``rows`` documents, in the shape ``save_as_excel`` receives."""
+    documents = [{
+        "file_type": "pdf",
+        "is_hidden": index % 9 == 0,
+        "order": index // 50,
+        "save_path": f"C:/Downloads/BIOL 101/Modules/Week {index // 50}/Documents/Reading {index}.pdf",
+        "scan_date": "2026-10-18 12:00:00",
+        "source_page_type": "Page",
+        "source_page_url": f"https://canvas.example.edu/courses/1/pages/{index // 50}",
+        "title": f"Reading {index}",
+        "url": f"https://canvas.example.edu/courses/1/files/{index}",
+    } for index in range(rows)]
+    return {"course_id": "benchmark", "content": {"documents": {"documents": documents, "document_sites": []}}}
+
+
+def _write(inventory: dict, path: str, streaming: bool, measure_memory: bool) -> dict:
+    from tools.export_to_excel import build_xcel_file
+
+    if measure_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    build_xcel_file(inventory, False, streaming).save(path)
+    result = {"seconds": round(time.perf_counter() - start, 1), "file_mb": round(os.path.getsize(path) / 1048576, 1)}
+    if measure_memory:
+        result["peak_heap_mb"] = round(tracemalloc.get_traced_memory()[1] / 1048576, 1)
+        tracemalloc.stop()
+    return result
+
+
+def _values(path: str) -> dict:
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return {sheet.title: list(sheet.iter_rows(values_only=True)) for sheet in workbook.worksheets}
+    finally:
+        workbook.close()
+
+
+def run_excel_benchmark(rows: int = 100000, measure_memory: bool = False, compare: bool = True) -> dict:
+    """Seconds (and peak heap) of the regular and streaming writes, and whether their cells match."""
+    inventory = synthetic_inventory(rows)
+    report = {"rows": rows}
+    with tempfile.TemporaryDirectory() as folder:
+        paths = {}
+        for mode, streaming in (("regular", False), ("streaming", True)):
+            paths[mode] = os.path.join(folder, f"{mode}.xlsm")
+            report[mode] = _write(inventory, paths[mode], streaming, measure_memory)
+        if compare:
+            report["same_values"] = _values(paths["regular"]) == _values(paths["streaming"])
+    return report
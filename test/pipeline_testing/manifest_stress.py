@@ -0,0 +1,177 @@
+"""
+Stress check of the shared Manifest and CanvasTree under concurrent inserts.
+
+Several threads race to build the same synthetic course: every thread walks
+every module and item in its own random order. A node is only built by the
+thread that wins ``Manifest.claim_id``; a tenth of the first builds fail and
+give their claim back with ``release_id``, so another attempt has to pick the
+id up. Items discovered from links race through ``add_item_if_absent``
+instead. Afterwards the check counts:
+
+- ids built more than once, or missing from the manifest
+- manifest entries holding more than one node, and claims left behind
+- tree nodes whose parent in the tree is not their ``parent`` attribute
+- differences between the tree's statistics and what was built
+
+Both tree modes are checked (full treelib tree and headless).
+"""
+
+import random
+import threading
+from collections import Counter
+
+
+class _Root:
+    def __init__(self):
+        self.root_node = True
+        self.title = "Stress Course"
+        self.course_id = "0"
+        self.course_url = ""
+
+
+class Module:
+    def __init__(self, item_id, parent):
+        self.item_id = item_id
+        self.parent = parent
+        self.title = f"Module {item_id}"
+        self.is_resource = True
+
+
+class Document:
+    def __init__(self, item_id, parent):
+        self.item_id = item_id
+        self.parent = parent
+        self.title = f"Document {item_id}"
+        self.is_content = True
+
+
+class Link:
+    def __init__(self, item_id, parent):
+        self.item_id = item_id
+        self.parent = parent
+        self.title = f"Link {item_id}"
+        self.is_content = True
+
+
+def _stress(headless: bool, threads: int, modules: int, items: int, links: int, seed: int) -> dict:
+    from core.manifest import Manifest
+    from tools.canvas_tree import CanvasTree
+
+    manifest = Manifest()
+    tree = CanvasTree(headless=headless)
+    root = _Root()
+    tree.init_node(root)
+
+    lock = threading.Lock()
+    builds = Counter()          # item id -> nodes built and added
+    failed_once = set()         # ids whose first build was made to fail
+    link_adds = Counter()       # link id -> successful add_item_if_absent calls
+    errors = []
+    module_ready = threading.Barrier(threads)
+
+    def build(item_id, make_node):
+        # Returns False if this attempt failed and gave its claim back
+        if not manifest.claim_id(item_id):
+            return True
+        with lock:
+            fail = str(item_id).endswith("0") and item_id not in failed_once
+            if fail:
+                failed_once.add(item_id)
+        if fail:
+            manifest.release_id(item_id)
+            return False
+        node = make_node()
+        tree.add_node(node)
+        manifest.add_item_to_manifest(node)
+        with lock:
+            builds[item_id] += 1
+        return True
+
+    def module_of(item_id):
+        return manifest.get_item_from_manifest(f"module-{item_id % modules}")
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        retry = []
+
+        module_ids = list(range(modules))
+        rng.shuffle(module_ids)
+        for module_id in module_ids:
+            if not build(f"module-{module_id}", lambda: Module(f"module-{module_id}", root)):
+                retry.append(("module", module_id))
+        for kind, module_id in retry:
+            build(f"module-{module_id}", lambda: Module(f"module-{module_id}", root))
+        # Items hang off modules; every module must exist before any item is built
+        module_ready.wait()
+
+        retry = []
+        work = [("item", item_id) for item_id in range(items)] + [("link", link_id) for link_id in range(links)]
+        rng.shuffle(work)
+        for kind, item_id in work:
+            if kind == "item":
+                if not build(item_id, lambda: Document(item_id, module_of(item_id))):
+                    retry.append(item_id)
+            else:
+                node = Link(f"link-{item_id}", module_of(item_id))
+                if manifest.add_item_if_absent(node):
+                    tree.add_node(node)
+                    with lock:
+                        link_adds[node.item_id] += 1
+        for item_id in retry:
+            build(item_id, lambda: Document(item_id, module_of(item_id)))
+
+    def guarded(index):
+        try:
+            worker(index)
+        except Exception as exc:
+            errors.append(repr(exc))
+            module_ready.abort()
+
+    workers = [threading.Thread(target=guarded, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    expected_ids = [f"module-{module_id}" for module_id in range(modules)] + list(range(items))
+    link_ids = [f"link-{link_id}" for link_id in range(links)]
+    report = {
+        "mode": "headless" if headless else "full",
+        "inserts": threads * (modules + items + links),
+        "nodes": len(expected_ids) + len(link_ids),
+        "errors": errors,
+        "released_claims": len(failed_once),
+        "duplicate_builds": sum(1 for count in builds.values() if count > 1)
+                            + sum(1 for count in link_adds.values() if count > 1),
+        "missing": sum(1 for item_id in expected_ids if builds[item_id] != 1)
+                   + sum(1 for item_id in link_ids if link_adds[item_id] != 1),
+        "manifest_duplicates": sum(1 for nodes in manifest.manifest.values() if len(nodes) != 1),
+        "leftover_claims": len(manifest._claimed),
+    }
+
+    structure = tree.structure()
+    report["tree_nodes"] = len(structure)
+    report["wrong_parents"] = sum(1 for node, parent in structure if node.parent is not parent)
+    statistics = tree.get_statistics()
+    report["statistics_match"] = (statistics.get("Module", 0) == modules
+                                  and statistics.get("Document", 0) == items
+                                  and statistics.get("Link", 0) == links
+                                  and statistics.get("_total_content", 0) == items + links)
+
+    # The treelib tree (built on demand in headless mode) must hold the same parent links
+    tree._ensure_tree()
+    treelib_parents = sum(1 for node, parent in structure
+                          if tree.tree.parent(str(id(node))).identifier == str(id(parent)))
+    report["treelib_intact"] = len(tree.tree) == len(structure) + 1 and treelib_parents == len(structure)
+
+    report["ok"] = (not errors and report["duplicate_builds"] == 0 and report["missing"] == 0
+                    and report["manifest_duplicates"] == 0 and report["leftover_claims"] == 0
+                    and report["tree_nodes"] == report["nodes"] and report["wrong_parents"] == 0
+                    and report["statistics_match"] and report["treelib_intact"])
+    return report
+
+
+def run_manifest_stress(threads: int = 16, modules: int = 50, items: int = 3000, links: int = 1000,
+                        seed: int = 0) -> list:
+    """One report per tree mode; ``report["ok"]`` is False if any check failed."""
+    return [_stress(headless, threads, modules, items, links, seed) for headless in (False, True)]
@@ -0,0 +1,207 @@
+"""
+Mock Canvas ``/accounts/:id/courses`` endpoint for testing the course listing offline.
+
+Serves ``courses`` synthetic courses, ``per_page`` at a time, with Canvas-style
+``Link`` headers (``rel="last"`` can be left out) and
+``X-Rate-Limit-Remaining``. ``latency`` simulates the API round trip,
+``throttle_every`` answers every Nth request with ``403 Rate Limit Exceeded``.
+``enrollment_term_id`` filters on ``course_id % 3``.
+
+As on a real instance, the listed courses carry ``created_at`` but no
+``updated_at``. ``/api/v1/courses/:id/pages`` and ``/files`` (sorted by
+``updated_at``, newest first) give the content change signal: courses ending
+in 0 have a recently edited page, courses ending in 5 a recently replaced
+file, and course ids ending in 07 were created recently.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# updated_at of the courses that count as changed, and of the rest
+RECENT = "2026-10-17T03:00:00Z"
+OLD = "2025-01-15T12:00:00Z"
+
+
+def mock_course(course_id: int) -> dict:
+    term_code = ("2247", "2253", "2257")[course_id % 3]
+    return {
+        "id": course_id,
+        "name": f"Course {course_id}: Introduction to Things",
+        "course_code": f"{term_code}-BIOL-{100 + course_id % 400}-{course_id % 9:02d}-1-{course_id}",
+        "enrollment_term_id": course_id % 3,
+        "created_at": RECENT if course_id % 100 == 7 else OLD,
+    }
+
+
+def mock_latest_content(course_id: int, collection: str) -> list:
+    """The newest page or file of a mock course, as ``sort=updated_at&order=desc&per_page=1`` returns it."""
+    recent = course_id % 10 == (0 if collection == "pages" else 5)
+    return [{"id": course_id * 10, "updated_at": RECENT if recent else OLD}]
+
+
+def changed_course(course_id: int) -> bool:
+    """True for the mock courses that a listing with ``updated_since`` between OLD and RECENT keeps."""
+    return course_id % 10 in (0, 5) or course_id % 100 == 7
+
+
+class MockCanvasAccountServer:
+
+    """Serves ``/api/v1/accounts/1/courses`` on localhost in a background thread."""
+
+    def __init__(self, courses: int = 20000, latency: float = 0.15, throttle_every: int = 0,
+                 last_link: bool = True, access_token: str = "test-token"):
+        self.courses = courses
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.last_link = last_link
+        self.access_token = access_token
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_path(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/api/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body, headers: dict = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                with server._lock:
+                    server.requests += 1
+                    count = server.requests
+                time.sleep(server.latency)
+
+                if query.get("access_token", [""])[0] != server.access_token:
+                    self._send(401, {"errors": [{"message": "Invalid access token."}]})
+                    return
+                if server.throttle_every and count % server.throttle_every == 0:
+                    self._send(403, "403 Forbidden (Rate Limit Exceeded)", {"X-Rate-Limit-Remaining": "0"})
+                    return
+
+                content = re.fullmatch(r"/api/v1/courses/(\d+)/(pages|files)", url.path)
+                if content:
+                    self._send(200, mock_latest_content(int(content.group(1)), content.group(2)),
+                               {"X-Rate-Limit-Remaining": "650.0"})
+                    return
+
+                term = query.get("enrollment_term_id", [""])[0]
+                ids = [course_id for course_id in range(1, server.courses + 1)
+                       if not term or course_id % 3 == int(term)]
+                page = int(query.get("page", ["1"])[0])
+                per_page = min(int(query.get("per_page", ["10"])[0]), 100)
+                last = max(1, -(-len(ids) // per_page))
+                courses = [mock_course(course_id) for course_id in ids[(page - 1) * per_page:page * per_page]]
+
+                base = f"{server.api_path}/accounts/1/courses?"
+                extra = f"&enrollment_term_id={term}" if term else ""
+                links = [f'<{base}page={page}&per_page={per_page}{extra}>; rel="current"',
+                         f'<{base}page=1&per_page={per_page}{extra}>; rel="first"']
+                if page < last:
+                    links.append(f'<{base}page={page + 1}&per_page={per_page}{extra}>; rel="next"')
+                if server.last_link:
+                    links.append(f'<{base}page={last}&per_page={per_page}{extra}>; rel="last"')
+                self._send(200, courses, {"Link": ",".join(links), "X-Rate-Limit-Remaining": "650.0"})
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def legacy_listing(server, per_page: int = 100, delay: float = 0.3) -> list:
+    """The courses as ``extract_courses`` used to fetch them: one page at a time, sleeping in between."""
+    import requests
+
+    courses = []
+    page = 1
+    while True:
+        response = requests.get(f"{server.api_path}/accounts/1/courses",
+                                params={"page": page, "per_page": per_page, "access_token": server.access_token})
+        page_courses = response.json() if response.status_code == 200 else None
+        if not page_courses:
+            break
+        courses.extend(page_courses)
+        page += 1
+        time.sleep(delay)
+    return courses
+
+
+def run_account_listing(courses: int = 20000, latency: float = 0.15, workers: int = 4,
+                        requests_per_second: float = 10, throttle_every: int = 0, last_link: bool = True,
+                        legacy: bool = True, delta_courses: int = 200) -> dict:
+    """
+    List the mock account the old way and with ``AccountCourseLister``, then
+    run a term-filtered listing. The delta (``updated_since``) listing checks
+    the content of each course, so it runs on a separate mock account of
+    ``delta_courses`` courses. Returns timings, request counts and whether the
+    listings match.
+    """
+    from network.account_courses import AccountCourseLister
+
+    report = {"courses": courses}
+    with MockCanvasAccountServer(courses=courses, latency=latency, throttle_every=throttle_every,
+                                 last_link=last_link) as server:
+        options = {"api_path": server.api_path, "access_token": server.access_token, "workers": workers,
+                   "requests_per_second": requests_per_second}
+        expected = [mock_course(course_id)["id"] for course_id in range(1, courses + 1)]
+
+        if legacy:
+            start = time.perf_counter()
+            legacy_ids = [course["id"] for course in legacy_listing(server)]
+            report["legacy_seconds"] = round(time.perf_counter() - start, 2)
+            report["legacy_matches"] = legacy_ids == expected
+
+        lister = AccountCourseLister(**options)
+        requests_before = server.requests
+        start = time.perf_counter()
+        ids = [course["id"] for course in lister.courses()]
+        report["seconds"] = round(time.perf_counter() - start, 2)
+        report["requests"] = server.requests - requests_before
+        report["retries"] = lister.stats["retries"]
+        report["failed_pages"] = lister.stats["failed_pages"]
+        report["matches"] = ids == expected
+
+        term_ids = [course["id"] for course in AccountCourseLister(**options).courses(enrollment_term_id=1)]
+        report["term_courses"] = len(term_ids)
+        report["term_matches"] = term_ids == [course_id for course_id in expected if course_id % 3 == 1]
+
+    with MockCanvasAccountServer(courses=delta_courses, latency=latency, throttle_every=throttle_every,
+                                 last_link=last_link) as server:
+        lister = AccountCourseLister(api_path=server.api_path, access_token=server.access_token, workers=workers,
+                                     requests_per_second=requests_per_second)
+        start = time.perf_counter()
+        delta_ids = [course["id"] for course in lister.courses(updated_since="2026-10-16")]
+        report["delta_seconds"] = round(time.perf_counter() - start, 2)
+        report["delta_requests"] = lister.stats["requests"]
+        report["delta_courses"] = len(delta_ids)
+        report["delta_matches"] = delta_ids == [course_id for course_id in range(1, delta_courses + 1)
+                                                if changed_course(course_id)]
+    return report
@@ -0,0 +1,125 @@
+"""
+Mock YouTube captions.list endpoint for testing the caption checker offline.
+
+The caption kind of each video is derived from its ID, so results are
+repeatable: IDs ending in 0-3 have a standard track, 4-6 only ASR captions,
+and anything else no captions. ``latency`` simulates the API round trip and
+``rate_limit_every`` answers every Nth request with 429 + Retry-After.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def track_kinds(video_id: str) -> list:
+    last = video_id[-1:]
+    if last in "0123":
+        return ["standard", "asr"]
+    if last in "456":
+        return ["asr"]
+    return []
+
+
+class MockYouTubeServer:
+
+    """Serves ``/youtube/v3/captions`` on localhost in a background thread."""
+
+    def __init__(self, latency: float = 0.2, rate_limit_every: int = 0, api_key: str = "test-key"):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.api_key = api_key
+        self.requests = 0
+        self.video_ids = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/youtube/v3/captions"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: dict = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                video_id = query.get("videoId", [""])[0]
+                with server._lock:
+                    server.requests += 1
+                    count = server.requests
+                    server.video_ids.append(video_id)
+                time.sleep(server.latency)
+                if query.get("key", [""])[0] != server.api_key:
+                    self._send(403, {"error": {"code": 403, "message": "API key not valid"}})
+                elif server.rate_limit_every and count % server.rate_limit_every == 0:
+                    self._send(429, {"error": {"code": 429}}, {"Retry-After": "1"})
+                else:
+                    items = [{"id": f"{video_id}-{kind}", "snippet": {"videoId": video_id, "trackKind": kind}}
+                             for kind in track_kinds(video_id)]
+                    self._send(200, {"kind": "youtube#captionListResponse", "items": items})
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run_caption_check(videos: int = 500, repeats: int = 3, latency: float = 0.2, rate_limit_every: int = 0,
+                      workers: int = 8, requests_per_second: float = 0) -> dict:
+    """
+    Check ``videos`` links (each linked ``repeats`` times) against the mock
+    server twice: once with an empty cache and once with the cache the first
+    pass wrote. Returns timings, request counts and any wrong statuses.
+    """
+    import os
+    import tempfile
+    from tools import captioning_check
+
+    links = [f"https://www.youtube.com/watch?v=vid{index:05d}" for index in range(videos)] * repeats
+    expected = {}
+    for link in links:
+        video_id = captioning_check.youtube_video_id(link)
+        kinds = track_kinds(video_id)
+        expected[video_id] = (captioning_check.CAPTIONED if "standard" in kinds
+                              else captioning_check.AUTO_CAPTION if kinds else captioning_check.NOT_CAPTIONED)
+
+    report = {"videos": videos, "links": len(links)}
+    with tempfile.TemporaryDirectory() as folder, \
+            MockYouTubeServer(latency=latency, rate_limit_every=rate_limit_every) as server:
+        cache_path = os.path.join(folder, captioning_check.CACHE_FILENAME)
+        for run in ("cold", "warm"):
+            checker = captioning_check.CaptionChecker(cache_path=cache_path, api_url=server.url, workers=workers,
+                                                      requests_per_second=requests_per_second)
+            checker._api_key = server.api_key
+            requests_before = server.requests
+            start = time.perf_counter()
+            results = checker.prefetch(links)
+            statuses = [checker.status(link) for link in links]
+            report[f"{run}_seconds"] = round(time.perf_counter() - start, 2)
+            report[f"{run}_requests"] = server.requests - requests_before
+            report[f"{run}_wrong"] = sum(1 for video_id, status in results.items() if status != expected[video_id])
+            report[f"{run}_missing"] = sum(1 for status in statuses if status is None)
+    return report
@@ -0,0 +1,104 @@
+"""
+Benchmark of save-path construction on a course with deep module nesting.
+
+Builds a synthetic course whose documents sit ``depth`` resource levels below
+their module, with long, non-ASCII titles full of characters Windows forbids,
+so part of the paths exceed 260 characters and are shortened. Save paths are
+built two ways:
+
+- as ``path_constructor`` used to: every ancestor title sanitized again for
+  every file, ``sort_by_date()`` called per file
+- through one shared ``core.row_model.RowModel`` and the memoized
+  ``sanitize_windows_filename``
+
+Both must produce the same paths; mismatches are counted.
+"""
+
+import os
+
+from test.pipeline_testing.row_benchmark import Document, Module, Modules, Page, _Resource, _Root, _time
+
+
+class Folder(_Resource):
+    pass
+
+
+def build_nested_course(modules: int = 10, depth: int = 6, pages: int = 5, items: int = 20) -> list:
+    """Document nodes ``depth`` folders below each module: ``modules * pages * items`` in total."""
+    root = _Root()
+    modules_node = Modules(root, "Modules")
+    documents = []
+    for module_index in range(modules):
+        parent = Module(modules_node, f"Wöche {module_index + 1}: Intro / Überblick, Teil {module_index} ",
+                        position=module_index + 1)
+        for level in range(depth):
+            parent = Folder(parent, f"U{level}: <Notes> {'x' * ((module_index % 4) * 10)}")
+        for page_index in range(pages):
+            page = Page(parent, f"Page {page_index} | Lecture ~ Slides?")
+            for item_index in range(items):
+                documents.append(Document(page, f"Reading {item_index}: Chapter {page_index} (annotated)",
+                                          f"https://example.com/{module_index}/{page_index}/{item_index}.pdf"))
+    return documents
+
+
+def legacy_path_constructor(root_directory, node, flatten):
+    """``path_constructor`` before the folder cache, with an uncached sanitizer."""
+    from core.content_scaffolds import build_path
+    from core.downloader import derive_file_name, sort_by_date
+    from tools.string_checking.url_cleaning import sanitize_windows_filename
+
+    sanitize = sanitize_windows_filename.__wrapped__
+    filename = sanitize(derive_file_name(node))
+    node_path = build_path(node, ignore_root=True)
+    paths = []
+
+    if flatten:
+        return os.path.join(root_directory, sort_by_date(), f"{node.__class__.__name__}s", filename)
+
+    for node_ in node_path:
+        if hasattr(node_, 'is_resource'):
+            if node_.__class__.__name__ == "Module":
+                folder_name = sanitize(f"{str(node_.position)}-{node_.title[:50]}", folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
+                paths.append(folder_name)
+            else:
+                folder_name = sanitize(node_.title[:50], folder=True).rstrip() if node_.title else str(node_.__class__.__name__)
+                paths.append(folder_name)
+
+    constructed_path = os.path.join(root_directory, sort_by_date(), *paths[::-1], f"{node.__class__.__name__}s", filename)
+
+    if len(constructed_path) > 260:
+        filename_, extension = os.path.splitext(filename)
+        if len(extension) > 5:
+            extension = extension[:5]
+        shortened_filename = f"{filename_[:20]}{extension}"
+        constructed_path = constructed_path.replace(filename, shortened_filename)
+
+    return constructed_path
+
+
+def run_path_benchmark(modules: int = 10, depth: int = 6, pages: int = 5, items: int = 20,
+                       directory: str = r"C:\Users\someone\Downloads\Canvas Bot\BIOL 101 - 12345") -> dict:
+    """Per-node microseconds before and after, paths over 260 characters, and paths that differ."""
+    from core.downloader import derive_file_name, path_constructor
+    from core.row_model import RowModel
+    from tools.string_checking.url_cleaning import sanitize_windows_filename
+
+    nodes = build_nested_course(modules, depth, pages, items)
+    report = {"nodes": len(nodes), "depth": depth}
+
+    legacy_seconds, legacy_paths = _time(lambda: [legacy_path_constructor(directory, node, False) for node in nodes])
+
+    def cached():
+        sanitize_windows_filename.cache_clear()
+        rows = RowModel()
+        return [path_constructor(directory, node, False, rows) for node in nodes]
+
+    seconds, paths = _time(cached)
+    report["before_us"] = round(legacy_seconds / len(nodes) * 1e6, 1)
+    report["after_us"] = round(seconds / len(nodes) * 1e6, 1)
+    report["shortened"] = sum(1 for node, path in zip(nodes, legacy_paths)
+                              if not path.endswith(sanitize_windows_filename(derive_file_name(node))))
+    report["mismatches"] = sum(1 for path, legacy_path in zip(paths, legacy_paths) if path != legacy_path)
+    report["uncached_mismatches"] = sum(1 for node, legacy_path in zip(nodes, legacy_paths)
+                                        if path_constructor(directory, node, False) != legacy_path)
+    return report
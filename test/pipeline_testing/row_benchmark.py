@@ -0,0 +1,138 @@
+"""
+Microbenchmark of the export stage's per-node cost.
+
+Builds a synthetic course tree (modules -> pages -> documents, with some
+unpublished modules and locked pages) and times the fields every content row
+shares, computed two ways:
+
+- per node, as the ``*_dict`` builders used to: ``get_source_page_url``,
+  ``is_hidden``, ``get_order``, ``build_path`` and ``datetime.now()``
+- through one shared ``core.row_model.RowModel`` (``row_fields``)
+
+and the same for complete ``document_dict`` rows with save paths. Both ways
+must produce the same rows; mismatches are counted.
+"""
+
+import time
+from datetime import datetime
+
+
+class _Root:
+    def __init__(self):
+        self.root_node = True
+        self.title = "Benchmark Course"
+        self.course_id = "0"
+
+
+class _Resource:
+    def __init__(self, parent, title, **attributes):
+        self.parent = parent
+        self.title = title
+        self.is_resource = True
+        self.__dict__.update(attributes)
+
+
+class Modules(_Resource):
+    pass
+
+
+class Module(_Resource):
+    pass
+
+
+class Page(_Resource):
+    pass
+
+
+class Document:
+    def __init__(self, parent, title, url):
+        self.parent = parent
+        self.title = title
+        self.url = url
+        self.display_name = f"{title}.pdf"
+        self.is_content = True
+        self.is_canvas_studio_file = False
+
+
+def build_course(modules: int = 20, pages: int = 10, items: int = 25) -> list:
+    """The document nodes of a synthetic course with ``modules * pages * items`` documents."""
+    root = _Root()
+    modules_node = Modules(root, "Modules", url="https://example.instructure.com/courses/0/modules")
+    documents = []
+    for module_index in range(modules):
+        module = Module(modules_node, f"Week {module_index + 1}", id=module_index, position=module_index + 1,
+                        published=module_index % 7 != 0, url="https://example.instructure.com/courses/0")
+        for page_index in range(pages):
+            page = Page(module, f"Page {module_index}.{page_index}", locked=page_index % 9 == 0,
+                        html_url=f"https://example.instructure.com/courses/0/pages/{module_index}-{page_index}")
+            for item_index in range(items):
+                documents.append(Document(page, f"Reading {item_index}",
+                                          f"https://example.com/{module_index}/{page_index}/{item_index}.pdf"))
+    return documents
+
+
+def legacy_row_fields(node) -> dict:
+    """The shared fields as each ``*_dict`` builder computed them per node."""
+    from core.content_scaffolds import build_path, get_order, get_source_page_url, is_hidden
+
+    return {
+        "title": getattr(node, "title", None),
+        "url": getattr(node, "url", None),
+        "source_page_type": node.parent.__class__.__name__,
+        "source_page_url": get_source_page_url(node),
+        "scan_date": datetime.now(),
+        "is_hidden": is_hidden(node),
+        "order": get_order(node),
+        "path": [n.title for n in build_path(node, ignore_root=True) if n.title is not None],
+    }
+
+
+def _legacy_document_dict(node, directory):
+    from core.content_scaffolds import get_file_type
+    from core.downloader import path_constructor
+
+    return {**legacy_row_fields(node), "file_type": get_file_type(node),
+            "save_path": path_constructor(directory, node, False)}
+
+
+def _same(rows, legacy_rows) -> int:
+    mismatches = 0
+    for row, legacy_row in zip(rows, legacy_rows):
+        row = dict(row, scan_date=None)
+        legacy_row = dict(legacy_row, scan_date=None)
+        mismatches += row != legacy_row
+    return mismatches
+
+
+def _time(function, repeat: int = 3) -> tuple:
+    # Best of ``repeat`` runs; each run starts from scratch (a new RowModel)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_row_benchmark(modules: int = 20, pages: int = 10, items: int = 25, directory: str = "downloads") -> dict:
+    """Per-node microseconds before and after, and the number of rows that differ."""
+    from core.content_scaffolds import document_dict, row_fields
+    from core.row_model import RowModel
+
+    nodes = build_course(modules, pages, items)
+    report = {"nodes": len(nodes)}
+
+    legacy_seconds, legacy_rows = _time(lambda: [legacy_row_fields(node) for node in nodes])
+    seconds, new_rows = _time(lambda: [row_fields(node, rows) for rows in [RowModel()] for node in nodes])
+    report["fields_before_us"] = round(legacy_seconds / len(nodes) * 1e6, 1)
+    report["fields_after_us"] = round(seconds / len(nodes) * 1e6, 1)
+    report["fields_mismatches"] = _same(new_rows, legacy_rows)
+
+    legacy_seconds, legacy_rows = _time(lambda: [_legacy_document_dict(node, directory) for node in nodes])
+    seconds, new_rows = _time(lambda: [document_dict(node, directory, False, rows)
+                                       for rows in [RowModel()] for node in nodes])
+    report["document_dict_before_us"] = round(legacy_seconds / len(nodes) * 1e6, 1)
+    report["document_dict_after_us"] = round(seconds / len(nodes) * 1e6, 1)
+    report["document_dict_mismatches"] = _same(new_rows, legacy_rows)
+    return report
@@ -0,0 +1,128 @@
+"""
+Round-trip check of the shortcut writers in ``core.shortcuts``.
+
+Writes a ``.url``, a ``.desktop`` and a ``.lnk`` shortcut for a few URLs into
+a temporary folder with ``write_shortcut`` and parses each file back without
+any Windows API:
+
+- ``.url`` and ``.desktop`` are read with ``configparser``; the only keys
+  are the expected ones and ``URL`` is the (percent-encoded) URL
+- ``.lnk`` is decoded field by field following MS-SHLLINK: a 0x4C header
+  with the Shell Link CLSID and flags, a LinkInfo whose offsets stay inside
+  it and point at a fixed-drive VolumeID and ``explorer.exe``, then the NAME
+  and COMMAND_LINE_ARGUMENTS strings and the terminal block. The arguments
+  must be the URL in quotes.
+
+Also checks that no temporary file is left behind and that ``.desktop``
+entries are executable.
+"""
+
+import configparser
+import os
+import struct
+import sys
+import tempfile
+
+URLS = [
+    "https://canvas.example.edu/courses/101/pages/week-1-reading?module_item_id=55",
+    "https://canvas.example.edu/courses/101/files/2/download?verifier=a b\r\nIcon=evil",
+]
+
+
+def _ini(path: str, section: str) -> dict:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    with open(path, encoding="utf-8") as f:
+        parser.read_file(f)
+    return dict(parser[section]) if parser.sections() == [section] else {}
+
+
+def _string_data(data: bytes, offset: int):
+    count, = struct.unpack_from("<H", data, offset)
+    end = offset + 2 + count * 2
+    return data[offset + 2:end].decode("utf-16-le"), end
+
+
+def parse_lnk(data: bytes) -> dict:
+    """
+    Decode the parts of a Shell Link that ``lnk_shortcut`` writes.
+
+    Raises ``ValueError`` if a size, offset or flag is not what MS-SHLLINK
+    requires for such a link.
+    """
+    from core.shortcuts import (_DRIVE_FIXED, _HAS_ARGUMENTS, _HAS_LINK_INFO, _HAS_NAME, _IS_UNICODE,
+                                _LINK_CLSID, _VOLUME_ID_AND_LOCAL_BASE_PATH)
+
+    header_size, clsid, flags = struct.unpack_from("<I16sI", data, 0)
+    if header_size != 0x4C:
+        raise ValueError(f"header size {header_size:#x}, expected 0x4c")
+    if clsid != _LINK_CLSID:
+        raise ValueError("wrong LinkCLSID")
+    if flags != _HAS_LINK_INFO | _HAS_NAME | _HAS_ARGUMENTS | _IS_UNICODE:
+        raise ValueError(f"link flags {flags:#x}")
+
+    start = header_size
+    (info_size, info_header_size, info_flags, volume_offset, base_path_offset, network_offset,
+     suffix_offset) = struct.unpack_from("<7I", data, start)
+    if info_header_size != 0x1C or info_flags != _VOLUME_ID_AND_LOCAL_BASE_PATH or network_offset != 0:
+        raise ValueError("LinkInfo header")
+    if not info_header_size <= volume_offset < base_path_offset < suffix_offset < info_size:
+        raise ValueError(f"LinkInfo offsets {volume_offset}, {base_path_offset}, {suffix_offset} "
+                         f"outside a {info_size} byte LinkInfo")
+    if start + info_size > len(data):
+        raise ValueError("LinkInfo runs past the end of the file")
+
+    volume_size, drive_type, _serial, label_offset = struct.unpack_from("<4I", data, start + volume_offset)
+    if volume_offset + volume_size > base_path_offset or drive_type != _DRIVE_FIXED or label_offset != 0x10:
+        raise ValueError("VolumeID")
+    base_path = data[start + base_path_offset:data.index(b"\x00", start + base_path_offset)].decode("ascii")
+    suffix = data[start + suffix_offset:data.index(b"\x00", start + suffix_offset)]
+
+    name, offset = _string_data(data, start + info_size)
+    arguments, offset = _string_data(data, offset)
+    if data[offset:] != b"\x00\x00\x00\x00":
+        raise ValueError("missing terminal block")
+    return {"base_path": base_path, "suffix": suffix.decode("ascii"), "name": name, "arguments": arguments}
+
+
+def run_shortcut_check() -> list:
+    """One ``(check, passed, detail)`` tuple per check."""
+    from core.shortcuts import _LNK_TARGET, _safe_url, write_shortcut
+
+    checks = []
+    with tempfile.TemporaryDirectory() as folder:
+        for index, url in enumerate(URLS):
+            expected_url = _safe_url(url)
+            label = f"url {index + 1}"
+            target = os.path.join(folder, f"Lecture {index + 1} notés.pdf")
+            name = os.path.splitext(os.path.basename(target))[0]
+            if index == 0:
+                checks.append((f"{label} needs no encoding", expected_url == url, url))
+
+            path = write_shortcut(url, target, "url")
+            entry = _ini(path, "InternetShortcut")
+            checks.append((f".url {label}", entry == {"URL": expected_url}, f"{sorted(entry)}"))
+
+            path = write_shortcut(url, target, "desktop")
+            entry = _ini(path, "Desktop Entry")
+            executable = sys.platform.startswith("win") or os.access(path, os.X_OK)
+            checks.append((f".desktop {label}", entry.get("URL") == expected_url and entry.get("Name") == name
+                           and entry.get("Type") == "Link" and sorted(entry) == ["Icon", "Name", "Type", "URL",
+                                                                                 "Version"] and executable,
+                           f"{sorted(entry)}, executable: {executable}"))
+
+            path = write_shortcut(url, target, "lnk")
+            with open(path, "rb") as f:
+                data = f.read()
+            try:
+                link = parse_lnk(data)
+            except (ValueError, struct.error) as exc:
+                checks.append((f".lnk {label}", False, str(exc)))
+                continue
+            checks.append((f".lnk {label}", link["base_path"] == _LNK_TARGET and link["suffix"] == ""
+                           and link["name"] == name and link["arguments"] == f'"{expected_url}"',
+                           f"{len(data)} bytes, runs {link['base_path']} {link['arguments'][:40]}..."))
+
+        leftovers = [entry for entry in os.listdir(folder) if entry.startswith(".shortcut-")]
+        checks.append(("no temporary files", not leftovers, f"{len(os.listdir(folder))} files"))
+    return checks
@@ -0,0 +1,115 @@
+"""
+Benchmark of the download write path against a local HTTP stand-in.
+
+Serves one generated file from a temporary folder with ``http.server`` and
+downloads it with:
+
+- the writer ``_download_file`` used before: 8 KB chunks, ``flush()`` and
+  ``os.fsync()`` after every chunk, written straight to the final name
+- ``core.file_writer.write_response_atomically`` with the configured buffer
+  and one fsync, and once more with ``fsync=False``
+
+Reports MB/s for each, and checks that every copy matches the source and
+that no ``.part`` file is left behind.
+"""
+
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class StaticFileServer:
+
+    """Serves a folder on localhost in a background thread."""
+
+    def __init__(self, directory: str):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/{name}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def legacy_write(url: str, filename: str) -> None:
+    """The writer ``_download_file`` used before the .part file: fsync after every 8 KB chunk."""
+    response = requests.get(url, stream=True)
+    with open(filename, "wb") as file:
+        for chunk in response.iter_content(chunk_size=8192):
+            if chunk:
+                file.write(chunk)
+                file.flush()
+                os.fsync(file.fileno())
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_write_benchmark(size_mb: int = 200, directory: str = None) -> dict:
+    """
+    MB/s of each writer for one ``size_mb`` download, whether each copy
+    matches the source, and whether a ``.part`` file was left behind.
+
+    ``directory`` is where the copies are written (defaults to a temporary
+    folder); point it at a network drive to see the fsync cost there.
+    """
+    from core.file_writer import part_path, write_response_atomically
+
+    writers = [
+        ("per-chunk fsync (before)", legacy_write),
+        ("buffered .part, one fsync", lambda url, filename: write_response_atomically(
+            requests.get(url, stream=True), filename)),
+        ("buffered .part, no fsync", lambda url, filename: write_response_atomically(
+            requests.get(url, stream=True), filename, fsync=False)),
+    ]
+
+    report = {"size_mb": size_mb, "writers": []}
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with tempfile.TemporaryDirectory() as source_folder, \
+            tempfile.TemporaryDirectory(dir=directory) as target_folder, \
+            StaticFileServer(source_folder) as server:
+        source = os.path.join(source_folder, "lecture.bin")
+        with open(source, "wb") as f:
+            block = os.urandom(1024 * 1024)
+            for _ in range(size_mb):
+                f.write(block)
+        expected = _sha256(source)
+
+        for name, write in writers:
+            target = os.path.join(target_folder, "lecture.bin")
+            start = time.perf_counter()
+            write(server.url("lecture.bin"), target)
+            elapsed = time.perf_counter() - start
+            report["writers"].append({
+                "writer": name,
+                "mb_per_second": round(size_mb / elapsed, 1),
+                "intact": _sha256(target) == expected,
+                "part_left": os.path.exists(part_path(target)),
+            })
+            os.remove(target)
+    return report
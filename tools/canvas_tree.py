@@ -3,6 +3,7 @@ Enhanced Canvas Tree visualization with colors, icons, statistics, and URLs.
 """
 
 import sys
+import threading
 from treelib import Tree
 import warnings
 from colorama import Fore, Style, init
@@ -265,8 +266,8 @@ def _format_url(url, label=None, max_length=60):
     return f"{Fore.BLUE}{url_str}{Style.RESET_ALL}"
 
 
-def _format_node_display(node, show_urls=True):
-    """Create a formatted display string for a node."""
+def _format_node_display(node, show_urls=True, rows=None):
+    """Create a formatted display string for a node. ``rows`` (a RowModel) shares the hidden-state walk."""
     node_type = node.__class__.__name__
     color = COLORS.get(node_type, Fore.WHITE)
     icon = _get_icon(node_type)
@@ -278,7 +279,10 @@ def _format_node_display(node, show_urls=True):
         # Content node - show more details
         from core.content_scaffolds import is_hidden
 
-        hidden = is_hidden(node) if hasattr(node, 'parent') else False
+        if not hasattr(node, 'parent'):
+            hidden = False
+        else:
+            hidden = rows.is_hidden(node) if rows is not None else is_hidden(node)
         hidden_indicator = f"{Fore.RED}[hidden]{Style.RESET_ALL} " if hidden else ""
 
         # Get title or URL
@@ -397,13 +401,24 @@ class CanvasTree:
     """
     Enhanced tree visualization for Canvas course content.
     Uses treelib with improved formatting, colors, statistics, and URLs.
+
+    Node display strings are formatted lazily, only when the tree is shown.
+    In headless mode the treelib tree is not built during the scan at all;
+    only the parent links and counters are kept, and the tree is assembled
+    on demand if it is displayed later.
+
+    Mutations and registry reads are guarded by a re-entrant lock so nodes
+    can be added from several scan threads; insertion order is preserved.
     """
 
-    def __init__(self):
+    def __init__(self, headless=False):
         self.tree = Tree()
+        self.headless = headless
         self._node_registry = {}  # Track nodes for statistics
+        self._parent_ids = {}  # node id -> parent node id, in insertion order
         self._stats = defaultdict(int)
         self._show_urls = True  # Default to showing URLs
+        self._lock = threading.RLock()
 
     def init_node(self, root):
         """Initialize the root node of the tree."""
@@ -415,49 +430,102 @@ class CanvasTree:
             tc = _get_tree_chars()
             arrow = _get_arrow()
             display += f"\n{tc['pipe']}  {Fore.LIGHTBLACK_EX}{arrow}{Style.RESET_ALL} {Fore.CYAN}{course_url}{Style.RESET_ALL}"
-        self.tree.create_node(display, str(id(root)))
-        self._node_registry[str(id(root))] = root
+        with self._lock:
+            self._root_display = display
+            if not self.headless:
+                self.tree.create_node(display, str(id(root)))
+            self._node_registry[str(id(root))] = root
+            self._parent_ids[str(id(root))] = None
+
+    def add_node(self, node, parent=None):
+        """
+        Add a node to the tree.
 
-    def add_node(self, node):
-        """Add a node to the tree with enhanced formatting."""
-        node_display = _format_node_display(node, show_urls=self._show_urls)
+        The node is attached under ``node.parent`` unless an explicit
+        ``parent`` is given (used when rebuilding a tree from a snapshot).
+        Display formatting is deferred until the tree is shown.
+        """
         node_value = str(id(node))
-        parent = str(id(node.parent))
+        parent = str(id(parent if parent is not None else node.parent))
 
         try:
-            self.tree.create_node(node_display, node_value, parent)
-            self._node_registry[node_value] = node
+            with self._lock:
+                if self.headless:
+                    if node_value in self._node_registry:
+                        raise ValueError(f"Node {node_value} already exists")
+                    if parent not in self._node_registry:
+                        raise ValueError(f"Parent {parent} is not in the tree")
+                else:
+                    self.tree.create_node(node.__class__.__name__, node_value, parent)
+                self._node_registry[node_value] = node
+                self._parent_ids[node_value] = parent
 
-            # Track statistics
-            node_type = node.__class__.__name__
-            self._stats[node_type] += 1
+                # Track statistics
+                node_type = node.__class__.__name__
+                self._stats[node_type] += 1
 
-            if getattr(node, 'is_content', False):
-                self._stats['_total_content'] += 1
-                from core.content_scaffolds import is_hidden
-                if is_hidden(node):
-                    self._stats['_hidden_content'] += 1
-            else:
-                self._stats['_total_resources'] += 1
+                if getattr(node, 'is_content', False):
+                    self._stats['_total_content'] += 1
+                else:
+                    self._stats['_total_resources'] += 1
 
         except Exception as e:
             warnings.warn(f"Could not add node {node}: {e}")
 
+    def _ensure_tree(self):
+        """Build the treelib tree from the recorded parent links (headless mode)."""
+        with self._lock:
+            if not self.headless or len(self.tree) == len(self._parent_ids):
+                return
+            self.tree = Tree()
+            for node_id, parent_id in self._parent_ids.items():
+                if parent_id is None:
+                    self.tree.create_node(self._root_display, node_id)
+                else:
+                    self.tree.create_node(self._node_registry[node_id].__class__.__name__, node_id, parent_id)
+
+    def _registry_items(self):
+        """Return a consistent copy of the registry for iteration."""
+        with self._lock:
+            return list(self._node_registry.items())
+
+    def _count_hidden(self):
+        """Count hidden content nodes (evaluated at display time, not during the scan)."""
+        from core.row_model import RowModel
+        rows = RowModel()
+        return sum(1 for _, node in self._registry_items()
+                   if getattr(node, 'is_content', False) and rows.is_hidden(node))
+
+    def structure(self):
+        """
+        Return ``(node, tree_parent)`` pairs for every non-root node.
+
+        Pairs are in insertion order, so re-adding them in sequence
+        rebuilds an identical tree.
+        """
+        with self._lock:
+            return [(self._node_registry[node_id], self._node_registry[parent_id])
+                    for node_id, parent_id in self._parent_ids.items() if parent_id is not None]
+
     def show_content_only(self, show_stats=True, show_urls=True):
         """Display tree showing only resource nodes that contain content."""
         from core.content_scaffolds import build_path
+        from core.row_model import RowModel
+
+        self._ensure_tree()
+        rows = RowModel()
 
         # 1. Collect IDs of all nodes to keep
         keep_ids = set()
 
         # Add root node
-        for node_id, node in self._node_registry.items():
+        for node_id, node in self._registry_items():
             if hasattr(node, 'root_node'):
                 keep_ids.add(node_id)
                 break
 
         # For each content node, use build_path to get full ancestor chain
-        for node_id, node in self._node_registry.items():
+        for node_id, node in self._registry_items():
             if getattr(node, 'is_content', False):
                 keep_ids.add(node_id)
                 for ancestor in build_path(node, ignore_root=True):
@@ -472,10 +540,10 @@ class CanvasTree:
             original_node = self.tree.get_node(node_id)
             parent_id = original_node.predecessor(self.tree.identifier)
 
-            # Refresh display using existing _format_node_display
+            # Format the display using existing _format_node_display
             reg_node = self._node_registry.get(node_id)
             if reg_node and not hasattr(reg_node, 'root_node'):
-                display = _format_node_display(reg_node, show_urls=show_urls)
+                display = _format_node_display(reg_node, show_urls=show_urls, rows=rows)
             else:
                 display = original_node.tag
 
@@ -499,8 +567,9 @@ class CanvasTree:
             show_stats: Show content statistics summary
             show_urls: Show URLs for each item
         """
-        # Refresh all node displays before showing
+        # Format all node displays before showing
         # This ensures URLs are captured after all attributes are set
+        self._ensure_tree()
         self._refresh_node_displays(show_urls)
 
         if show_stats:
@@ -514,22 +583,25 @@ class CanvasTree:
 
     def _refresh_node_displays(self, show_urls=True):
         """
-        Refresh all node display strings.
-        Called before showing to ensure all URLs are captured
-        (since html_url may not be set when add_node was called).
+        Format all node display strings.
+        Called before showing so displays are only built when rendered
+        and reflect all attributes set during the scan.
         """
-        for node_id, node in self._node_registry.items():
+        from core.row_model import RowModel
+
+        rows = RowModel()
+        for node_id, node in self._registry_items():
             # Skip the root node (it's formatted differently)
             if hasattr(node, 'root_node'):
                 continue
 
             try:
-                new_display = _format_node_display(node, show_urls=show_urls)
+                new_display = _format_node_display(node, show_urls=show_urls, rows=rows)
                 tree_node = self.tree.get_node(node_id)
                 if tree_node:
                     tree_node.tag = new_display
             except Exception:
-                pass  # Keep original display if refresh fails
+                pass  # Keep placeholder display if formatting fails
 
     def _print_header(self):
         """Print a header for the tree display."""
@@ -556,7 +628,8 @@ class CanvasTree:
                       'Discussions', 'Announcements', 'CanvasFiles',
                       'CanvasMediaObjects', 'CanvasStudio'}
 
-        for node_type, count in sorted(self._stats.items()):
+        stats = self.get_statistics()
+        for node_type, count in sorted(stats.items()):
             if node_type.startswith('_') or node_type in containers:
                 continue
             if node_type in ('Document', 'DocumentSite', 'VideoFile', 'VideoSite',
@@ -592,8 +665,8 @@ class CanvasTree:
             print()
 
         # Print totals
-        total_content = self._stats.get('_total_content', 0)
-        hidden_content = self._stats.get('_hidden_content', 0)
+        total_content = stats.get('_total_content', 0)
+        hidden_content = stats['_hidden_content']
         visible_content = total_content - hidden_content
 
         print(f"  {Fore.CYAN}{'-' * 40}{Style.RESET_ALL}")
@@ -616,7 +689,10 @@ class CanvasTree:
 
     def get_statistics(self):
         """Return statistics as a dictionary."""
-        return dict(self._stats)
+        with self._lock:
+            stats = dict(self._stats)
+        stats['_hidden_content'] = self._count_hidden()
+        return stats
 
     def get_all_urls(self):
         """
@@ -627,7 +703,7 @@ class CanvasTree:
         """
         url_list = []
 
-        for node_id, node in self._node_registry.items():
+        for node_id, node in self._registry_items():
             if not getattr(node, 'is_content', False):
                 continue
 
@@ -657,7 +733,7 @@ class CanvasTree:
             List of matching nodes
         """
         return [
-            node for node in self._node_registry.values()
+            node for _, node in self._registry_items()
             if node.__class__.__name__ in content_types
         ]
 
@@ -2,7 +2,10 @@
 Course ID Extractor
 
 Extracts course information from Canvas LMS and exports to CSV.
-Can be used standalone or integrated with canvas_bot CLI.
+Can be used standalone (``python -m tools.course_extractor``) or integrated
+with canvas_bot CLI. Pages are fetched concurrently by
+network.account_courses; ``--term-id`` and ``--updated-since`` narrow the list
+for nightly delta runs.
 """
 
 import csv
@@ -10,6 +13,8 @@ import time
 import os
 from datetime import datetime
 
+import click
+
 
 def get_semester_key():
     """
@@ -97,33 +102,100 @@ def generate_course_id(parsed_code):
     return None
 
 
-def extract_courses(output_path, semester_filter=None, include_all=False, delay=0.3):
+CSV_HEADER = [
+    "generated_id",
+    "canvas_id",
+    "semester",
+    "department",
+    "course_number",
+    "section",
+    "crn",
+    "course_name",
+    "course_code",
+]
+
+
+def course_row(course, semester_key):
+    """
+    The CSV row of one course from the Canvas API.
+
+    Returns (row, parsed_code); parsed_code is None (and the ID and code
+    columns are empty) when the course code doesn't match the semester pattern.
+    """
+    course_code = course.get("course_code", "")
+    course_name = course.get("name", "")
+    canvas_id = course.get("id", "")
+
+    parsed = parse_course_code(course_code, semester_key)
+    if not parsed:
+        return ["", canvas_id, "", "", "", "", "", course_name, course_code], None
+
+    return [
+        generate_course_id(parsed),
+        canvas_id,
+        parsed["semester"],
+        parsed["department"],
+        parsed["course_number"],
+        parsed["section"],
+        parsed.get("crn", ""),
+        course_name,
+        course_code,
+    ], parsed
+
+
+def extract_courses(output_path, semester_filter=None, include_all=False, delay=None,
+                    enrollment_term_id=None, updated_since=None, workers=None, ids_path=None):
     """
     Extract all courses from Canvas and save to CSV.
 
+    Pages of the account's course list are fetched concurrently (see
+    network.account_courses) and each page's rows are written as soon as it
+    arrives, in page order.
+
     Args:
         output_path: Path to save the CSV file
         semester_filter: Optional semester code to filter by (e.g., "fa24")
         include_all: If True, include courses that don't match semester pattern
-        delay: Delay between API calls in seconds (to avoid rate limiting)
+        delay: Minimum seconds between API requests; defaults to
+            account_courses.requests_per_second in config.yaml
+        enrollment_term_id: Only list courses of this Canvas enrollment term
+        updated_since: Only list courses created, or with a page or file
+            updated, at or after this time (datetime or ISO 8601 string), for
+            nightly delta runs. Costs up to two extra requests per course
+            (see network.account_courses)
+        workers: Page requests in flight at once; defaults to account_courses.workers
+        ids_path: Optional text file for the Canvas IDs of the written courses,
+            one per line (the format --course_id_list reads)
 
     Returns:
         dict with extraction statistics
     """
-    from network.api import get_active_accounts
+    from concurrent.futures import ThreadPoolExecutor
+
+    from network.account_courses import AccountCourseLister, parse_timestamp
 
     semester_key = get_semester_key()
+    since = parse_timestamp(updated_since)
+
+    options = {}
+    if delay is not None:
+        options["requests_per_second"] = 1.0 / delay if delay > 0 else 0
+    if workers is not None:
+        options["workers"] = workers
+    lister = AccountCourseLister(**options)
 
-    # Ensure output directory exists
-    output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    # Ensure output directories exist
+    for path in filter(None, (output_path, ids_path)):
+        output_dir = os.path.dirname(path)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
 
     stats = {
         "total_fetched": 0,
         "total_written": 0,
         "skipped_no_match": 0,
         "skipped_filter": 0,
+        "skipped_unchanged": 0,
         "errors": 0,
     }
 
@@ -136,104 +208,91 @@ def extract_courses(output_path, semester_filter=None, include_all=False, delay=
         print(f"  Semester filter: {semester_filter}")
     else:
         print(f"  Semester filter: (none - all semesters)")
+    if enrollment_term_id:
+        print(f"  Term ID:         {enrollment_term_id}")
+    if since:
+        print(f"  Updated since:   {since.isoformat()}")
     print("=" * 60)
     print()
     print("Fetching courses from Canvas API...")
     print()
 
-    with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-
-        # Write header
-        writer.writerow([
-            "generated_id",
-            "canvas_id",
-            "semester",
-            "department",
-            "course_number",
-            "section",
-            "crn",
-            "course_name",
-            "course_code",
-        ])
-
-        page = 1
-        last_semester = None
-
-        while True:
-            print(f"\r  Fetching page {page}...", end="", flush=True)
-            courses = get_active_accounts(page)
-
-            if not courses or len(courses) == 0:
-                print(f"\r  Fetching page {page}... no more courses found.")
-                break
-
-            print(f"\r  Fetching page {page}... got {len(courses)} courses", flush=True)
-            stats["total_fetched"] += len(courses)
-
-            for course in courses:
-                try:
-                    course_code = course.get("course_code", "")
-                    course_name = course.get("name", "")
+    start = time.perf_counter()
+    ids_file = open(ids_path, "w", encoding="utf-8") if ids_path else None
+    # Content change checks for --updated-since run on their own pool, alongside the page requests
+    change_checks = ThreadPoolExecutor(max_workers=lister.workers, thread_name_prefix="course-changes") if since else None
+    try:
+        with open(output_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_HEADER)
+
+            last_semester = None
+
+            for page, courses in lister.pages(enrollment_term_id):
+                total_pages = lister.stats["total_pages"]
+                page_label = f"{page}/{total_pages}" if total_pages else f"{page}"
+                if courses is None:
+                    print(f"  Page {page_label}: failed, skipped (see log)")
+                    continue
+                print(f"  Page {page_label}: got {len(courses)} courses", flush=True)
+                stats["total_fetched"] += len(courses)
+
+                if since:
+                    fetched = len(courses)
+                    courses = lister.filter_changed(courses, since, change_checks)
+                    stats["skipped_unchanged"] += fetched - len(courses)
+
+                for course in courses:
                     canvas_id = course.get("id", "")
+                    try:
+                        row, parsed = course_row(course, semester_key)
+                        course_name = row[7]
+
+                        if parsed:
+                            # Apply semester filter if specified
+                            if semester_filter and parsed["semester"] != semester_filter:
+                                stats["skipped_filter"] += 1
+                                continue
+
+                            # Print semester header when it changes
+                            if parsed["semester"] != last_semester:
+                                print()
+                                print(f"  --- {parsed['semester'].upper()} ---")
+                                last_semester = parsed["semester"]
+
+                            writer.writerow(row)
+                            stats["total_written"] += 1
+
+                            # Truncate long course names for display
+                            display_name = course_name[:45] + "..." if len(course_name) > 45 else course_name
+                            print(f"  [+] {row[0]:<20} | {canvas_id:<6} | {display_name}")
+
+                        elif include_all:
+                            # Write courses that don't match pattern
+                            writer.writerow(row)
+                            stats["total_written"] += 1
+                            print(f"  [?] (no pattern match) | {canvas_id:<6} | {course_name[:45]}")
+                        else:
+                            stats["skipped_no_match"] += 1
+                            continue
 
-                    parsed = parse_course_code(course_code, semester_key)
+                        if ids_file:
+                            ids_file.write(f"{canvas_id}\n")
 
-                    if parsed:
-                        # Apply semester filter if specified
-                        if semester_filter and parsed["semester"] != semester_filter:
-                            stats["skipped_filter"] += 1
-                            continue
+                    except Exception as e:
+                        stats["errors"] += 1
+                        print(f"  [ERROR] Failed to process course {canvas_id}: {e}")
+    finally:
+        if change_checks:
+            change_checks.shutdown()
+        if ids_file:
+            ids_file.close()
 
-                        generated_id = generate_course_id(parsed)
-
-                        # Print semester header when it changes
-                        if parsed["semester"] != last_semester:
-                            print()
-                            print(f"  --- {parsed['semester'].upper()} ---")
-                            last_semester = parsed["semester"]
-
-                        writer.writerow([
-                            generated_id,
-                            canvas_id,
-                            parsed["semester"],
-                            parsed["department"],
-                            parsed["course_number"],
-                            parsed["section"],
-                            parsed.get("crn", ""),
-                            course_name,
-                            course_code,
-                        ])
-                        stats["total_written"] += 1
-
-                        # Truncate long course names for display
-                        display_name = course_name[:45] + "..." if len(course_name) > 45 else course_name
-                        print(f"  [+] {generated_id:<20} | {canvas_id:<6} | {display_name}")
-
-                    elif include_all:
-                        # Write courses that don't match pattern
-                        writer.writerow([
-                            "",  # no generated_id
-                            canvas_id,
-                            "",  # no semester
-                            "",  # no department
-                            "",  # no course_number
-                            "",  # no section
-                            "",  # no crn
-                            course_name,
-                            course_code,
-                        ])
-                        stats["total_written"] += 1
-                        print(f"  [?] (no pattern match) | {canvas_id:<6} | {course_name[:45]}")
-                    else:
-                        stats["skipped_no_match"] += 1
-
-                except Exception as e:
-                    stats["errors"] += 1
-                    print(f"  [ERROR] Failed to process course {canvas_id}: {e}")
-
-            page += 1
-            time.sleep(delay)
+    stats["pages"] = lister.stats["pages"]
+    stats["failed_pages"] = lister.stats["failed_pages"]
+    stats["requests"] = lister.stats["requests"]
+    stats["failed_change_checks"] = lister.stats["failed_change_checks"]
+    stats["seconds"] = round(time.perf_counter() - start, 2)
 
     # Print summary
     print()
@@ -242,6 +301,7 @@ def extract_courses(output_path, semester_filter=None, include_all=False, delay=
     print("Extraction Complete")
     print("=" * 60)
     print()
+    print(f"  Pages fetched:            {stats['pages']:,} in {stats['seconds']}s")
     print(f"  Total courses fetched:    {stats['total_fetched']:,}")
     print(f"  Courses written to CSV:   {stats['total_written']:,}")
     print()
@@ -249,17 +309,26 @@ def extract_courses(output_path, semester_filter=None, include_all=False, delay=
         print(f"  Skipped (no pattern):     {stats['skipped_no_match']:,}")
     if stats['skipped_filter'] > 0:
         print(f"  Skipped (filtered out):   {stats['skipped_filter']:,}")
+    if stats['skipped_unchanged'] > 0:
+        print(f"  Skipped (unchanged):      {stats['skipped_unchanged']:,}")
+    if stats['failed_pages'] > 0:
+        print(f"  Pages that failed:        {stats['failed_pages']:,} (the list is incomplete)")
+    if stats['failed_change_checks'] > 0:
+        print(f"  Change checks failed:     {stats['failed_change_checks']:,} (those courses were kept)")
     if stats['errors'] > 0:
         print(f"  Errors:                   {stats['errors']:,}")
     print()
     print(f"  Output saved to: {output_path}")
+    if ids_path:
+        print(f"  Course IDs saved to: {ids_path}")
     print()
     print("=" * 60)
 
     return stats
 
 
-def extract_courses_cli(output_path=None, semester=None):
+def extract_courses_cli(output_path=None, semester=None, enrollment_term_id=None, updated_since=None,
+                        ids_path=None):
     """
     CLI wrapper for extract_courses with sensible defaults.
     """
@@ -272,19 +341,41 @@ def extract_courses_cli(output_path=None, semester=None):
         output_path=output_path,
         semester_filter=semester,
         include_all=False,
-        delay=0.3,
+        enrollment_term_id=enrollment_term_id,
+        updated_since=updated_since,
+        ids_path=ids_path,
     )
 
 
-if __name__ == "__main__":
-    # Standalone usage
+@click.command()
+@click.option('--output', 'output_path', type=click.STRING, default=None,
+              help='CSV file to write (default: canvas_courses_<timestamp>.csv)')
+@click.option('--semester', type=click.STRING, default=None, help='Only courses of this semester code (e.g., fa24)')
+@click.option('--term-id', 'enrollment_term_id', type=click.STRING, default=None,
+              help='Only courses of this Canvas enrollment term ID')
+@click.option('--updated-since', 'updated_since', type=click.STRING, default=None,
+              help='Only courses created, or with a page or file updated, at or after this ISO 8601 '
+                   'date/time (e.g., 2026-10-17)')
+@click.option('--ids-file', 'ids_path', type=click.STRING, default=None,
+              help='Also write the Canvas IDs, one per line, for --course_id_list')
+def main(output_path, semester, enrollment_term_id, updated_since, ids_path):
+    """Export the courses of the Canvas account to CSV."""
+    from network.account_courses import parse_timestamp
     from network.cred import set_canvas_api_key_to_environment_variable, load_config_data_from_appdata
 
+    try:
+        parse_timestamp(updated_since)
+    except ValueError:
+        raise click.BadParameter(f"'{updated_since}' is not an ISO 8601 date or time", param_hint='--updated-since')
+
     set_canvas_api_key_to_environment_variable()
     load_config_data_from_appdata()
 
-    # Example: extract all courses
-    extract_courses_cli()
+    extract_courses_cli(output_path=output_path, semester=semester, enrollment_term_id=enrollment_term_id,
+                        updated_since=updated_since, ids_path=ids_path)
 
-    # Example: extract only Fall 2024 courses
-    # extract_courses_cli(output_path="fa24_courses.csv", semester="fa24")
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Standalone usage, e.g. a nightly delta run:
+    #   python -m tools.course_extractor --updated-since 2026-10-17 --ids-file changed_courses.txt
+    main()
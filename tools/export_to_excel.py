@@ -1,13 +1,25 @@
+import copy
 import os
+import warnings
+from collections import namedtuple
+from io import BytesIO
+from zipfile import ZipFile, ZIP_DEFLATED
+
 from openpyxl.styles import PatternFill
 from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl.worksheet.table import Table, TableStyleInfo, TableColumn
+from openpyxl.worksheet.filters import AutoFilter
 import openpyxl
 from openpyxl.worksheet.hyperlink import Hyperlink
 from openpyxl.utils.cell import get_column_letter
 from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.formatting.rule import FormulaRule
-from openpyxl import load_workbook
+from openpyxl.packaging.manifest import Manifest
+from openpyxl.packaging.relationship import RelationshipList
+from openpyxl.xml.constants import ARC_CONTENT_TYPES, ARC_ROOT_RELS
+from openpyxl.xml.functions import tostring
+from config.yaml_io import read_config
 from tools.vba_to_excel import insert_vba
 
 tracking_columns = {
@@ -174,25 +186,23 @@ pattern_fills = {
 
 
 
-def add_validation_formatting(sheet, validations, col_idx):
-
-
 
-    for v in validations:
-        validation = v[0]
-        formatting_list = v[1]
+# Sheets every workbook starts with, in tab order; other content lists are appended after them
+workbook_sheets = ['Documents', 'Document Sites', 'Image Files', 'Video Files',
+                   'Video Sites', 'Audio Files', 'Audio Sites', 'Unsorted']
 
-        cell_range = get_data_cells_range(sheet, 5)
+# Widths applied to every sheet with data, after the tracking column widths
+sheet_column_widths = {'A': 15, 'B': 15, 'C': 15, 'D': 20, 'E': 20, 'F': 30, 'G': 30, 'H': 40}
 
-        validation_cell_range = replace_column_in_range(cell_range, get_column_letter(col_idx))
+# Data rows end at the first empty cell in this column
+data_range_column = 5
 
-        sheet.add_data_validation(validation)
-        validation.ranges.add(validation_cell_range)
-
-        for formatting in formatting_list:
-            formatter = formatting
-            sheet.conditional_formatting.add(validation_cell_range, formatter)
+# Workbooks with at least this many data rows are streamed (write-only sheets)
+streaming_row_threshold = int(read_config().get('excel', {}).get('streaming_rows', 20000))
 
+# column: 1-based column index, link: True if the cell has an "Open File" hyperlink to target,
+# fill: PatternFill or None
+SheetCell = namedtuple("SheetCell", ["column", "value", "link", "target", "fill"])
 
 
 def replace_column_in_range(range_string, new_column_letter):
@@ -208,71 +218,6 @@ def replace_column_in_range(range_string, new_column_letter):
     return new_range_string
 
 
-def has_data(sheet):
-    # Check if there's data in any cell of the sheet
-    for row in sheet.iter_rows():
-        for cell in row:
-            if cell.value is not None:
-                return True
-    return False
-
-
-def get_data_cells_range(sheet, column):
-    start_row = 2
-    end_row = find_next_empty_row(sheet, column) - 1
-
-    if end_row < start_row:
-        return None  # No data cells in the column
-
-    start_cell = sheet.cell(row=start_row, column=column)
-    end_cell = sheet.cell(row=end_row, column=column)
-
-    return f"{start_cell.coordinate}:{end_cell.coordinate}"
-
-
-def find_next_empty_column(sheet):
-    col_idx = 1
-    while sheet.cell(row=1, column=col_idx).value is not None:
-        col_idx += 1
-    return col_idx
-
-def find_next_empty_row(sheet, column):
-    row_idx = 1
-    while sheet.cell(row=row_idx, column=column).value is not None:
-        row_idx += 1
-    return row_idx
-
-
-def get_sheet_column_names(sheet):
-    return [cell.value for cell in sheet[1]]
-
-
-def create_excel_file(excel_file_path=None):
-
-    """
-    Creates an excel file with the appropriate sheets.
-    :param json_data:
-    :param excel_file_path:
-    :return:
-    """
-    wb = openpyxl.Workbook()
-    ws = wb["Sheet"]
-    wb.remove(ws)
-    wb.create_sheet('Documents')
-    wb.create_sheet('Document Sites')
-    wb.create_sheet('Image Files')
-    wb.create_sheet('Video Files')
-    wb.create_sheet('Video Sites')
-    wb.create_sheet('Audio Files')
-    wb.create_sheet('Audio Sites')
-    wb.create_sheet('Unsorted')
-
-    save_workbook(wb, excel_file_path)
-
-
-
-
-
 def remove_key_recursively(obj, key_to_remove):
     if isinstance(obj, dict):
         result = {}
@@ -289,40 +234,6 @@ def remove_key_recursively(obj, key_to_remove):
         return obj
 
 
-def apply_sheet_styles(excel_file_path):
-    wb = openpyxl.load_workbook(excel_file_path)
-
-
-
-    for count, sheet_name in enumerate(wb.sheetnames):
-
-        sheet = wb[sheet_name]
-        if sheet.dimensions == "A1:A1":
-            continue
-
-
-        sheet.column_dimensions['A'].width = 15
-        sheet.column_dimensions['B'].width = 15
-        sheet.column_dimensions['C'].width = 15
-        sheet.column_dimensions['D'].width = 20
-        sheet.column_dimensions['E'].width = 20
-        sheet.column_dimensions['F'].width = 30
-        sheet.column_dimensions['G'].width = 30
-        sheet.column_dimensions['H'].width = 40
-        sheet_name = sheet_name.replace(" ", "-")
-
-
-        table = Table(displayName=f"Table{count}", ref=sheet.dimensions)
-
-        style = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
-                       showLastColumn=False, showRowStripes=True, showColumnStripes=True)
-
-        table.tableStyleInfo = style
-        sheet.add_table(table)
-
-    save_workbook(wb, excel_file_path)
-
-
 def find_key_names(d, path=None):
     if path is None:
         path = []
@@ -337,171 +248,275 @@ def find_key_names(d, path=None):
     return result
 
 
-def add_header_to_sheet(file_path, sheet_name, header_row):
-    """
-    Adds a header row to a sheet based on the keys in a Python dictionary.
-
-    Args:
-        file_path (str): The path to the Excel file.
-        sheet_name (str): The name of the sheet to add the header row to.
-        header_row (dict): A dictionary whose keys will be used as the header row.
-    """
-    # Load the workbook and select the sheet
-    wb = openpyxl.load_workbook(file_path)
-    sheet = wb[sheet_name]
-
-    # Add the header row to the sheet
+def header_title(key):
+    """'source_page_url' -> 'Source Page Url'; used for sheet names and column headers."""
+    return " ".join(word.capitalize() for word in key.replace('_', ' ').split(' '))
 
-    for col_idx, header_name in enumerate(header_row):
 
-        cell = sheet.cell(row=1, column=col_idx+1)
-        cell.value = " ".join(word.capitalize() for word in header_name.replace('_', ' ').split(' '))
+def item_cells(item, download_hidden_files):
+    """
+    Cells of one content dict, in column order.
+
+    - ``save_path`` becomes an "Open File" hyperlink (to the Box page URL for
+      Box files), and is left out for hidden content unless hidden files are
+      downloaded.
+    - Keys in ``pattern_fills`` are shown as their label with a fill; values
+      without a pattern are left out.
+    - Empty values produce no cell.
+    """
+    cells = []
+    for col_num, key in enumerate(item.keys(), 1):
+        value = item.get(key)
 
-    # Save the workbook
-    save_workbook(wb, file_path)
+        if key == "save_path":
+            if item['is_hidden'] and not download_hidden_files:
+                continue
+            target = item.get("url") if item['source_page_type'] == 'BoxPage' else value
+            # A link without a display value shows its target, as openpyxl does
+            cells.append(SheetCell(col_num, value if value is not None else target, True, target, None))
+            continue
 
-def dicts_to_excel(filename, sheetname, data, download_hidden_files):
-    # Load an existing Excel workbook or create a new one if it doesn't exist
-    try:
-        wb = openpyxl.load_workbook(filename)
-    except FileNotFoundError:
-        wb = openpyxl.Workbook()
+        pattern_fill = pattern_fills.get(key)
+        if pattern_fill:
+            matched = None
+            for pattern in pattern_fill:
+                if value == pattern[0]:
+                    matched = pattern
+            if matched:
+                cells.append(SheetCell(col_num, matched[2], False, None, matched[1]))
+            continue
 
+        if value is not None:
+            cells.append(SheetCell(col_num, value, False, None, None))
+    return cells
 
-    # Create a new sheet with the specified sheet name or get the existing one
-    if sheetname in wb:
-        ws = wb[sheetname]
-    else:
-        ws = wb.create_sheet(sheetname)
 
-    # Write data rows (values from each dictionary)
+class SheetLayout:
 
-    for row_num, item in enumerate(data, 2):  # Start from row 2
+    """
+    Everything written to one sheet, worked out before any cell is created.
 
-        for col_num, key in enumerate(item.keys(), 1):
+    Holds the header, the content dicts and the tracking columns, and derives
+    the data range, the validation ranges and the table reference from them,
+    so the workbook can be written in a single pass.
+    """
 
-            if key == "save_path":
-                if item['is_hidden'] and not download_hidden_files:
+    def __init__(self, name, items, download_hidden_files):
+        self.name = name
+        self.items = items
+        self.download_hidden_files = download_hidden_files
+        self.titles = [header_title(key) for key in items[0]]
+
+        self.tracking = []
+        start_col_idx = len(self.titles) + 1
+        for col_offset, (col_title, col_width, default_value) in enumerate(tracking_columns.get(name, [])):
+            self.tracking.append((start_col_idx + col_offset, col_title, col_width, default_value))
+            self.titles.append(col_title)
+
+        # One pass over the data for the range end and the used area
+        self.data_end_row = None
+        self.max_row = 1
+        self.max_col = len(self.titles)
+        for row_num, item in enumerate(items, 2):
+            cells = item_cells(item, download_hidden_files)
+            if cells:
+                self.max_row = row_num
+                self.max_col = max(self.max_col, cells[-1].column)
+            if self.data_end_row is None and not any(cell.column == data_range_column for cell in cells):
+                self.data_end_row = row_num - 1
+        if len(self.titles) < data_range_column:
+            self.data_end_row = 0
+        elif self.data_end_row is None:
+            self.data_end_row = len(items) + 1
+
+        # Tracking defaults fill the data range
+        if self.data_end_row >= 2 and any(default is not None for _, _, _, default in self.tracking):
+            self.max_row = max(self.max_row, self.data_end_row)
+
+    def data_range(self, col_idx):
+        """Range of the data rows in column ``col_idx``, or None if there are no data rows."""
+        if self.data_end_row < 2:
+            return None
+        letter = get_column_letter(col_idx)
+        return f"{letter}2:{letter}{self.data_end_row}"
+
+    def rows(self):
+        """Yield (row number, [SheetCell, ...]) for every data row, tracking defaults included."""
+        defaults = [(col_idx, default) for col_idx, _, _, default in self.tracking if default is not None]
+        for row_num, item in enumerate(self.items, 2):
+            cells = item_cells(item, self.download_hidden_files)
+            if defaults and row_num <= self.data_end_row:
+                by_column = {cell.column: cell for cell in cells}
+                for col_idx, default in defaults:
+                    cell = by_column.get(col_idx)
+                    by_column[col_idx] = cell._replace(value=default) if cell else SheetCell(col_idx, default, False, None, None)
+                cells = [by_column[column] for column in sorted(by_column)]
+            yield row_num, cells
+
+    def column_widths(self):
+        widths = {}
+        for col_idx, _, col_width, _ in self.tracking:
+            if col_width is not None:
+                widths[get_column_letter(col_idx)] = col_width
+        widths.update(sheet_column_widths)
+        return widths
+
+    def validations(self):
+        """
+        Yield (DataValidation, [FormulaRule, ...], range) for every validated column.
+
+        Each sheet gets its own copy of the DataValidation, so ranges don't
+        leak into other sheets or later exports.
+        """
+        for col_idx, col_title in enumerate(self.titles, 1):
+            for validation, formatting_list in data_validations.get(col_title, []):
+                cell_range = self.data_range(col_idx)
+                if cell_range is None:
                     continue
+                validation = copy.deepcopy(validation)
+                validation.ranges.add(cell_range)
+                yield validation, formatting_list, cell_range
+
+    def table(self, count):
+        # Columns are named here rather than read back from the header cells,
+        # which a write-only sheet can't do
+        ref = f"A1:{get_column_letter(self.max_col)}{self.max_row}"
+        names = self.titles + [None] * (self.max_col - len(self.titles))
+        table = Table(displayName=f"Table{count}", ref=ref, autoFilter=AutoFilter(ref=ref),
+                      tableColumns=[TableColumn(id=idx, name=str(name)) for idx, name in enumerate(names, 1)])
+        table.tableStyleInfo = TableStyleInfo(name="TableStyleMedium9", showFirstColumn=False,
+                                              showLastColumn=False, showRowStripes=True, showColumnStripes=True)
+        return table
+
+
+def sheet_layouts(json_data, download_hidden_files):
+    """
+    Return {sheet name: SheetLayout} for every non-empty content list, in tab order.
 
-                target = item.get(key)
-                if item['source_page_type'] == 'BoxPage':
-                    target = item.get("url")
-
-
-                hyperlink = Hyperlink(ref=f"{get_column_letter(col_num)}{row_num}",
-                                      target=target,
-                                        display="Open File")
-                ws.cell(row=row_num, column=col_num).value = item.get(key)
-                ws.cell(row=row_num, column=col_num).hyperlink = hyperlink
-                continue
-
-            # pattern fills
-            pattern_fill = pattern_fills.get(key)
-            if pattern_fill:
-                for pattern in pattern_fill:
-                    if item.get(key) == pattern[0]:
-                        fill = pattern[1]
-                        ws.cell(row=row_num, column=col_num).fill = fill
-                        ws.cell(row=row_num, column=col_num).value = pattern[2]
-                continue
-
-            ws.cell(row=row_num, column=col_num).value = item.get(key)
-
-
-    # Save the workbook to a file
-    save_workbook(wb, filename)
-
-
-def build_xcel_file(json_data, excel_file_path, download_hidden_files):
-
-    key_paths = find_key_names(json_data)
-    for path in key_paths:
+    The fixed workbook sheets come first (empty ones are None), followed by
+    any other lists in the order they appear in ``json_data``.
+    """
+    layouts = dict.fromkeys(workbook_sheets)
+    for path in find_key_names(json_data):
         # navigate to the list using each path
         sub_dict = json_data
         for key in path[:-1]:
             sub_dict = sub_dict[key]
 
         my_list = sub_dict[path[-1]]
-        sheet_name = " ".join(word.capitalize() for word in path[-1].replace('_', ' ').split(' '))
-
-        try:
-            add_header_to_sheet(excel_file_path, sheet_name, my_list[0])
-            dicts_to_excel(excel_file_path, sheet_name, my_list, download_hidden_files)
-        except IndexError:
-            pass
-
-def add_tracking_columns(excel_file_path):
+        if my_list:
+            sheet_name = header_title(path[-1])
+            layouts[sheet_name] = SheetLayout(sheet_name, my_list, download_hidden_files)
+    return layouts
 
 
-    wb = openpyxl.load_workbook(excel_file_path)
-
-
-    for sheet_name, columns in tracking_columns.items():
-        sheet = wb[sheet_name]
+def mark_macro_enabled(workbook):
+    """
+    Save ``workbook`` with the macro-enabled (.xlsm) content type.
 
-        # Only update the sheet if it has data
-        if has_data(sheet):
-            start_col_idx = find_next_empty_column(sheet)
-            for col_offset, (col_title, col_width, default_value) in enumerate(columns):
-                col_idx = start_col_idx + col_offset
+    openpyxl only does this for workbooks loaded with ``keep_vba=True``, which
+    is what ``insert_vba`` and Excel expect for a .xlsm file. An empty VBA
+    archive gives the same package without a save/reload round trip.
+    """
+    archive = ZipFile(BytesIO(), 'a', ZIP_DEFLATED)
+    archive.writestr(ARC_CONTENT_TYPES, tostring(Manifest().to_tree()))
+    archive.writestr(ARC_ROOT_RELS, tostring(RelationshipList().to_tree()))
+    workbook.vba_archive = archive
 
-                # Set column title
-                sheet.cell(row=1, column=col_idx, value=col_title)
-                # Set column width (optional)
-                if col_width is not None:
-                    column_letter = openpyxl.utils.get_column_letter(col_idx)
-                    sheet.column_dimensions[column_letter].width = col_width
 
-                if default_value is not None:
-                    cell_range = get_data_cells_range(sheet, 5)
-                    tracking_cell_range = replace_column_in_range(cell_range, get_column_letter(col_idx))
-                    for row in sheet[tracking_cell_range]:
-                        for cell in row:
-                            cell.value = default_value
+def write_sheet_rows(sheet, layout):
+    """Write the header and data rows of ``layout`` into a regular worksheet."""
+    for col_idx, title in enumerate(layout.titles, 1):
+        sheet.cell(row=1, column=col_idx, value=title)
 
-    save_workbook(wb, excel_file_path)
+    for row_num, cells in layout.rows():
+        for cell_data in cells:
+            cell = sheet.cell(row=row_num, column=cell_data.column)
+            cell.value = cell_data.value
+            if cell_data.link:
+                cell.hyperlink = Hyperlink(ref=cell.coordinate, target=cell_data.target, display="Open File")
+            if cell_data.fill:
+                cell.fill = cell_data.fill
 
 
-def add_data_validations(excel_file_path):
+def stream_sheet_rows(sheet, layout):
+    """
+    Append the header and data rows of ``layout`` to a write-only worksheet.
 
-    wb = openpyxl.load_workbook(excel_file_path)
+    Each row is serialized as soon as it is appended, but openpyxl keeps every
+    hyperlink until the sheet is closed (the ``<hyperlinks>`` element follows
+    the sheet data), so memory still grows by about 1 KB per linked row.
+    """
+    sheet.append(layout.titles)
+    for row_num, cells in layout.rows():
+        row = [None] * (cells[-1].column if cells else 0)
+        for cell_data in cells:
+            if not (cell_data.link or cell_data.fill):
+                row[cell_data.column - 1] = cell_data.value
+                continue
+            cell = WriteOnlyCell(sheet, value=cell_data.value)
+            if cell_data.link:
+                cell.hyperlink = Hyperlink(ref="", target=cell_data.target, display="Open File")
+            if cell_data.fill:
+                cell.fill = cell_data.fill
+            row[cell_data.column - 1] = cell
+        sheet.append(row)
 
-    for sheet in wb.sheetnames:
-        active_sheet = wb[sheet]
-        col_headers = get_sheet_column_names(active_sheet)
-        if len(col_headers) > 0:
-            for col_idx, col_title in enumerate(col_headers, 1):
 
-                if data_validations.get(col_title):
-                    validation = data_validations.get(col_title)
+def build_xcel_file(json_data, download_hidden_files, streaming=False):
+    """
+    Build the audit workbook in memory: sheets, headers, hyperlinks, pattern
+    fills, tracking columns, data validations, column widths and tables.
 
-                    for v in validation:
-                        validation = v[0]
-                        formatting_list = v[1]
+    With ``streaming``, the sheets are openpyxl write-only sheets: rows are
+    written out as they are added instead of being held as cell objects, and
+    the workbook can only be saved once.
 
-                        cell_range = get_data_cells_range(active_sheet, 5)
+    Returns the openpyxl Workbook; nothing is written to disk.
+    """
+    wb = openpyxl.Workbook(write_only=streaming)
+    if not streaming:
+        wb.remove(wb["Sheet"])
+    layouts = sheet_layouts(json_data, download_hidden_files)
+
+    for count, (sheet_name, layout) in enumerate(layouts.items()):
+        sheet = wb.create_sheet(sheet_name)
+        if layout is None:
+            continue
 
-                        validation_cell_range = replace_column_in_range(cell_range, get_column_letter(col_idx))
+        # Write-only sheets need their column widths before the first row
+        for column_letter, width in layout.column_widths().items():
+            sheet.column_dimensions[column_letter].width = width
 
-                        active_sheet.add_data_validation(validation)
-                        validation.ranges.add(validation_cell_range)
+        for validation, formatting_list, cell_range in layout.validations():
+            sheet.data_validations.append(validation)
+            for formatter in formatting_list:
+                sheet.conditional_formatting.add(cell_range, formatter)
 
-                        for formatting in formatting_list:
-                            formatter = formatting
-                            active_sheet.conditional_formatting.add(validation_cell_range, formatter)
+        with warnings.catch_warnings():
+            # Write-only sheets always warn about table columns; table() names them
+            warnings.simplefilter("ignore", UserWarning)
+            sheet.add_table(layout.table(count))
 
-    wb.save(excel_file_path)
-    save_workbook(wb, excel_file_path)
+        if streaming:
+            stream_sheet_rows(sheet, layout)
+        else:
+            write_sheet_rows(sheet, layout)
 
+    mark_macro_enabled(wb)
+    return wb
 
 
-def save_workbook(workbook, filename):
+def count_rows(json_data):
+    """Number of data rows the workbook for ``json_data`` will have."""
+    total = 0
+    for path in find_key_names(json_data):
+        sub_dict = json_data
+        for key in path:
+            sub_dict = sub_dict[key]
+        total += len(sub_dict)
+    return total
 
-    workbook.save(filename)
-    wb2 = load_workbook(filename, read_only=False, keep_vba=True)
-    wb2.save(filename)
-    wb2.close()
 
 def create_output_folder(file_save_path):
 
@@ -509,12 +524,13 @@ def create_output_folder(file_save_path):
         os.makedirs(os.path.join(file_save_path, "output"))
 
 
+def save_as_excel(json_data, file_save_path, download_hidden_files, streaming=False):
+    """
+    Save the audit workbook for ``json_data`` as ``{course_id}.xlsm``.
 
-
-
-
-
-def save_as_excel(json_data, file_save_path, download_hidden_files):
+    Large inventories (``excel.streaming_rows`` in config.yaml) are streamed
+    with write-only sheets; ``streaming=True`` forces that for any size.
+    """
 
     xcel_path = os.path.join(file_save_path, json_data['course_id'] + '.xlsm')
     json_data = remove_key_recursively(json_data, 'path')
@@ -529,11 +545,9 @@ def save_as_excel(json_data, file_save_path, download_hidden_files):
                 f"Check Task Manager for a running Excel.exe and close it, then try again."
             )
 
-    create_excel_file(xcel_path)
+    streaming = streaming or count_rows(json_data) >= streaming_row_threshold
 
-    build_xcel_file(json_data, xcel_path, download_hidden_files) # No error
-    add_tracking_columns(xcel_path) # No error
-    add_data_validations(xcel_path) # No error
-    apply_sheet_styles(xcel_path) # error
+    # Built in memory and written once
+    build_xcel_file(json_data, download_hidden_files, streaming).save(xcel_path)
     insert_vba(xcel_path)
     create_output_folder(file_save_path)
@@ -5,10 +5,11 @@ from collections import defaultdict
 import json
 from collections import defaultdict
 
-def count_course_content(id_range_x, id_range_y, write_out: str = None) -> dict:
+def count_course_content(id_range_x, id_range_y, write_out: str = None, index_path: str = None) -> dict:
     """
     Loops over course IDs, aggregates content counts, and optionally
-    writes a checkpoint to `write_out` after each course.
+    writes a checkpoint to `write_out` after each course. With `index_path`,
+    each course's full inventory is also added to that SQLite content index.
     """
     running = {
         "total_courses_counted": 0,
@@ -32,6 +33,9 @@ def count_course_content(id_range_x, id_range_y, write_out: str = None) -> dict:
 
         bot.print_content_tree()
 
+        if index_path:
+            bot.save_content_to_index(index_path)
+
         # 3) checkpoint to disk if requested
         if write_out:
             # turn nested defaultdicts into regular dicts
@@ -1,5 +1,6 @@
 import posixpath as path
 import re, os
+from functools import lru_cache
 
 from urllib.parse import parse_qs, urlparse, urlunparse
 
@@ -20,28 +21,31 @@ def shorten_filename_while_keeping_extension(filename: str, max_length: int) ->
     return name[:max_length - len(extension)] + extension
 
 
+_INVALID_FILENAME_CHARS = re.compile(r'[,%<>:"/\\|?*\x00-\x1f]')
+_INVALID_FOLDER_CHARS = re.compile(r'[,\.%<>:"/\\|?*\x00-\x1f]')
+
+_RESERVED_NAMES = frozenset([
+    "CON", "PRN", "AUX", "NUL", "COM1", "COM2", "COM3", "COM4", "COM5",
+    "COM6", "COM7", "COM8", "COM9", "LPT1", "LPT2", "LPT3", "LPT4",
+    "LPT5", "LPT6", "LPT7", "LPT8", "LPT9"
+])
+
+
+# Memoized: the same folder titles and file names are sanitized for every sibling file
+@lru_cache(maxsize=16384)
 def sanitize_windows_filename(filename: str, folder=False) -> str:
     # Remove invalid characters
 
     filename = filename.encode('ascii', errors='ignore').decode('ascii')
 
+    invalid_chars = _INVALID_FOLDER_CHARS if folder else _INVALID_FILENAME_CHARS
 
-    invalid_chars = r'[,%<>:"/\\|?*\x00-\x1f]'
-
-    if folder:
-        invalid_chars = r'[,\.%<>:"/\\|?*\x00-\x1f]'
-
-    sanitized_filename = re.sub(invalid_chars, "", filename)
+    sanitized_filename = invalid_chars.sub("", filename)
 
     # Add a hyphen to the end of reserved names
-    reserved_names = [
-        "CON", "PRN", "AUX", "NUL", "COM1", "COM2", "COM3", "COM4", "COM5",
-        "COM6", "COM7", "COM8", "COM9", "LPT1", "LPT2", "LPT3", "LPT4",
-        "LPT5", "LPT6", "LPT7", "LPT8", "LPT9"
-    ]
     name_without_extension = sanitized_filename.split('.')[0]
 
-    if name_without_extension.upper() in reserved_names:
+    if name_without_extension.upper() in _RESERVED_NAMES:
         name_parts = sanitized_filename.split('.')
         name_parts[0] += '-'
         sanitized_filename = '.'.join(name_parts)